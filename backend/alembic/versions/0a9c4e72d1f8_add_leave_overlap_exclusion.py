@@ -0,0 +1,50 @@
+"""Add leave_request overlap exclusion constraint
+
+Revision ID: 0a9c4e72d1f8
+Revises: f2a6d8e31b57
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9c4e72d1f8'
+down_revision = 'f2a6d8e31b57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Postgres only: SQLite dev relies on the API's interval check
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Existing overlaps would make the constraint fail half-way; list them instead
+    conflicts = op.get_bind().execute(sa.text(
+        "SELECT a.id, b.id FROM leave_request a JOIN leave_request b "
+        "ON a.user_id = b.user_id AND a.id < b.id "
+        "AND a.start_date <= b.end_date AND b.start_date <= a.end_date "
+        "WHERE a.status IN ('PENDING', 'APPROVED') AND b.status IN ('PENDING', 'APPROVED') "
+        "ORDER BY a.id, b.id LIMIT 50"
+    )).all()
+    if conflicts:
+        pairs = ", ".join(f"{a}/{b}" for a, b in conflicts)
+        raise RuntimeError(
+            f"Overlapping PENDING/APPROVED leave requests must be cancelled or corrected first: {pairs}"
+        )
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "ALTER TABLE leave_request ADD CONSTRAINT ex_leave_request_no_overlap "
+        "EXCLUDE USING gist (user_id WITH =, daterange(start_date, end_date, '[]') WITH &&) "
+        "WHERE (status IN ('PENDING', 'APPROVED'))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("ALTER TABLE leave_request DROP CONSTRAINT ex_leave_request_no_overlap")
@@ -0,0 +1,81 @@
+"""Add leave_balance and leave_ledger_entry
+
+Revision ID: 1c7d3f9a2e64
+Revises: 0a9c4e72d1f8
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '1c7d3f9a2e64'
+down_revision = '0a9c4e72d1f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('leave_balance',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('entitled', sa.Float(), nullable=False),
+    sa.Column('used', sa.Float(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['leave_category.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'category_id')
+    )
+    op.create_table('leave_ledger_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('ACCRUAL', 'DEBIT', 'CREDIT', 'ADJUSTMENT', name='ledgerentrykind'), nullable=False),
+    sa.Column('days', sa.Float(), nullable=False),
+    sa.Column('balance_after', sa.Float(), nullable=False),
+    sa.Column('leave_request_id', sa.Integer(), nullable=True),
+    sa.Column('actor_user_id', sa.Integer(), nullable=True),
+    sa.Column('note', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['category_id'], ['leave_category.id'], ),
+    sa.ForeignKeyConstraint(['leave_request_id'], ['leave_request.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_leave_ledger_entry_key', 'leave_ledger_entry', ['user_id', 'year', 'category_id', 'id'], unique=False)
+    op.create_index(op.f('ix_leave_ledger_entry_leave_request_id'), 'leave_ledger_entry', ['leave_request_id'], unique=False)
+
+    # Backfill: one DEBIT per already-approved leave, against the year it starts in
+    if op.get_bind().dialect.name == 'postgresql':
+        year = "CAST(EXTRACT(YEAR FROM start_date) AS INTEGER)"
+        now = "now()"
+    else:
+        year = "CAST(strftime('%Y', start_date) AS INTEGER)"
+        now = "CURRENT_TIMESTAMP"
+    op.execute(
+        "INSERT INTO leave_ledger_entry "
+        "(user_id, year, category_id, kind, days, balance_after, leave_request_id, note, created_at) "
+        f"SELECT user_id, {year}, category_id, 'DEBIT', -total_days, "
+        f"-SUM(total_days) OVER (PARTITION BY user_id, {year}, category_id ORDER BY id), "
+        f"id, 'Approved before the balance ledger', COALESCE(approved_at, created_at) "
+        "FROM leave_request WHERE status = 'APPROVED'"
+    )
+    op.execute(
+        "INSERT INTO leave_balance (user_id, year, category_id, entitled, used, balance, updated_at) "
+        f"SELECT user_id, {year}, category_id, 0, SUM(total_days), -SUM(total_days), {now} "
+        f"FROM leave_request WHERE status = 'APPROVED' GROUP BY user_id, {year}, category_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_leave_ledger_entry_leave_request_id'), table_name='leave_ledger_entry')
+    op.drop_index('ix_leave_ledger_entry_key', table_name='leave_ledger_entry')
+    op.drop_table('leave_ledger_entry')
+    op.drop_table('leave_balance')
+    sa.Enum(name='ledgerentrykind').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,59 @@
+"""Add user_hierarchy closure table
+
+Revision ID: 2e8b5a1c7f03
+Revises: 1c7d3f9a2e64
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8b5a1c7f03'
+down_revision = '1c7d3f9a2e64'
+branch_labels = None
+depends_on = None
+
+# Every (manager, report) pair reachable through user.manager_id. The depth cap
+# only stops a corrupt cycle from recursing forever; cycles are rejected below.
+CHAIN = (
+    "WITH RECURSIVE chain(ancestor_id, descendant_id, depth) AS ("
+    " SELECT manager_id, id, 1 FROM \"user\" WHERE manager_id IS NOT NULL"
+    " UNION ALL"
+    " SELECT u.manager_id, c.descendant_id, c.depth + 1 FROM chain c"
+    " JOIN \"user\" u ON u.id = c.ancestor_id"
+    " WHERE u.manager_id IS NOT NULL AND c.ancestor_id <> c.descendant_id AND c.depth < 64"
+    ") "
+)
+
+
+def upgrade() -> None:
+    op.create_table('user_hierarchy',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['descendant_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_user_hierarchy_descendant_id', 'user_hierarchy', ['descendant_id', 'ancestor_id'], unique=False)
+
+    cycles = op.get_bind().execute(sa.text(
+        CHAIN + "SELECT DISTINCT descendant_id FROM chain WHERE ancestor_id = descendant_id ORDER BY 1 LIMIT 50"
+    )).scalars().all()
+    if cycles:
+        raise RuntimeError(
+            f"manager_id forms a reporting cycle for user(s) {', '.join(map(str, cycles))}; fix it first"
+        )
+
+    op.execute(
+        CHAIN + "INSERT INTO user_hierarchy (ancestor_id, descendant_id, depth) "
+        "SELECT ancestor_id, descendant_id, depth FROM chain"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_hierarchy_descendant_id', table_name='user_hierarchy')
+    op.drop_table('user_hierarchy')
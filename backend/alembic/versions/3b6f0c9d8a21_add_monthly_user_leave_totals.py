@@ -0,0 +1,67 @@
+"""Add monthly_user_leave_totals
+
+Revision ID: 3b6f0c9d8a21
+Revises: 7e9a8f4c2d1b
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+import calendar
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '3b6f0c9d8a21'
+down_revision = '7e9a8f4c2d1b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    totals = op.create_table('monthly_user_leave_totals',
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('chargeable', sa.Boolean(), nullable=False),
+    sa.Column('total_days', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('year', 'month', 'user_id', 'chargeable')
+    )
+
+    # Backfill from existing APPROVED leaves (calendar-day split).
+    # 8d2f4b6a1e53 re-apportions it by business days once the calendar exists.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT user_id, start_date, end_date, total_days, cached_chargeable_status "
+        "FROM leave_request WHERE status = 'APPROVED'"
+    ))
+    backfill = {}
+    for user_id, start_date, end_date, total_days, chargeable in rows:
+        for year, month, days in split_leave_by_month(start_date, end_date, total_days):
+            key = (year, month, user_id, bool(chargeable))
+            backfill[key] = backfill.get(key, 0.0) + days
+
+    if backfill:
+        op.bulk_insert(totals, [
+            {'year': y, 'month': m, 'user_id': u, 'chargeable': c, 'total_days': d}
+            for (y, m, u, c), d in backfill.items()
+        ])
+
+
+def split_leave_by_month(start_date, end_date, total_days):
+    if isinstance(start_date, str):
+        start_date, end_date = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    span = (end_date - start_date).days + 1
+    cursor = start_date
+    while cursor <= end_date:
+        _, last_day = calendar.monthrange(cursor.year, cursor.month)
+        clipped_end = min(date(cursor.year, cursor.month, last_day), end_date)
+        yield cursor.year, cursor.month, total_days * ((clipped_end - cursor).days + 1) / span
+        cursor = clipped_end + timedelta(days=1)
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_user_leave_totals')
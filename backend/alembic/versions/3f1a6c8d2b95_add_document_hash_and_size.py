@@ -0,0 +1,28 @@
+"""Add document sha256 and size_bytes
+
+Revision ID: 3f1a6c8d2b95
+Revises: 2e8b5a1c7f03
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a6c8d2b95'
+down_revision = '2e8b5a1c7f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing documents keep NULLs; they don't count towards the per-leave byte quota
+    op.add_column('document', sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+    op.add_column('document', sa.Column('size_bytes', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('document', 'size_bytes')
+    op.drop_column('document', 'sha256')
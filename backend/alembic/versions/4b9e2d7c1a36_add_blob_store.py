@@ -0,0 +1,75 @@
+"""Add content-addressed blob store
+
+Revision ID: 4b9e2d7c1a36
+Revises: 3f1a6c8d2b95
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision = '4b9e2d7c1a36'
+down_revision = '3f1a6c8d2b95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('blob',
+    sa.Column('sha256', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('path', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('released_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index(
+        'ix_blob_unreferenced', 'blob', ['released_at'], unique=False,
+        postgresql_where=sa.text("refcount <= 0"),
+        sqlite_where=sa.text("refcount <= 0"),
+    )
+
+    # Hashed uploads from before the blob store become blobs in place: the first
+    # copy of each content is kept and the other documents are pointed at it.
+    # Files uploaded before hashing (sha256 NULL) keep their own path.
+    op.execute(
+        "INSERT INTO blob (sha256, size_bytes, path, refcount, created_at) "
+        "SELECT sha256, MAX(size_bytes), MIN(file_path), COUNT(*), MIN(created_at) "
+        "FROM document WHERE sha256 IS NOT NULL GROUP BY sha256"
+    )
+    superseded = op.get_bind().execute(sa.text(
+        "SELECT COUNT(*) FROM document JOIN blob ON blob.sha256 = document.sha256 "
+        "WHERE document.file_path <> blob.path"
+    )).scalar()
+    op.execute(
+        "UPDATE document SET file_path = (SELECT path FROM blob WHERE blob.sha256 = document.sha256) "
+        "WHERE sha256 IS NOT NULL"
+    )
+    if superseded:
+        # Deleting them here could not be rolled back with the transaction
+        logger.warning(
+            "%s duplicate upload(s) now point at a shared copy; "
+            "run `python gc_blobs.py` after upgrading to delete the superseded files.", superseded
+        )
+
+    op.create_index(op.f('ix_document_leave_request_id'), 'document', ['leave_request_id'], unique=False)
+    op.create_index(op.f('ix_document_sha256'), 'document', ['sha256'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_foreign_key('document_sha256_fkey', 'document', 'blob', ['sha256'], ['sha256'])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('document_sha256_fkey', 'document', type_='foreignkey')
+    op.drop_index(op.f('ix_document_sha256'), table_name='document')
+    op.drop_index(op.f('ix_document_leave_request_id'), table_name='document')
+    op.drop_index('ix_blob_unreferenced', table_name='blob')
+    op.drop_table('blob')
@@ -0,0 +1,67 @@
+"""Rebuild monthly_user_leave_totals by business days
+
+Revision ID: 8d2f4b6a1e53
+Revises: 4b9e2d7c1a36
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from types import SimpleNamespace
+
+from alembic import op
+import sqlalchemy as sa
+from sqlmodel import Session
+
+from app.routers.finance import split_leaves_by_month
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f4b6a1e53'
+down_revision = '4b9e2d7c1a36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 3b6f0c9d8a21 backfilled the totals split by calendar days; the app splits
+    # by business days of CALENDAR_REGION (CAL-001), public holidays included.
+    # Re-apportion with the app's own code so later increments cancel out exactly.
+    leave_request = sa.table('leave_request',
+        sa.column('user_id', sa.Integer()),
+        sa.column('start_date', sa.Date()),
+        sa.column('end_date', sa.Date()),
+        sa.column('total_days', sa.Float()),
+        sa.column('cached_chargeable_status', sa.Boolean()),
+        sa.column('status', sa.String()),
+    )
+    totals = sa.table('monthly_user_leave_totals',
+        sa.column('year', sa.Integer()),
+        sa.column('month', sa.Integer()),
+        sa.column('user_id', sa.Integer()),
+        sa.column('chargeable', sa.Boolean()),
+        sa.column('total_days', sa.Float()),
+    )
+
+    bind = op.get_bind()
+    leaves = [
+        SimpleNamespace(**row._mapping)
+        for row in bind.execute(
+            sa.select(
+                leave_request.c.user_id, leave_request.c.start_date, leave_request.c.end_date,
+                leave_request.c.total_days, leave_request.c.cached_chargeable_status,
+            ).where(leave_request.c.status == 'APPROVED')
+        )
+    ]
+    with Session(bind=bind) as session:
+        rebuilt = split_leaves_by_month(session, leaves)
+
+    op.execute(totals.delete())
+    if rebuilt:
+        op.bulk_insert(totals, [
+            {'year': y, 'month': m, 'user_id': u, 'chargeable': c, 'total_days': d}
+            for (y, m, u, c), d in rebuilt.items()
+        ])
+
+
+def downgrade() -> None:
+    # The business-day split is as valid on the previous revision
+    pass
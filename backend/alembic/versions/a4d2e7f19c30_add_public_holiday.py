@@ -0,0 +1,34 @@
+"""Add public_holiday
+
+Revision ID: a4d2e7f19c30
+Revises: 3b6f0c9d8a21
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d2e7f19c30'
+down_revision = '3b6f0c9d8a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('public_holiday',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('region', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('holiday_date', sa.Date(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('region', 'holiday_date')
+    )
+    op.create_index(op.f('ix_public_holiday_region'), 'public_holiday', ['region'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_public_holiday_region'), table_name='public_holiday')
+    op.drop_table('public_holiday')
@@ -0,0 +1,47 @@
+"""Add vendor and rate_card
+
+Revision ID: c81e5a3b7d42
+Revises: a4d2e7f19c30
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e5a3b7d42'
+down_revision = 'a4d2e7f19c30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('vendor',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('currency', sqlmodel.sql.sqltypes.AutoString(length=3), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    # Reuse the existing 'userrole' enum type created with the user table
+    op.create_table('rate_card',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('role', sa.Enum('CONTRACTOR', 'MANAGER', 'ADMIN', name='userrole', create_type=False), nullable=True),
+    sa.Column('daily_rate', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('effective_from', sa.Date(), nullable=False),
+    sa.Column('effective_to', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendor.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rate_card_vendor_id'), 'rate_card', ['vendor_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_rate_card_vendor_id'), table_name='rate_card')
+    op.drop_table('rate_card')
+    op.drop_table('vendor')
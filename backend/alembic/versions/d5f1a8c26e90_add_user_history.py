@@ -0,0 +1,54 @@
+"""Add user_history
+
+Revision ID: d5f1a8c26e90
+Revises: c81e5a3b7d42
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f1a8c26e90'
+down_revision = 'c81e5a3b7d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('valid_from', sa.Date(), nullable=False),
+    sa.Column('valid_to', sa.Date(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=True),
+    sa.Column('department', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('manager_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_history_user_id_valid_from', 'user_history', ['user_id', 'valid_from'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_user_history_period ON user_history "
+            "USING gist (daterange(valid_from, valid_to, '[]'))"
+        )
+
+    # Nothing earlier is known, so every user's current state is taken to have
+    # held since the beginning. Past months therefore report as they do today.
+    op.get_bind().execute(sa.text(
+        "INSERT INTO user_history (user_id, valid_from, valid_to, is_active, vendor_id, department, manager_id) "
+        "SELECT id, :epoch, NULL, is_active, vendor_id, department, manager_id FROM \"user\""
+    ), {"epoch": date(1970, 1, 1)})
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX ix_user_history_period")
+    op.drop_index('ix_user_history_user_id_valid_from', table_name='user_history')
+    op.drop_table('user_history')
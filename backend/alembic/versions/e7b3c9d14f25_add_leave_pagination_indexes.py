@@ -0,0 +1,33 @@
+"""Add leave_request pagination indexes
+
+Revision ID: e7b3c9d14f25
+Revises: d5f1a8c26e90
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c9d14f25'
+down_revision = 'd5f1a8c26e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_leave_request_created_at_id', 'leave_request', ['created_at', 'id'], unique=False)
+    op.create_index('ix_leave_request_user_id_created_at', 'leave_request', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_leave_request_status_created_at', 'leave_request', ['status', 'created_at', 'id'], unique=False)
+    # Department/manager filters join user -> leave_request on user_id;
+    # department is already indexed, manager_id was not.
+    op.create_index(op.f('ix_user_manager_id'), 'user', ['manager_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_manager_id'), table_name='user')
+    op.drop_index('ix_leave_request_status_created_at', table_name='leave_request')
+    op.drop_index('ix_leave_request_user_id_created_at', table_name='leave_request')
+    op.drop_index('ix_leave_request_created_at_id', table_name='leave_request')
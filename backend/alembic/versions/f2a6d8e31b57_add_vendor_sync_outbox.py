@@ -0,0 +1,45 @@
+"""Add vendor_sync_outbox
+
+Revision ID: f2a6d8e31b57
+Revises: e7b3c9d14f25
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6d8e31b57'
+down_revision = 'e7b3c9d14f25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('vendor_sync_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('leave_request_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'DONE', 'DEAD', name='outboxstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['leave_request_id'], ['leave_request.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_vendor_sync_outbox_leave_request_id'), 'vendor_sync_outbox', ['leave_request_id'], unique=False)
+    op.create_index(
+        'ix_vendor_sync_outbox_due', 'vendor_sync_outbox', ['next_attempt_at'], unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+        sqlite_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vendor_sync_outbox_due', table_name='vendor_sync_outbox')
+    op.drop_index(op.f('ix_vendor_sync_outbox_leave_request_id'), table_name='vendor_sync_outbox')
+    op.drop_table('vendor_sync_outbox')
+    sa.Enum(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,103 @@
+"""
+Redis helpers (settings.REDIS_URL): versioned cache entries and hit/miss counters.
+
+Redis is only an accelerator. If it is unreachable every helper degrades to a
+cache miss / no-op, so the API keeps working straight off Postgres.
+"""
+import logging
+import time
+from typing import Iterable, List, Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis.from_url(
+    settings.REDIS_URL,
+    socket_connect_timeout=0.5,
+    socket_timeout=0.5,
+)
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60  # Superseded versions simply age out
+RETRY_AFTER_SECONDS = 30  # After a failure, don't pay the connect timeout on every request
+
+_down_until = 0.0
+
+
+def _available() -> bool:
+    return time.monotonic() >= _down_until
+
+
+def _mark_down(e: Exception):
+    global _down_until
+    _down_until = time.monotonic() + RETRY_AFTER_SECONDS
+    logger.warning("Redis unavailable, bypassing cache for %ss: %s", RETRY_AFTER_SECONDS, e)
+
+
+def get_versions(names: Iterable[str]) -> Optional[List[int]]:
+    """Current value of each version counter (0 if never bumped). None if Redis is down."""
+    names = list(names)
+    if not _available():
+        return None
+    try:
+        values = redis_client.mget([f"version:{name}" for name in names])
+    except redis.RedisError as e:
+        _mark_down(e)
+        return None
+    return [int(v) if v is not None else 0 for v in values]
+
+
+def bump_versions(names: Iterable[str]):
+    """
+    Invalidates every cache entry built on these versions.
+    Call AFTER commit, so a concurrent reader can't cache pre-commit data under the new version.
+    """
+    names = list(names)
+    if not names:
+        return
+    # Deliberately not gated on _available(): a missed bump could serve stale data later
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for name in names:
+            pipe.incr(f"version:{name}")
+        pipe.execute()
+    except redis.RedisError as e:
+        _mark_down(e)
+
+
+def cache_get(key: str) -> Optional[bytes]:
+    if not _available():
+        return None
+    try:
+        return redis_client.get(f"cache:{key}")
+    except redis.RedisError as e:
+        _mark_down(e)
+        return None
+
+
+def cache_set(key: str, value: bytes, ttl: int = DEFAULT_TTL_SECONDS):
+    if not _available():
+        return
+    try:
+        redis_client.set(f"cache:{key}", value, ex=ttl)
+    except redis.RedisError as e:
+        _mark_down(e)
+
+
+def record_lookup(namespace: str, hit: bool):
+    if not _available():
+        return
+    try:
+        redis_client.incr(f"stats:{namespace}:{'hits' if hit else 'misses'}")
+    except redis.RedisError as e:
+        _mark_down(e)
+
+
+def get_stats(namespace: str) -> dict:
+    try:
+        hits, misses = redis_client.mget(f"stats:{namespace}:hits", f"stats:{namespace}:misses")
+    except redis.RedisError:
+        return {"available": False, "hits": 0, "misses": 0}
+    return {"available": True, "hits": int(hits or 0), "misses": int(misses or 0)}
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 import json
 
 class Settings(BaseSettings):
@@ -21,6 +21,31 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://redis:6379/0"
     UPLOAD_DIR: str = "/app/uploads"
 
+    # Finance
+    EXPORT_CHUNK_SIZE: int = 1000  # Rows per chunk when streaming CSV exports
+
+    # Vendor HR Sync (SYNC-002)
+    VENDOR_SYNC_URL: Optional[str] = None  # Unset = simulated vendor (local dev)
+    VENDOR_SYNC_BATCH_SIZE: int = 50  # Leaves per vendor call; 1 if the vendor API has no batch endpoint
+    VENDOR_SYNC_TIMEOUT: float = 10.0  # Seconds per vendor call
+    VENDOR_SYNC_MAX_ATTEMPTS: int = 8  # Then the outbox row is marked DEAD
+    VENDOR_SYNC_BACKOFF_SECONDS: float = 30.0  # First retry delay; doubles per attempt
+    VENDOR_SYNC_MAX_BACKOFF_SECONDS: float = 3600.0
+
+    # Attachments
+    MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024  # Per file; keep nginx client_max_body_size in step
+    MAX_LEAVE_UPLOAD_BYTES: int = 100 * 1024 * 1024  # All documents on one leave
+    MAX_DOCUMENTS_PER_LEAVE: int = 20
+    # Set to nginx's internal location over UPLOAD_DIR (e.g. "/_uploads/") to serve
+    # downloads with X-Accel-Redirect instead of streaming them through Python
+    DOWNLOAD_ACCEL_PREFIX: Optional[str] = None
+    PREVIEW_WORKERS: int = 2  # Process pool size for thumbnail rendering (0 = no previews)
+
+    # Business Calendar
+    CALENDAR_REGION: str = "DEFAULT"
+    # Mon..Sun, '1' = working day. Regions not listed fall back to DEFAULT.
+    WEEKEND_MASKS: Dict[str, str] = {"DEFAULT": "1111100"}
+
     model_config = SettingsConfigDict(
         case_sensitive=False,
         extra="ignore"
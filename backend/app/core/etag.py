@@ -0,0 +1,86 @@
+"""
+Conditional GETs: weak ETags built from the Redis version counters in cache.py.
+
+A read endpoint names the versions its response depends on and anything else that
+shapes the body (query params, the caller). If the client's If-None-Match still
+matches, it answers 304 before touching the database or serialising anything.
+Write paths bump the versions AFTER commit, exactly like the report cache.
+
+If Redis is down there is no ETag, so every request is served in full.
+"""
+import hashlib
+import json
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+from app.core.cache import bump_versions, get_versions
+
+ETAG_HEADER = "ETag"
+# Let browsers keep the body, but always revalidate it
+CACHE_CONTROL = "private, no-cache"
+
+# Version names
+ALL_LEAVES = "etag:leaves"
+ALL_USERS = "etag:users"
+
+
+def user_leaves_version(user_id: int) -> str:
+    return f"etag:leaves:user:{user_id}"
+
+
+def leave_version(leave_id: int) -> str:
+    return f"etag:leave:{leave_id}"
+
+
+def user_version(user_id: int) -> str:
+    return f"etag:user:{user_id}"
+
+
+def compute_etag(versions: Iterable[str], *parts) -> Optional[str]:
+    """Weak ETag over the current value of `versions` plus `parts`. None if Redis is down."""
+    values = get_versions(versions)
+    if values is None:
+        return None
+    digest = hashlib.sha1(json.dumps([values, parts], default=str).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """True if the request's If-None-Match lists `etag` (or is `*`). Weak comparison."""
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def conditional_response(request: Request, response: Response, etag: Optional[str]) -> Optional[Response]:
+    """
+    Returns a bare 304 if the client's copy is current. Otherwise stamps the
+    validator on `response` and returns None, and the endpoint builds the body.
+    """
+    if etag is None:
+        return None
+    headers = {ETAG_HEADER: etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def invalidate_leave_etags(user_leave_ids: Iterable[tuple]):
+    """Bumps the versions behind every cached view of these (user_id, leave_id) pairs."""
+    names = {ALL_LEAVES}
+    for user_id, leave_id in user_leave_ids:
+        names.add(user_leaves_version(user_id))
+        if leave_id is not None:
+            names.add(leave_version(leave_id))
+    bump_versions(sorted(names))
+
+
+def invalidate_user_etags(user_id: int):
+    """A profile edit changes /users/me and every leave or audit view that embeds the user."""
+    bump_versions([ALL_USERS, user_version(user_id)])
@@ -0,0 +1,174 @@
+"""
+Background report jobs on the Redis we already deploy (no extra broker).
+
+A job is a Redis hash `job:{id}`; its id is pushed onto the `jobs:queue` list
+and a worker (`python -m app.worker`) moves it to its own
+`jobs:processing:{worker}` list while it runs. Identical requests share one job
+through a `job:dedup:{digest}` pointer. Finished artifacts are written under
+UPLOAD_DIR/reports.
+
+Each worker holds a lease, `jobs:worker:{worker}`, that a heartbeat renews
+every LEASE_SECONDS / 3. Only the processing lists of workers whose lease has
+expired (crashed or killed) are put back on the queue, so a restart or a second
+worker never re-runs a job that a live worker is still running.
+"""
+import hashlib
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+import redis
+
+from app.core.cache import redis_client
+from app.core.config import settings
+
+ARTIFACT_DIR = os.path.join(settings.UPLOAD_DIR, "reports")
+
+QUEUE_KEY = "jobs:queue"
+PROCESSING_KEY = "jobs:processing"  # One list per worker: jobs:processing:{worker_id}
+WORKERS_KEY = "jobs:workers"
+JOB_TTL_SECONDS = 7 * 24 * 60 * 60
+LEASE_SECONDS = 60
+
+
+class JobStatus:
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class JobQueueUnavailable(Exception):
+    """Raised when Redis can't be reached; the API maps it to 503."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def job_digest(kind: str, params: dict) -> str:
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def enqueue_job(kind: str, params: dict, dedup_token: str = "") -> dict:
+    """
+    Creates and queues a job, unless an identical one (same kind, params and
+    dedup_token) is already queued, running or done, in which case that job is
+    returned instead. A FAILED job is replaced by a fresh one.
+    """
+    dedup_key = f"job:dedup:{job_digest(kind, params)}:{dedup_token}"
+    job_id = uuid.uuid4().hex
+    try:
+        if not redis_client.set(dedup_key, job_id, nx=True, ex=JOB_TTL_SECONDS):
+            existing_id = redis_client.get(dedup_key)
+            existing = get_job(existing_id.decode()) if existing_id else None
+            if existing and existing["status"] != JobStatus.FAILED:
+                return existing
+            redis_client.set(dedup_key, job_id, ex=JOB_TTL_SECONDS)
+
+        pipe = redis_client.pipeline()
+        pipe.hset(_job_key(job_id), mapping={
+            "id": job_id,
+            "kind": kind,
+            "params": json.dumps(params),
+            "status": JobStatus.QUEUED,
+            "progress": 0,
+            "created_at": _now(),
+        })
+        pipe.expire(_job_key(job_id), JOB_TTL_SECONDS)
+        pipe.lpush(QUEUE_KEY, job_id)
+        pipe.execute()
+    except redis.RedisError as e:
+        raise JobQueueUnavailable(str(e))
+    return get_job(job_id)
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    try:
+        raw = redis_client.hgetall(_job_key(job_id))
+    except redis.RedisError as e:
+        raise JobQueueUnavailable(str(e))
+    if not raw:
+        return None
+    job = {k.decode(): v.decode() for k, v in raw.items()}
+    job["params"] = json.loads(job["params"])
+    job["progress"] = int(job.get("progress", 0))
+    return job
+
+
+def update_job(job_id: str, **fields):
+    redis_client.hset(_job_key(job_id), mapping={k: v for k, v in fields.items() if v is not None})
+
+
+def _processing_key(worker_id: str) -> str:
+    return f"{PROCESSING_KEY}:{worker_id}"
+
+
+def _lease_key(worker_id: str) -> str:
+    return f"jobs:worker:{worker_id}"
+
+
+def register_worker() -> str:
+    """Takes a lease for a new worker id. Renew it with renew_lease() before it expires."""
+    worker_id = uuid.uuid4().hex
+    renew_lease(worker_id)
+    redis_client.sadd(WORKERS_KEY, worker_id)
+    return worker_id
+
+
+def renew_lease(worker_id: str):
+    redis_client.set(_lease_key(worker_id), _now(), ex=LEASE_SECONDS)
+
+
+def dequeue_job(worker_id: str, timeout: int = 5) -> Optional[str]:
+    """Blocks up to `timeout` seconds; the id stays in the worker's processing list until finish_job()."""
+    job_id = redis_client.blmove(QUEUE_KEY, _processing_key(worker_id), timeout, "RIGHT", "LEFT")
+    return job_id.decode() if job_id else None
+
+
+def finish_job(worker_id: str, job_id: str):
+    redis_client.lrem(_processing_key(worker_id), 0, job_id)
+
+
+def requeue_interrupted_jobs() -> int:
+    """
+    Puts the jobs of workers whose lease expired back on the queue and forgets
+    those workers. Live workers keep theirs. LMOVE is atomic, so workers
+    running this at the same time never requeue a job twice.
+    """
+    count = 0
+    for raw_id in redis_client.smembers(WORKERS_KEY):
+        worker_id = raw_id.decode()
+        if redis_client.exists(_lease_key(worker_id)):
+            continue
+        while redis_client.lmove(_processing_key(worker_id), QUEUE_KEY, "RIGHT", "LEFT"):
+            count += 1
+        redis_client.srem(WORKERS_KEY, worker_id)
+    return count
+
+
+def artifact_path(job_id: str, extension: str) -> str:
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    return os.path.join(ARTIFACT_DIR, f"{job_id}.{extension}")
+
+
+def purge_expired_artifacts() -> int:
+    """Deletes artifacts older than the job records that point at them."""
+    if not os.path.isdir(ARTIFACT_DIR):
+        return 0
+    cutoff = time.time() - JOB_TTL_SECONDS
+    removed = 0
+    for name in os.listdir(ARTIFACT_DIR):
+        path = os.path.join(ARTIFACT_DIR, name)
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
@@ -0,0 +1,138 @@
+"""
+Attachment thumbnails and previews (DOC-001).
+
+After an upload commits, the API hands the blob to a process pool that renders
+small WebP derivatives of images and of a PDF's first page. They are cached
+next to the blob as `<sha256>.<size>.webp`, so a file attached many times is
+rendered once and the blob GC removes them with it. Rendering never runs on
+the request path: a preview that is missing (not rendered yet, or the pool
+was restarted) is scheduled again when it is first asked for.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.storage import TEMP_SUFFIX, derivative_path, media_type_for
+
+logger = logging.getLogger("app.previews")
+
+# Longest edge in pixels
+PREVIEW_SIZES: Dict[str, int] = {"thumb": 256, "page": 1280}
+WEBP_QUALITY = 80
+PREVIEWABLE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/bmp", "image/tiff", "application/pdf"}
+
+
+def can_preview(filename: str) -> bool:
+    return media_type_for(filename) in PREVIEWABLE_TYPES
+
+
+# --- Rendering (runs in the pool's worker processes) ---
+
+def _open_first_page(path: str, media_type: str, longest_edge: int):
+    from PIL import Image, ImageOps
+
+    if media_type == "application/pdf":
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            page = pdf[0]
+            scale = longest_edge / max(page.get_size())  # Page size is in points
+            return page.render(scale=scale).to_pil()
+        finally:
+            pdf.close()
+
+    image = Image.open(path)
+    image.draft("RGB", (longest_edge, longest_edge))  # JPEG: decode at a reduced scale
+    image.seek(0)  # First frame of a GIF / multi-page TIFF
+    return ImageOps.exif_transpose(image)
+
+
+def render_previews(path: str, media_type: str) -> List[str]:
+    """
+    Renders every missing derivative of the file at `path`; returns the paths
+    written. Each is written to a temp file and renamed, so readers never see
+    a partial image. Pure function of its arguments: safe to run in a pool.
+    """
+    missing = {size: px for size, px in PREVIEW_SIZES.items() if not os.path.exists(derivative_path(path, size))}
+    if not missing:
+        return []
+
+    # Render the largest once and shrink it for the others
+    image = _open_first_page(path, media_type, max(missing.values()))
+    image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+    written = []
+    for size, px in sorted(missing.items(), key=lambda item: -item[1]):
+        image.thumbnail((px, px))
+        target = derivative_path(path, size)
+        tmp_path = os.path.join(os.path.dirname(path), f".{uuid.uuid4().hex}{TEMP_SUFFIX}")
+        try:
+            image.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        written.append(target)
+    return written
+
+
+# --- Scheduling (API process) ---
+
+_preview_pool: Optional[ProcessPoolExecutor] = None
+_in_flight: Dict[str, asyncio.Future] = {}
+_failed: Set[str] = set()  # Not retried until the process restarts
+
+def get_preview_pool() -> Optional[ProcessPoolExecutor]:
+    """Lazily created, shared across requests. None means previews are disabled."""
+    global _preview_pool
+    if settings.PREVIEW_WORKERS <= 0:
+        return None
+    if _preview_pool is None:
+        _preview_pool = ProcessPoolExecutor(max_workers=settings.PREVIEW_WORKERS)
+    return _preview_pool
+
+def shutdown_preview_pool():
+    global _preview_pool
+    if _preview_pool is not None:
+        _preview_pool.shutdown(wait=False, cancel_futures=True)
+        _preview_pool = None
+    _in_flight.clear()
+    _failed.clear()
+
+
+def _finished(path: str, future: asyncio.Future):
+    _in_flight.pop(path, None)
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        # Corrupt or unsupported files just have no preview
+        _failed.add(path)
+        logger.warning("Preview rendering failed for %s: %r", path, error)
+
+
+def schedule_previews(path: str, filename: str) -> Optional[asyncio.Future]:
+    """
+    Queues rendering of the file's derivatives without waiting for it. Calls
+    for a file already queued share its future. Returns None if the file type
+    has no previews or previews are disabled.
+    """
+    if not can_preview(filename) or path in _failed:
+        return None
+    if path in _in_flight:
+        return _in_flight[path]
+    pool = get_preview_pool()
+    if pool is None:
+        return None
+    future = asyncio.get_running_loop().run_in_executor(pool, render_previews, path, media_type_for(filename))
+    _in_flight[path] = future
+    future.add_done_callback(lambda done: _finished(path, done))
+    return future
@@ -7,6 +7,7 @@ from app.models import User
 from sqlmodel import Session, select
 import ssl
 import certifi
+from datetime import date
 
 # 1. Configuration
 CLERK_JWKS_URL = settings.CLERK_JWKS_URL
@@ -85,8 +86,11 @@ def get_current_user(
             full_name=full_name,
             role="CONTRACTOR" # Default role
         )
+        from app.routers.users import record_user_history # Deferred: routers import this module
         try:
             session.add(user)
+            session.flush()
+            record_user_history(session, user, date.today())
             session.commit()
             session.refresh(user)
         except Exception as e:
@@ -0,0 +1,350 @@
+"""
+Attachment storage under UPLOAD_DIR (DOC-001).
+
+Uploads are streamed: the UploadFile is read in UPLOAD_CHUNK_BYTES chunks that
+are hashed (SHA-256), counted and written to a temp file off the event loop,
+so a 20 MB certificate never sits in worker memory.
+
+Files are content-addressed: UPLOAD_DIR/blobs/ab/cd/abcd... holds one copy per
+distinct content, tracked by a `blob` row whose refcount is the number of
+Documents pointing at it. Attaching a file that is already stored only inserts
+a Document and bumps the refcount.
+
+Ordering with the garbage collector:
+- An upload upserts the blob row (taking its row lock) BEFORE renaming its temp
+  file onto the blob path, and the rename is unconditional. A GC pass that
+  deleted the row and file just before is therefore undone by the rename.
+- GC deletes a row and unlinks its file while holding the row lock, and skips
+  rows that are locked, recently released, or referenced again.
+- Files with no row (an upload that failed to commit) are swept once older
+  than the grace period, as are pre-blob-store uploads (`<uuid>.<ext>` at the
+  top of UPLOAD_DIR) that no document or blob points at any more (the
+  duplicates the blob backfill migration repointed away from).
+- Derivatives (`<path>.<size>.webp` previews) go with the file they were
+  rendered from, whether a blob under blobs/ or a legacy upload.
+"""
+import glob
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import BinaryIO, Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, update
+from sqlmodel import Session, select
+
+from app.models import Blob, Document
+
+logger = logging.getLogger("app.storage")
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+BLOB_DIR = "blobs"
+TEMP_SUFFIX = ".part"
+GC_GRACE = timedelta(hours=1)  # Longer than any upload takes between rename and commit
+# Pre-blob-store uploads were saved as UPLOAD_DIR/<uuid4>.<ext>; previews add .<size>.webp
+LEGACY_UPLOAD_NAME = re.compile(
+    r"^(?P<upload>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[^.]+)(\.[\w-]+\.webp)?$"
+)
+
+
+@dataclass
+class StoredFile:
+    path: str
+    sha256: str
+    size: int
+
+
+def blob_root(upload_dir: str) -> str:
+    return os.path.join(upload_dir, BLOB_DIR)
+
+
+def blob_path(upload_dir: str, sha256: str) -> str:
+    """Sharded two levels deep so no directory grows past 65k entries."""
+    return os.path.join(blob_root(upload_dir), sha256[:2], sha256[2:4], sha256)
+
+
+def derivative_path(path: str, size: str) -> str:
+    """A rendered preview of the blob at `path`, kept (and collected) with it."""
+    return f"{path}.{size}.webp"
+
+
+# --- Streaming ---
+
+def _write_chunk(out: BinaryIO, digest, chunk: bytes):
+    # hashlib releases the GIL on large buffers, so this runs truly in parallel
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _finish(out: BinaryIO):
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+
+
+def _discard(out: BinaryIO, tmp_path: str):
+    out.close()
+    discard_temp(tmp_path)
+
+
+def discard_temp(tmp_path: str):
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def receive_upload(file: UploadFile, directory: str, max_bytes: int) -> StoredFile:
+    """
+    Streams `file` into a temp file in `directory` (returned as `path`; the
+    caller moves it into place). Raises 413 as soon as more than `max_bytes`
+    have arrived, and leaves nothing behind on failure.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}{TEMP_SUFFIX}")
+
+    digest = hashlib.sha256()
+    size = 0
+    out = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes} byte limit")
+            await run_in_threadpool(_write_chunk, out, digest, chunk)
+        await run_in_threadpool(_finish, out)
+    except BaseException:
+        await run_in_threadpool(_discard, out, tmp_path)
+        raise
+    return StoredFile(path=tmp_path, sha256=digest.hexdigest(), size=size)
+
+
+def place_blob(tmp_path: str, path: str):
+    """Atomically moves a received temp file onto its blob path (same filesystem)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+
+
+# --- Reference counting ---
+
+def _upsert(session: Session):
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def acquire_blob(session: Session, sha256: str, size: int, path: str, count: int = 1):
+    """
+    Adds `count` references to the blob, creating its row if needed. The row
+    stays locked until the caller commits, which keeps GC away from it.
+    Note: We do not commit here. The caller commits together with the Document.
+    """
+    table = Blob.__table__
+    statement = _upsert(session)(table).values(
+        sha256=sha256, size_bytes=size, path=path, refcount=count,
+        created_at=datetime.now(timezone.utc), released_at=None,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.sha256],
+        set_={"refcount": table.c.refcount + count, "released_at": None},
+    )
+    session.execute(statement)
+
+
+def release_blob(session: Session, sha256: str, count: int = 1):
+    """Drops `count` references; a blob left with none becomes eligible for GC. Does not commit."""
+    table = Blob.__table__
+    session.execute(
+        update(table)
+        .where(table.c.sha256 == sha256)
+        .values(
+            refcount=table.c.refcount - count,
+            released_at=case((table.c.refcount - count <= 0, datetime.now(timezone.utc)), else_=None),
+        )
+    )
+
+
+# --- Garbage collection ---
+
+@dataclass
+class GcReport:
+    blobs_deleted: int = 0
+    orphans_deleted: int = 0
+    legacy_deleted: int = 0
+    bytes_freed: int = 0
+
+
+def _unlink(path: str) -> int:
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def _unlink_blob(path: str) -> int:
+    freed = _unlink(path)
+    for derivative in glob.glob(glob.escape(path) + ".*"):
+        freed += _unlink(derivative)
+    return freed
+
+
+def collect_garbage(session: Session, upload_dir: str, grace: timedelta = GC_GRACE,
+                    dry_run: bool = False, batch_size: int = 500) -> GcReport:
+    """
+    Deletes blobs unreferenced for longer than `grace`, then stray files under
+    blobs/ (no row, or abandoned temp files) and unreferenced legacy uploads,
+    older than `grace`.
+    """
+    report = GcReport()
+    cutoff = datetime.now(timezone.utc) - grace
+
+    # 1. Unreferenced blobs, in batches, each row locked while its file goes
+    unreferenced = (
+        select(Blob)
+        .where(Blob.refcount <= 0)
+        .where(Blob.released_at < cutoff)
+        .order_by(Blob.released_at)
+        .limit(batch_size)
+    )
+    if dry_run:
+        for blob in session.exec(unreferenced.limit(None)):
+            report.blobs_deleted += 1
+            report.bytes_freed += blob.size_bytes
+    else:
+        while True:
+            blobs = session.exec(unreferenced.with_for_update(skip_locked=True)).all()
+            if not blobs:
+                break
+            for blob in blobs:
+                report.bytes_freed += _unlink_blob(blob.path)
+                report.blobs_deleted += 1
+                session.delete(blob)
+            session.commit()
+
+    # 2. Files under blobs/ that no row owns
+    root = blob_root(upload_dir)
+    cutoff_ts = cutoff.timestamp()
+    for dirpath, _, filenames in os.walk(root):
+        stale = {}
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(path) < cutoff_ts:
+                    stale[name] = path
+            except FileNotFoundError:
+                continue
+        if not stale:
+            continue
+        owners = {name: name.split(".", 1)[0] for name in stale}  # Derivatives share their blob's name
+        known = set(session.exec(select(Blob.sha256).where(Blob.sha256.in_(set(owners.values())))).all())
+        for name, path in stale.items():
+            if owners[name] in known:
+                continue
+            report.orphans_deleted += 1
+            report.bytes_freed += os.path.getsize(path) if dry_run else _unlink(path)
+
+    # 3. Legacy uploads (UPLOAD_DIR/<uuid>.<ext>) nothing points at, with their
+    # previews. New documents never get such paths, so one snapshot of the
+    # references is safe. Anything else at the top of UPLOAD_DIR is left alone.
+    legacy = []
+    with os.scandir(upload_dir) as entries:
+        for entry in entries:
+            match = LEGACY_UPLOAD_NAME.match(entry.name)
+            if match is None:
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff_ts:
+                    legacy.append((match.group("upload"), entry.path))
+            except FileNotFoundError:
+                continue
+    if legacy:
+        referenced = {
+            os.path.basename(path)
+            for statement in (
+                select(Document.file_path).where(Document.file_path.notlike(f"%{os.sep}{BLOB_DIR}{os.sep}%")),
+                select(Blob.path).where(Blob.path.notlike(f"%{os.sep}{BLOB_DIR}{os.sep}%")),
+            )
+            for path in session.exec(statement)
+        }
+        for upload, path in legacy:
+            if upload in referenced:  # Derivatives go with the upload they were rendered from
+                continue
+            report.legacy_deleted += 1
+            report.bytes_freed += os.path.getsize(path) if dry_run else _unlink(path)
+
+    if report.blobs_deleted or report.orphans_deleted or report.legacy_deleted:
+        logger.info("Blob GC%s: %s", " (dry run)" if dry_run else "", report)
+    return report
+
+
+# --- Serving ---
+
+def media_type_for(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+# Gain nothing from deflate: stored as-is in ZIP bundles
+COMPRESSED_TYPES = {"application/pdf", "application/zip", "application/gzip", "application/x-7z-compressed"}
+
+def is_compressible(filename: str) -> bool:
+    media_type = media_type_for(filename)
+    if media_type.startswith(("image/", "video/", "audio/")):
+        return media_type in {"image/bmp", "image/tiff", "image/svg+xml"}
+    return media_type not in COMPRESSED_TYPES and "openxmlformats" not in media_type
+
+
+def content_disposition(filename: str) -> str:
+    """attachment; filename=..., RFC 5987-encoded when not plain ASCII (as FileResponse does)."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def file_validators(sha256: Optional[str], stat_result: os.stat_result) -> dict:
+    """
+    ETag and Last-Modified for a stored file. Content-addressed files use their
+    hash, a strong validator that survives re-uploads; older uploads fall back
+    to Starlette's mtime-size digest.
+    """
+    if sha256:
+        etag = f'"{sha256}"'
+    else:
+        base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+        etag = f'"{hashlib.md5(base.encode(), usedforsecurity=False).hexdigest()}"'
+    return {"ETag": etag, "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True)}
+
+
+def is_not_modified(request: Request, validators: dict, stat_result: os.stat_result) -> bool:
+    """If-None-Match wins; If-Modified-Since is only consulted without it."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or validators["ETag"] in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def accel_redirect_path(upload_dir: str, path: str, prefix: str) -> Optional[str]:
+    """The nginx-internal URI for a file under upload_dir, or None if it lives elsewhere."""
+    relative = os.path.relpath(os.path.realpath(path), os.path.realpath(upload_dir))
+    if relative.startswith(".."):
+        return None
+    return prefix.rstrip("/") + "/" + quote(relative.replace(os.sep, "/"))
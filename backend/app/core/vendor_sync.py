@@ -0,0 +1,208 @@
+"""
+Vendor HR sync (SYNC-002) through a transactional outbox.
+
+Approving a leave inserts a `vendor_sync_outbox` row in the same commit
+(enqueue_vendor_sync), so the approval never waits on the vendor. The sync
+worker (`python -m app.sync_worker`) claims due rows, posts them to the vendor
+in per-vendor batches over one pooled HTTP client, and records the outcome on
+the leave. Failed rows are retried with exponential backoff.
+
+Vendor API (VENDOR_SYNC_URL):
+    POST {VENDOR_SYNC_URL}/leaves/batch
+    {"vendor_id": 7, "leaves": [{"leave_id": 1, "email": ..., "start_date": ..., ...}]}
+ -> {"results": [{"leave_id": 1, "reference_id": "..."} | {"leave_id": 1, "error": "..."}]}
+"""
+import logging
+import random
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import LeaveRequest, LeaveStatus, OutboxStatus, SyncStatus, User, VendorSyncOutbox
+
+logger = logging.getLogger("app.vendor_sync")
+
+# A claimed row becomes due again after this long, in case its worker died mid-call
+CLAIM_LEASE = timedelta(minutes=5)
+
+# (reference_id, error) per leave_id
+DeliveryResults = Dict[int, Tuple[Optional[str], Optional[str]]]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_vendor_sync(session: Session, leave: LeaveRequest):
+    """
+    Queues an approved leave for delivery to the vendor.
+    Note: We do not commit here. The row must commit together with the approval.
+    """
+    leave.external_sync_status = SyncStatus.NOT_SYNCED
+    session.add(VendorSyncOutbox(leave_request_id=leave.id))
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter: ~base, 2x base, 4x base ... capped."""
+    delay = min(
+        settings.VENDOR_SYNC_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.VENDOR_SYNC_MAX_BACKOFF_SECONDS,
+    )
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+class VendorSyncClient:
+    """
+    One pooled, keep-alive HTTP client per worker. Without VENDOR_SYNC_URL the
+    vendor is simulated (local dev), as the inline mock used to do.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None):
+        self.base_url = base_url if base_url is not None else settings.VENDOR_SYNC_URL
+        self.http = None
+        if self.base_url:
+            self.http = httpx.Client(
+                base_url=self.base_url,
+                timeout=timeout or settings.VENDOR_SYNC_TIMEOUT,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            )
+
+    def send_batch(self, vendor_id: Optional[int], leaves: List[dict]) -> DeliveryResults:
+        """
+        Delivers one vendor's leaves in a single call. Transport and HTTP errors
+        raise httpx.HTTPError; per-leave rejections come back in the results.
+        """
+        if self.http is None:
+            for leave in leaves:
+                logger.info(" >>> [SYNC] Pushing Leave %s for User %s to Vendor API...", leave["leave_id"], leave["email"])
+            return {leave["leave_id"]: (f"VENDOR-{uuid.uuid4().hex[:8].upper()}", None) for leave in leaves}
+
+        response = self.http.post("/leaves/batch", json={"vendor_id": vendor_id, "leaves": leaves})
+        response.raise_for_status()
+        results: DeliveryResults = {}
+        for item in response.json().get("results", []):
+            results[int(item["leave_id"])] = (item.get("reference_id"), item.get("error"))
+        # Anything the vendor left out counts as failed
+        for leave in leaves:
+            results.setdefault(leave["leave_id"], (None, "No result returned by vendor"))
+        return results
+
+    def close(self):
+        if self.http is not None:
+            self.http.close()
+
+
+def claim_due_entries(session: Session, limit: int) -> List[Tuple[int, int, dict, Optional[int]]]:
+    """
+    Claims up to `limit` due PENDING rows: bumps their attempt count and pushes
+    next_attempt_at out by CLAIM_LEASE, then commits, so the vendor call runs
+    outside any transaction. SKIP LOCKED lets several workers drain in parallel.
+    Returns (outbox_id, attempts, payload, vendor_id) tuples.
+    """
+    now = _now()
+    rows = session.exec(
+        select(VendorSyncOutbox, LeaveRequest, User)
+        .join(LeaveRequest, LeaveRequest.id == VendorSyncOutbox.leave_request_id)
+        .join(User, User.id == LeaveRequest.user_id)
+        .where(VendorSyncOutbox.status == OutboxStatus.PENDING)
+        .where(VendorSyncOutbox.next_attempt_at <= now)
+        .order_by(VendorSyncOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=VendorSyncOutbox)
+    ).all()
+
+    claimed = []
+    for entry, leave, user in rows:
+        entry.attempts += 1
+        entry.next_attempt_at = now + CLAIM_LEASE
+        session.add(entry)
+
+        if leave.status != LeaveStatus.APPROVED:
+            # Cancelled or rejected before we got to it: nothing to tell the vendor
+            entry.status = OutboxStatus.DONE
+            entry.processed_at = now
+            entry.last_error = f"Skipped: leave is {leave.status.value}"
+            continue
+
+        claimed.append((entry.id, entry.attempts, {
+            "leave_id": leave.id,
+            "email": user.email,
+            "start_date": leave.start_date.isoformat(),
+            "end_date": leave.end_date.isoformat(),
+            "total_days": leave.total_days,
+            "chargeable": leave.cached_chargeable_status,
+        }, user.vendor_id))
+    session.commit()
+    return claimed
+
+
+def record_results(session: Session, claimed: List[Tuple[int, int, dict, Optional[int]]], results: DeliveryResults):
+    """Writes delivery outcomes to the outbox rows and their leaves, in one commit."""
+    entries = {
+        entry.id: entry
+        for entry in session.exec(
+            select(VendorSyncOutbox).where(VendorSyncOutbox.id.in_([c[0] for c in claimed]))
+        )
+    }
+    leaves = {
+        leave.id: leave
+        for leave in session.exec(
+            select(LeaveRequest).where(LeaveRequest.id.in_([c[2]["leave_id"] for c in claimed]))
+        )
+    }
+
+    now = _now()
+    for outbox_id, attempts, payload, _ in claimed:
+        entry, leave = entries[outbox_id], leaves[payload["leave_id"]]
+        reference_id, error = results[payload["leave_id"]]
+        if reference_id and not error:
+            entry.status = OutboxStatus.DONE
+            entry.processed_at = now
+            entry.last_error = None
+            leave.external_sync_status = SyncStatus.SYNCED
+            leave.external_reference_id = reference_id
+        else:
+            entry.last_error = error
+            leave.external_sync_status = SyncStatus.ERROR
+            if attempts >= settings.VENDOR_SYNC_MAX_ATTEMPTS:
+                entry.status = OutboxStatus.DEAD
+                entry.processed_at = now
+                logger.error("Giving up on leave %s after %s attempts: %s", leave.id, attempts, error)
+            else:
+                entry.next_attempt_at = now + backoff_delay(attempts)
+        session.add(entry)
+        session.add(leave)
+    session.commit()
+
+
+def drain_vendor_outbox(client: VendorSyncClient, limit: int = 500) -> int:
+    """
+    One pass of the sync worker: claims due rows and delivers them in
+    per-vendor batches of VENDOR_SYNC_BATCH_SIZE. Returns the number of rows claimed.
+    """
+    with Session(engine) as session:
+        claimed = claim_due_entries(session, limit)
+
+        by_vendor = defaultdict(list)
+        for entry in claimed:
+            by_vendor[entry[3]].append(entry)
+
+        batch_size = max(settings.VENDOR_SYNC_BATCH_SIZE, 1)
+        for vendor_id, entries in by_vendor.items():
+            for i in range(0, len(entries), batch_size):
+                batch = entries[i:i + batch_size]
+                payloads = [entry[2] for entry in batch]
+                try:
+                    results = client.send_batch(vendor_id, payloads)
+                except httpx.HTTPError as e:
+                    logger.warning("Vendor %s sync call failed: %s", vendor_id, e)
+                    results = {p["leave_id"]: (None, str(e) or type(e).__name__) for p in payloads}
+                record_results(session, batch, results)
+
+    return len(claimed)
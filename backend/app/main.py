@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import users, leaves, finance, audit, webhooks
+from app.routers import users, leaves, finance, audit, webhooks, holidays, vendors, imports, balances
 from app.core.config import settings
+from app.core.previews import shutdown_preview_pool
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
@@ -11,6 +12,7 @@ async def lifespan(app: FastAPI):
         from app.core.database import create_db_and_tables
         create_db_and_tables()
     yield
+    shutdown_preview_pool()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -28,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"], # Keyset pagination of GET /leaves; conditional GETs
 )
 
 # --- 2. REGISTER ROUTERS ---
@@ -36,6 +39,10 @@ app.include_router(leaves.router, prefix="/leaves", tags=["Leaves"])
 app.include_router(finance.router, prefix="/finance", tags=["Finance"])
 app.include_router(audit.router, prefix="/audit", tags=["Audit"])
 app.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
+app.include_router(holidays.router, prefix="/holidays", tags=["Calendar"])
+app.include_router(vendors.router, prefix="/vendors", tags=["Vendors"])
+app.include_router(imports.router, prefix="/imports", tags=["Imports"])
+app.include_router(balances.router, prefix="/balances", tags=["Balances"])
 
 # --- 3. HEALTH CHECK ---
 @app.get("/health", tags=["System"])
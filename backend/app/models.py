@@ -1,7 +1,10 @@
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, date, timezone
+from decimal import Decimal
 from enum import Enum
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import DDL, Index, UniqueConstraint, event, func, literal_column, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 
 # Prevent circular import errors during static analysis
 if TYPE_CHECKING:
@@ -25,6 +28,17 @@ class SyncStatus(str, Enum):
     SYNCED = "SYNCED"
     ERROR = "ERROR"
 
+class OutboxStatus(str, Enum):
+    PENDING = "PENDING" # Waiting for (another) delivery attempt
+    DONE = "DONE"
+    DEAD = "DEAD" # Gave up after VENDOR_SYNC_MAX_ATTEMPTS
+
+class LedgerEntryKind(str, Enum):
+    ACCRUAL = "ACCRUAL" # Entitlement granted
+    DEBIT = "DEBIT" # Leave approved
+    CREDIT = "CREDIT" # Approved leave rejected or cancelled
+    ADJUSTMENT = "ADJUSTMENT" # Manual correction, either sign
+
 class AuditAction(str, Enum):
     CREATE = "CREATE"
     UPDATE = "UPDATE"
@@ -46,7 +60,7 @@ class User(SQLModel, table=True):
     role: UserRole = Field(default=UserRole.CONTRACTOR)
     vendor_id: Optional[int] = Field(default=None, description="Vendor Company ID for billing grouping")
     department: Optional[str] = Field(default=None, index=True)
-    manager_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    manager_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
     is_active: bool = Field(default=True)
     
     # Relationships
@@ -71,6 +85,22 @@ class LeaveCategory(SQLModel, table=True):
 
 class LeaveRequest(SQLModel, table=True):
     __tablename__ = "leave_request"
+    __table_args__ = (
+        # Keyset pagination of GET /leaves: one index per filter shape, each
+        # ending in the (created_at, id) sort key so any page is an index range.
+        Index("ix_leave_request_created_at_id", "created_at", "id"),
+        Index("ix_leave_request_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_leave_request_status_created_at", "status", "created_at", "id"),
+        # LEAVE-002: A user's PENDING/APPROVED leaves may not overlap. The GiST
+        # index behind this constraint also serves the API's overlap pre-check.
+        ExcludeConstraint(
+            (literal_column("user_id"), "="),
+            (func.daterange(literal_column("start_date"), literal_column("end_date"), literal_column("'[]'")), "&&"),
+            where=text("status IN ('PENDING', 'APPROVED')"),
+            using="gist",
+            name="ex_leave_request_no_overlap",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     
@@ -108,6 +138,14 @@ class LeaveRequest(SQLModel, table=True):
     documents: List["Document"] = Relationship(back_populates="leave_request")
 
 
+# "user_id WITH =" inside a GiST exclusion constraint needs btree_gist
+event.listen(
+    LeaveRequest.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+
 class AuditLog(SQLModel, table=True):
     """
     AUDIT-004: Immutable log of changes.
@@ -133,23 +171,234 @@ class AuditLog(SQLModel, table=True):
     actor: User = Relationship(back_populates="audit_logs")
 
 
+class Blob(SQLModel, table=True):
+    """
+    DOC-001: One stored file per distinct content, shared by every Document with
+    that SHA-256. refcount counts those Documents and moves in the same
+    transaction as they are added or removed; blobs that drop to 0 are deleted
+    by `python gc_blobs.py` after a grace period.
+    """
+    __tablename__ = "blob"
+    __table_args__ = (
+        # GC only ever looks for unreferenced blobs
+        Index(
+            "ix_blob_unreferenced", "released_at",
+            postgresql_where=text("refcount <= 0"),
+            sqlite_where=text("refcount <= 0"),
+        ),
+    )
+
+    sha256: str = Field(primary_key=True, max_length=64)
+    size_bytes: int
+    path: str = Field(description="UPLOAD_DIR/blobs/<2>/<2>/<sha256> (or a pre-dedup upload path)")
+    refcount: int = Field(default=0)
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    released_at: Optional[datetime] = Field(default=None, description="When refcount last reached 0")
+
+
 class Document(SQLModel, table=True):
     """
     Stores metadata for uploaded files linked to a leave request.
-    Files are stored in the persistent volume.
+    Files are stored in the persistent volume, as shared content-addressed blobs.
     """
     __tablename__ = "document"
 
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Foreign Keys
-    leave_request_id: int = Field(foreign_key="leave_request.id")
+    leave_request_id: int = Field(foreign_key="leave_request.id", index=True)
     
     filename: str = Field(description="Original filename or UUID-based name")
-    file_path: str = Field(description="Path on disk inside the container")
+    file_path: str = Field(description="Path on disk inside the container (the blob's path)")
+    sha256: Optional[str] = Field(default=None, foreign_key="blob.sha256", index=True, max_length=64, description="Hex digest, computed while streaming the upload")
+    size_bytes: Optional[int] = None
     
     # Meta
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     # Relationships
     leave_request: LeaveRequest = Relationship(back_populates="documents")
+
+
+class MonthlyUserLeaveTotal(SQLModel, table=True):
+    """
+    FIN-005: Approved leave days per user and month, split by chargeable snapshot.
+    Maintained incrementally on every approval transition so reconciliation is
+    a primary-key range read instead of a scan over leave_request.
+    """
+    __tablename__ = "monthly_user_leave_totals"
+
+    # Key order matters: (year, month) first so a month is one contiguous PK range
+    year: int = Field(primary_key=True)
+    month: int = Field(primary_key=True)
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    chargeable: bool = Field(primary_key=True)
+
+    total_days: float = Field(default=0.0)
+
+
+class PublicHoliday(SQLModel, table=True):
+    """
+    CAL-001: Non-working days per region.
+    Weekends are not stored here; they come from settings.WEEKEND_MASKS.
+    """
+    __tablename__ = "public_holiday"
+    __table_args__ = (UniqueConstraint("region", "holiday_date"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    region: str = Field(index=True, description="Calendar region code, e.g. 'DEFAULT'")
+    holiday_date: date
+    name: str
+
+
+class Vendor(SQLModel, table=True):
+    """
+    FIN-006: Vendor companies we are invoiced by. User.vendor_id refers to Vendor.id.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(unique=True)
+    currency: str = Field(default="SGD", max_length=3)
+
+    # Relationships
+    rate_cards: List["RateCard"] = Relationship(back_populates="vendor")
+
+
+class RateCard(SQLModel, table=True):
+    """
+    FIN-006: Daily rates with effective dates.
+    Precedence when pricing a user: user-specific > role-specific > vendor default
+    (both user_id and role empty).
+    """
+    __tablename__ = "rate_card"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    vendor_id: int = Field(foreign_key="vendor.id", index=True)
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    role: Optional[UserRole] = Field(default=None)
+
+    daily_rate: Decimal = Field(max_digits=12, decimal_places=2)
+    effective_from: date
+    effective_to: Optional[date] = Field(default=None, description="Inclusive; open-ended if empty")
+
+    # Relationships
+    vendor: Vendor = Relationship(back_populates="rate_cards")
+
+
+class UserHistory(SQLModel, table=True):
+    """
+    FIN-007: Effective-dated copy of the User fields that drive reconciliation.
+    Rows for one user never overlap; the open row (valid_to empty) mirrors the
+    current User. Written by PATCH /users/{id} and JIT provisioning.
+    """
+    __tablename__ = "user_history"
+    __table_args__ = (
+        Index("ix_user_history_user_id_valid_from", "user_id", "valid_from"),
+        # Interval index: "who was on the books in month X" stays an index probe
+        # however long the history grows. Postgres only; SQLite uses the btree above.
+        Index(
+            "ix_user_history_period",
+            func.daterange(literal_column("valid_from"), literal_column("valid_to"), literal_column("'[]'")),
+            postgresql_using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    valid_from: date
+    valid_to: Optional[date] = Field(default=None, description="Inclusive; open-ended if empty")
+
+    is_active: bool
+    vendor_id: Optional[int] = None
+    department: Optional[str] = None
+    manager_id: Optional[int] = None
+
+
+class UserHierarchy(SQLModel, table=True):
+    """
+    ORG-001: Closure table of the reporting lines in User.manager_id. One row per
+    (manager, report) pair at any depth (1 = direct report); users are not their
+    own ancestors. Rewritten for the moved subtree whenever PATCH /users/{id}
+    changes manager_id, so "everyone under X" is one primary-key range.
+    """
+    __tablename__ = "user_hierarchy"
+    __table_args__ = (
+        # Reverse direction: "who is above Y" when moving Y's subtree
+        Index("ix_user_hierarchy_descendant_id", "descendant_id", "ancestor_id"),
+    )
+
+    ancestor_id: int = Field(foreign_key="user.id", primary_key=True)
+    descendant_id: int = Field(foreign_key="user.id", primary_key=True)
+    depth: int
+
+
+class VendorSyncOutbox(SQLModel, table=True):
+    """
+    SYNC-002: Transactional outbox for the vendor HR sync. A row is written in
+    the same commit as the approval; the sync worker (`python -m app.sync_worker`)
+    delivers it and updates the leave's external_sync_status.
+    """
+    __tablename__ = "vendor_sync_outbox"
+    __table_args__ = (
+        # The worker only ever looks for due PENDING rows
+        Index(
+            "ix_vendor_sync_outbox_due", "next_attempt_at",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    leave_request_id: int = Field(foreign_key="leave_request.id", index=True)
+
+    status: OutboxStatus = Field(default=OutboxStatus.PENDING)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    processed_at: Optional[datetime] = None
+
+
+class LeaveBalance(SQLModel, table=True):
+    """
+    LEAVE-003: Materialised running balance per user, year and category.
+    Updated in the same transaction as every leave_ledger_entry it summarises,
+    so reading a user's balances is a primary-key prefix lookup.
+    """
+    __tablename__ = "leave_balance"
+
+    # Key order matters: (user_id, year) first so "my balances this year" is one PK range
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    year: int = Field(primary_key=True)
+    category_id: int = Field(foreign_key="leave_category.id", primary_key=True)
+
+    entitled: float = Field(default=0.0) # Accruals and adjustments
+    used: float = Field(default=0.0) # Debits net of credits
+    balance: float = Field(default=0.0) # entitled - used
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class LeaveLedgerEntry(SQLModel, table=True):
+    """
+    LEAVE-003: Append-only history behind leave_balance. Rows are never updated
+    or deleted; a reversal is a new CREDIT or ADJUSTMENT row.
+    """
+    __tablename__ = "leave_ledger_entry"
+    __table_args__ = (
+        Index("ix_leave_ledger_entry_key", "user_id", "year", "category_id", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    year: int
+    category_id: int = Field(foreign_key="leave_category.id")
+
+    kind: LedgerEntryKind
+    days: float = Field(description="Signed change to the balance")
+    balance_after: float = Field(description="Running balance including this entry")
+
+    leave_request_id: Optional[int] = Field(default=None, foreign_key="leave_request.id", index=True)
+    actor_user_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    note: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1,10 +1,12 @@
 from typing import List, Optional
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session, select
+from sqlalchemy import insert
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_session
+from app.core.etag import ALL_USERS, compute_etag, conditional_response, leave_version
 from app.core.security import get_current_user
 from app.models import AuditLog, User, UserRole, LeaveRequest
 
@@ -57,6 +59,28 @@ def create_audit_log(
     # Note: We do not commit here. We let the parent transaction commit.
     # This ensures if the Leave Request update fails, the Audit Log isn't saved orphaned.
 
+def create_audit_logs(session: Session, entries: List[dict]):
+    """
+    Batch form of create_audit_log(): one multi-row INSERT for many entries,
+    each a dict of create_audit_log()'s keyword arguments (minus session).
+    Same rule: the parent transaction commits.
+    """
+    if not entries:
+        return
+    rows = []
+    for entry in entries:
+        old_value, new_value = entry.get("old_value"), entry.get("new_value")
+        rows.append(dict(
+            leave_request_id=entry["leave_request_id"],
+            actor_user_id=entry["actor_user_id"],
+            action=entry["action"],
+            field_changed=entry.get("field_changed"),
+            old_value=str(old_value) if old_value is not None else None,
+            new_value=str(new_value) if new_value is not None else None,
+            timestamp=datetime.now(timezone.utc),
+        ))
+    session.execute(insert(AuditLog).values(rows))
+
 # --- API ENDPOINTS (Read Only) ---
 
 @router.get("/", response_model=List[AuditLogRead])
@@ -92,6 +116,8 @@ async def get_all_audit_logs(
 @router.get("/leave/{leave_request_id}", response_model=List[AuditLogRead])
 async def get_leave_history(
     leave_request_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
@@ -111,7 +137,13 @@ async def get_leave_history(
     if not (is_owner or is_manager):
         raise HTTPException(status_code=403, detail="Not authorized to view this history")
 
-    # 2. Fetch Logs
+    # 2. Unchanged since the client's copy? Every write to the leave bumps its version
+    etag = compute_etag([leave_version(leave_request_id), ALL_USERS], leave_request_id)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    # 3. Fetch Logs
     statement = (
         select(AuditLog)
         .where(AuditLog.leave_request_id == leave_request_id)
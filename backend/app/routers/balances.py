@@ -0,0 +1,253 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select
+from sqlalchemy import insert, tuple_
+
+from app.core.database import get_session
+from app.core.security import get_current_user
+from app.models import LeaveBalance, LeaveCategory, LeaveLedgerEntry, LedgerEntryKind, User, UserRole
+from app.routers.audit import create_audit_log
+from app.routers.holidays import to_date
+
+# --- DTOs ---
+from sqlmodel import SQLModel, Field
+
+class LeaveBalanceRead(SQLModel):
+    user_id: int
+    year: int
+    category_id: int
+    category_name: str
+    entitled: float
+    used: float
+    balance: float
+
+class LedgerEntryRead(SQLModel):
+    id: int
+    user_id: int
+    year: int
+    category_id: int
+    kind: LedgerEntryKind
+    days: float
+    balance_after: float
+    leave_request_id: Optional[int] = None
+    actor_user_id: Optional[int] = None
+    note: Optional[str] = None
+    created_at: datetime
+
+class LedgerPostItem(SQLModel):
+    user_id: int
+    category_id: int
+    year: int
+    days: float # Added to the balance; ADJUSTMENT may be negative
+    kind: LedgerEntryKind = LedgerEntryKind.ACCRUAL # ACCRUAL or ADJUSTMENT
+    note: Optional[str] = None
+
+class LedgerPostBatch(SQLModel):
+    items: List[LedgerPostItem] = Field(min_length=1, max_length=1000)
+
+router = APIRouter()
+
+# --- HELPER: Balance Ledger (LEAVE-003) ---
+LedgerKey = Tuple[int, int, int] # (user_id, year, category_id)
+
+ENTITLEMENT_KINDS = (LedgerEntryKind.ACCRUAL, LedgerEntryKind.ADJUSTMENT)
+
+def leave_ledger_entries(changes, actor_user_id: Optional[int], note: Optional[str] = None) -> List[dict]:
+    """
+    Ledger entries for (leave, sign) pairs as returned by apply_status_transition():
+    +1 (approved) debits the leave's days, -1 (approval reversed) credits them back.
+    A leave counts against the year it starts in.
+    """
+    return [
+        dict(
+            user_id=leave.user_id,
+            year=to_date(leave.start_date).year,
+            category_id=leave.category_id,
+            kind=LedgerEntryKind.DEBIT if sign > 0 else LedgerEntryKind.CREDIT,
+            days=-sign * leave.total_days,
+            leave_request_id=getattr(leave, "id", None),
+            actor_user_id=actor_user_id,
+            note=note,
+        )
+        for leave, sign in changes if sign
+    ]
+
+
+def post_ledger_entries(session: Session, entries: List[dict]):
+    """
+    Appends entries to leave_ledger_entry and moves leave_balance with them.
+    Balances are netted per key and written in one multi-row upsert (in key
+    order, so concurrent postings lock rows in the same order); its RETURNING
+    values give each entry its running balance_after.
+    Note: We do not commit here. The caller commits together with the Audit Log.
+    """
+    if not entries:
+        return
+
+    deltas: Dict[LedgerKey, List[float]] = defaultdict(lambda: [0.0, 0.0]) # [entitled, used]
+    for entry in entries:
+        key = (entry["user_id"], entry["year"], entry["category_id"])
+        if entry["kind"] in ENTITLEMENT_KINDS:
+            deltas[key][0] += entry["days"]
+        else:
+            deltas[key][1] -= entry["days"]
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+
+    now = datetime.now(timezone.utc)
+    table = LeaveBalance.__table__
+    statement = upsert(table).values([
+        dict(user_id=user_id, year=year, category_id=category_id,
+             entitled=entitled, used=used, balance=entitled - used, updated_at=now)
+        for (user_id, year, category_id), (entitled, used) in sorted(deltas.items())
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.year, table.c.category_id],
+        set_={
+            "entitled": table.c.entitled + statement.excluded.entitled,
+            "used": table.c.used + statement.excluded.used,
+            "balance": table.c.balance + statement.excluded.balance,
+            "updated_at": statement.excluded.updated_at,
+        },
+    ).returning(table.c.user_id, table.c.year, table.c.category_id, table.c.balance)
+    running = {(user_id, year, category_id): balance for user_id, year, category_id, balance in session.execute(statement)}
+
+    # Walk back from the final balances to each entry's balance_after
+    rows = []
+    for entry in reversed(entries):
+        key = (entry["user_id"], entry["year"], entry["category_id"])
+        rows.append(dict(
+            user_id=entry["user_id"],
+            year=entry["year"],
+            category_id=entry["category_id"],
+            kind=entry["kind"],
+            days=entry["days"],
+            balance_after=running[key],
+            leave_request_id=entry.get("leave_request_id"),
+            actor_user_id=entry.get("actor_user_id"),
+            note=entry.get("note"),
+            created_at=now,
+        ))
+        running[key] -= entry["days"]
+    rows.reverse()
+    session.execute(insert(LeaveLedgerEntry.__table__), rows)
+
+
+def balances_statement(user_id: int, year: int):
+    """A user's balances for one year: a leave_balance primary-key prefix lookup."""
+    return (
+        select(LeaveBalance, LeaveCategory.name)
+        .join(LeaveCategory, LeaveCategory.id == LeaveBalance.category_id)
+        .where(LeaveBalance.user_id == user_id)
+        .where(LeaveBalance.year == year)
+        .order_by(LeaveBalance.category_id)
+    )
+
+
+def to_balance_read(balance: LeaveBalance, category_name: str) -> LeaveBalanceRead:
+    return LeaveBalanceRead(category_name=category_name, **balance.model_dump(exclude={"updated_at"}))
+
+
+def read_balances(session: Session, user_id: int, year: int) -> List[LeaveBalanceRead]:
+    return [to_balance_read(balance, name) for balance, name in session.exec(balances_statement(user_id, year))]
+
+
+def ensure_can_view_balances(current_user: User, user_id: int):
+    if current_user.id != user_id and current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+
+# --- API ENDPOINTS ---
+
+@router.get("/", response_model=List[LeaveBalanceRead])
+async def get_balances(
+    user_id: int,
+    year: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """A user's balances per category. Contractors can only see their own (see also /users/me/balances)."""
+    ensure_can_view_balances(current_user, user_id)
+    return read_balances(session, user_id, year or date.today().year)
+
+
+@router.get("/ledger", response_model=List[LedgerEntryRead])
+async def get_ledger(
+    user_id: int,
+    year: Optional[int] = None,
+    category_id: Optional[int] = None,
+    offset: int = 0,
+    limit: int = Query(default=100, le=500),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """The entries behind a balance, oldest first."""
+    ensure_can_view_balances(current_user, user_id)
+
+    statement = (
+        select(LeaveLedgerEntry)
+        .where(LeaveLedgerEntry.user_id == user_id)
+        .where(LeaveLedgerEntry.year == (year or date.today().year))
+        .order_by(LeaveLedgerEntry.category_id, LeaveLedgerEntry.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    if category_id:
+        statement = statement.where(LeaveLedgerEntry.category_id == category_id)
+    return session.exec(statement).all()
+
+
+@router.post("/entries", response_model=List[LeaveBalanceRead])
+async def post_balance_entries(
+    batch: LedgerPostBatch,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Admins grant entitlements (ACCRUAL) or correct balances (ADJUSTMENT), e.g.
+    the yearly allowance for every user in one call. DEBIT and CREDIT entries
+    only come from the leave workflow.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    for item in batch.items:
+        if item.kind not in ENTITLEMENT_KINDS:
+            raise HTTPException(status_code=400, detail="Only ACCRUAL and ADJUSTMENT entries can be posted")
+        if item.kind == LedgerEntryKind.ACCRUAL and item.days <= 0:
+            raise HTTPException(status_code=400, detail="Accruals must be positive; use ADJUSTMENT to reduce a balance")
+
+    user_ids = {item.user_id for item in batch.items}
+    category_ids = {item.category_id for item in batch.items}
+    if len(session.exec(select(User.id).where(User.id.in_(user_ids))).all()) != len(user_ids):
+        raise HTTPException(status_code=404, detail="User not found")
+    if len(session.exec(select(LeaveCategory.id).where(LeaveCategory.id.in_(category_ids))).all()) != len(category_ids):
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    post_ledger_entries(session, [
+        dict(item.model_dump(), actor_user_id=current_user.id) for item in batch.items
+    ])
+    create_audit_log(
+        session=session,
+        leave_request_id=None,
+        actor_user_id=current_user.id,
+        action="CREATE",
+        field_changed="leave_balance",
+        new_value=f"Posted {len(batch.items)} ledger entries for {len(user_ids)} user(s)"
+    )
+    session.commit()
+
+    keys = sorted({(item.user_id, item.year, item.category_id) for item in batch.items})
+    rows = session.exec(
+        select(LeaveBalance, LeaveCategory.name)
+        .join(LeaveCategory, LeaveCategory.id == LeaveBalance.category_id)
+        .where(tuple_(LeaveBalance.user_id, LeaveBalance.year, LeaveBalance.category_id).in_(keys))
+        .order_by(LeaveBalance.user_id, LeaveBalance.year, LeaveBalance.category_id)
+    )
+    return [to_balance_read(balance, name) for balance, name in rows]
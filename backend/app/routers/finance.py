@@ -1,18 +1,34 @@
 import csv
 import io
-from typing import List, Optional
-from datetime import date, datetime
+import os
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 import calendar
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlmodel import Session, select, col
+from pydantic import TypeAdapter
+from sqlalchemy import and_, case, delete, func, or_, tuple_
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 
-from app.core.database import get_session
+from app.core.config import settings
+from app.core.database import engine, get_session
+from app.core.cache import bump_versions, cache_get, cache_set, get_stats, get_versions, record_lookup
+from app.core.exports import COLUMNAR_FORMATS, iter_columnar
+from app.core.jobs import JobQueueUnavailable, JobStatus, artifact_path, enqueue_job, get_job
 from app.core.security import get_current_user
-from app.models import User, LeaveRequest, LeaveStatus, UserRole, LeaveCategory
+from app.routers.audit import create_audit_logs
+from app.routers.balances import post_ledger_entries
+from app.routers.holidays import get_business_calendar, to_date
+from app.routers.vendors import VendorInvoice, VendorInvoiceTotal, generate_vendor_invoices, summarize_invoices
+from app.models import User, LeaveRequest, LeaveStatus, LedgerEntryKind, UserRole, LeaveCategory, MonthlyUserLeaveTotal, UserHistory
 
 # --- DTOs ---
-from sqlmodel import SQLModel
+from sqlmodel import SQLModel, Field
 
 class FinanceReportRow(SQLModel):
     """
@@ -29,8 +45,48 @@ class FinanceReportRow(SQLModel):
 
 class FinanceSummary(SQLModel):
     report_month: str
-    total_invoice_amount: float # Placeholder if we had rates
+    invoice_totals: Dict[str, Decimal] = {} # Sum of vendor_totals per currency (FIN-006)
     rows: List[FinanceReportRow]
+    vendor_totals: List[VendorInvoiceTotal] = []
+
+class MonthlyLeaveCell(SQLModel):
+    """One month of one user in a multi-month report."""
+    month: str                # "YYYY-MM"
+    total_working_days: int
+    chargeable_leave: float
+    non_chargeable_leave: float
+    total_billable_days: float
+
+class RangeReportRow(SQLModel):
+    user_id: int
+    full_name: str
+    vendor_id: Optional[int]
+    months: List[MonthlyLeaveCell]
+    total_billable_days: float # Sum across the whole range
+
+class RangeSummary(SQLModel):
+    report_from: str
+    report_to: str
+    months: List[str]
+    rows: List[RangeReportRow]
+
+class ReportJobCreate(SQLModel):
+    kind: str = Field(regex="^(reconciliation|invoice|export)$")
+    year: int
+    month: int = Field(ge=1, le=12)
+    working_days: Optional[int] = None
+    format: str = Field(default="csv", regex="^(csv|parquet|arrow)$") # export only
+
+class ReportJobRead(SQLModel):
+    id: str
+    kind: str
+    status: str
+    progress: int
+    params: dict
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+    created_at: str
+    finished_at: Optional[str] = None
 
 router = APIRouter()
 
@@ -42,7 +98,461 @@ def get_month_date_range(year: int, month: int):
     end_date = date(year, month, last_day)
     return start_date, end_date
 
+def iter_months(first: Tuple[int, int], last: Tuple[int, int]) -> Iterator[Tuple[int, int]]:
+    """Yields every (year, month) from first to last inclusive."""
+    year, month = first
+    while (year, month) <= last:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def parse_year_month(value: str) -> Tuple[int, int]:
+    """Parses 'YYYY-MM' into (year, month), raising 400 on bad input."""
+    try:
+        parsed = datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid month '{value}', expected YYYY-MM")
+    return parsed.year, parsed.month
+
+def resolve_working_days(session: Session, year: int, month: int, override: Optional[int] = None) -> int:
+    """Potential working days for a month: the caller's override, else the business calendar."""
+    if override is not None:
+        return override
+    return get_business_calendar(session).working_days_in_month(year, month)
+
+# --- HELPER: Month Splitting (FIN-005) ---
+TotalsKey = Tuple[int, int, int, bool]
+
+def split_leaves_by_month(session: Session, leaves) -> Dict[Tuple[int, int, int, bool], float]:
+    """
+    Apportions leaves across the months they touch by business days (CAL-001),
+    in one vectorised pass. Returns {(year, month, user_id, chargeable): days}.
+    """
+    parts: Dict[Tuple[int, int, int, bool], float] = defaultdict(float)
+    if not leaves:
+        return parts
+
+    index, years, months, days = get_business_calendar(session).apportion_by_month(
+        [to_date(l.start_date) for l in leaves],
+        [to_date(l.end_date) for l in leaves],
+        [l.total_days for l in leaves],
+    )
+    for i, year, month, d in zip(index.tolist(), years.tolist(), months.tolist(), days.tolist()):
+        leave = leaves[i]
+        parts[(year, month, leave.user_id, leave.cached_chargeable_status)] += d
+    return parts
+
+
+def apply_leave_to_monthly_totals(session: Session, leave: LeaveRequest, sign: int = 1):
+    """
+    Adds (sign=1) or removes (sign=-1) an approved leave from monthly_user_leave_totals.
+    Note: We do not commit here. The caller commits together with the Audit Log.
+    """
+    apply_leaves_to_monthly_totals(session, [(leave, sign)])
+
+
+def apply_leaves_to_monthly_totals(session: Session, changes: List[Tuple[LeaveRequest, int]]):
+    """
+    Batch form of apply_leave_to_monthly_totals(): nets every (leave, sign) per
+    total row, then writes them in one multi-row atomic upsert, so concurrent
+    approvals for the same user/month don't lose updates.
+    Note: We do not commit here.
+    """
+    deltas: Dict[TotalsKey, float] = defaultdict(float)
+    for sign in (1, -1):
+        leaves = [leave for leave, leave_sign in changes if leave_sign == sign]
+        for key, days in split_leaves_by_month(session, leaves).items():
+            deltas[key] += sign * days
+    if not deltas:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = MonthlyUserLeaveTotal.__table__
+    statement = insert(table).values([
+        dict(year=year, month=month, user_id=user_id, chargeable=chargeable, total_days=days)
+        for (year, month, user_id, chargeable), days in deltas.items()
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.year, table.c.month, table.c.user_id, table.c.chargeable],
+        set_={"total_days": table.c.total_days + statement.excluded.total_days},
+    )
+    session.execute(statement)
+
+
+# --- HELPER: Rebuild / Verify (FIN-005) ---
+class TotalsDrift(SQLModel):
+    year: int
+    month: int
+    user_id: int
+    chargeable: bool
+    stored_days: float
+    expected_days: float
+
+def recompute_monthly_totals(session: Session, batch_size: int = 5000) -> Dict[TotalsKey, float]:
+    """
+    Recomputes every month from scratch: streams all APPROVED leaves and splits
+    each batch with the same vectorised apportioning the incremental path uses.
+    """
+    statement = (
+        select(
+            LeaveRequest.user_id,
+            LeaveRequest.start_date,
+            LeaveRequest.end_date,
+            LeaveRequest.total_days,
+            LeaveRequest.cached_chargeable_status,
+        )
+        .where(LeaveRequest.status == LeaveStatus.APPROVED)
+        .execution_options(yield_per=batch_size)
+    )
+    expected: Dict[TotalsKey, float] = defaultdict(float)
+    for batch in session.exec(statement).partitions():
+        for key, days in split_leaves_by_month(session, batch).items():
+            expected[key] += days
+    return dict(expected)
+
+
+def verify_monthly_totals(session: Session, tolerance: float = 1e-6) -> List[TotalsDrift]:
+    """Compares the stored totals against a full recompute and reports every mismatch."""
+    expected = recompute_monthly_totals(session)
+    stored = {
+        (t.year, t.month, t.user_id, t.chargeable): t.total_days
+        for t in session.exec(select(MonthlyUserLeaveTotal))
+    }
+
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        stored_days = stored.get(key, 0.0)
+        expected_days = expected.get(key, 0.0)
+        if abs(stored_days - expected_days) > tolerance:
+            year, month, user_id, chargeable = key
+            drift.append(TotalsDrift(
+                year=year,
+                month=month,
+                user_id=user_id,
+                chargeable=chargeable,
+                stored_days=stored_days,
+                expected_days=expected_days,
+            ))
+    return drift
+
+
+def rebuild_monthly_totals(session: Session) -> int:
+    """Replaces monthly_user_leave_totals with a full recompute. Returns the row count."""
+    expected = recompute_monthly_totals(session)
+    session.execute(delete(MonthlyUserLeaveTotal))
+    for (year, month, user_id, chargeable), days in expected.items():
+        session.add(MonthlyUserLeaveTotal(
+            year=year, month=month, user_id=user_id, chargeable=chargeable, total_days=days
+        ))
+    session.commit()
+    invalidate_reconciliation()
+    return len(expected)
+
+
+def rebuild_monthly_totals_for(session: Session, months) -> int:
+    """
+    rebuild_monthly_totals() restricted to the given (year, month) pairs:
+    their rows are replaced with a recompute from the APPROVED leaves that
+    overlap them. Returns the row count. Does not commit.
+    """
+    months = set(months)
+    if not months:
+        return 0
+    first, last = min(months), max(months)
+    span_start, _ = get_month_date_range(*first)
+    _, span_end = get_month_date_range(*last)
+
+    leaves = session.exec(
+        select(LeaveRequest)
+        .where(LeaveRequest.status == LeaveStatus.APPROVED)
+        .where(LeaveRequest.start_date <= span_end)
+        .where(LeaveRequest.end_date >= span_start)
+    ).all()
+    expected = {
+        key: days for key, days in split_leaves_by_month(session, leaves).items()
+        if (key[0], key[1]) in months
+    }
+
+    totals = MonthlyUserLeaveTotal
+    session.execute(delete(totals).where(tuple_(totals.year, totals.month).in_(sorted(months))))
+    for (year, month, user_id, chargeable), days in expected.items():
+        session.add(MonthlyUserLeaveTotal(
+            year=year, month=month, user_id=user_id, chargeable=chargeable, total_days=days
+        ))
+    return len(expected)
+
+
+# --- HELPER: Calendar Changes (CAL-001 / FIN-005) ---
+def reprice_leaves_on(session: Session, holiday_date: date, actor_user_id: int) -> List[LeaveRequest]:
+    """
+    Call after a public holiday on `holiday_date` was added or deleted (and
+    flushed), before committing. Open leaves covering that date get their
+    total_days recounted; for approved ones the balance ledger is corrected
+    and the monthly totals of every month they touch are rebuilt, since a
+    leave's days are split across months by business days.
+    Returns the leaves whose total_days changed. Does not commit.
+    """
+    leaves = session.exec(
+        select(LeaveRequest)
+        .where(col(LeaveRequest.status).in_([LeaveStatus.PENDING, LeaveStatus.APPROVED]))
+        .where(LeaveRequest.start_date <= holiday_date)
+        .where(LeaveRequest.end_date >= holiday_date)
+    ).all()
+
+    business_calendar = get_business_calendar(session)
+    changed, audit_entries, ledger_entries, months = [], [], [], set()
+    for leave in leaves:
+        start_date, end_date = to_date(leave.start_date), to_date(leave.end_date)
+        total_days = float(business_calendar.count(start_date, end_date))
+        delta = total_days - leave.total_days
+        if not delta:
+            continue
+        if leave.status == LeaveStatus.APPROVED:
+            ledger_entries.append(dict(
+                user_id=leave.user_id,
+                year=start_date.year,
+                category_id=leave.category_id,
+                kind=LedgerEntryKind.DEBIT if delta > 0 else LedgerEntryKind.CREDIT,
+                days=-delta,
+                leave_request_id=leave.id,
+                actor_user_id=actor_user_id,
+                note=f"Public holiday change on {holiday_date.isoformat()}",
+            ))
+            months.update(iter_months((start_date.year, start_date.month), (end_date.year, end_date.month)))
+        audit_entries.append(dict(
+            leave_request_id=leave.id,
+            actor_user_id=actor_user_id,
+            action="UPDATE",
+            field_changed="total_days",
+            old_value=leave.total_days,
+            new_value=total_days,
+        ))
+        leave.total_days = total_days
+        session.add(leave)
+        changed.append(leave)
+
+    session.flush()
+    create_audit_logs(session, audit_entries)
+    post_ledger_entries(session, ledger_entries)
+    rebuild_monthly_totals_for(session, months)
+    return changed
+
+
+# --- HELPER: Effective-Dated Membership (FIN-007) ---
+def history_overlaps(session: Session, start_date: date, end_date: date):
+    """
+    WHERE clause for UserHistory rows overlapping [start_date, end_date].
+    On Postgres it is phrased as a range overlap so it probes the GiST interval
+    index; elsewhere it falls back to plain comparisons.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        period = func.daterange(UserHistory.valid_from, UserHistory.valid_to, "[]")
+        return period.op("&&")(func.daterange(start_date, end_date, "[]"))
+    return and_(
+        UserHistory.valid_from <= end_date,
+        or_(UserHistory.valid_to == None, UserHistory.valid_to >= start_date),
+    )
+
+
+def active_history_statement(session: Session, start_date: date, end_date: date):
+    """
+    Active UserHistory intervals overlapping the period, clipped to it:
+    (user_id, full_name, vendor_id, active_from, active_to), ordered by user and date.
+    """
+    clipped_from = case((UserHistory.valid_from < start_date, start_date), else_=UserHistory.valid_from)
+    clipped_to = case(
+        (or_(UserHistory.valid_to == None, UserHistory.valid_to > end_date), end_date),
+        else_=UserHistory.valid_to,
+    )
+    return (
+        select(
+            UserHistory.user_id,
+            User.full_name,
+            UserHistory.vendor_id,
+            clipped_from.label("active_from"),
+            clipped_to.label("active_to"),
+        )
+        .join(User, User.id == UserHistory.user_id)
+        .where(UserHistory.is_active == True)
+        .where(history_overlaps(session, start_date, end_date))
+        .order_by(UserHistory.user_id, UserHistory.valid_from)
+    )
+
+
+def prorate_working_days(business_calendar, active_from, active_to, period_start, period_end, working_days) -> np.ndarray:
+    """
+    Potential working days scaled by the share of the period's business days that
+    fall inside each user's active span. Users active for the whole period keep
+    `working_days` unchanged. All arguments may be arrays (they broadcast).
+    """
+    active_days = business_calendar.count(active_from, active_to)
+    period_days = business_calendar.count(period_start, period_end)
+    working_days = np.asarray(working_days)
+    return np.where(
+        active_days >= period_days,
+        working_days,
+        np.rint(working_days * active_days / np.maximum(period_days, 1)),
+    ).astype(int)
+
+
+def clip_leaves_to_spans(business_calendar, leaves, spans) -> Dict[tuple, List[float]]:
+    """
+    Leave days falling inside each user's active span, for users who joined or
+    left mid-month (FIN-007): each leave's total_days is apportioned by the
+    business days it shares with the span, as apportion_by_month() does for a
+    month. `spans` maps keys starting with the user_id to (active_from, active_to).
+    Returns {key: [chargeable_days, non_chargeable_days]} for keys with leave.
+    """
+    by_user: Dict[int, List[int]] = defaultdict(list)
+    for i, leave in enumerate(leaves):
+        by_user[leave.user_id].append(i)
+    pairs = [
+        (i, key)
+        for key, (active_from, active_to) in spans.items()
+        for i in by_user.get(key[0], ())
+        if to_date(leaves[i].start_date) <= active_to and to_date(leaves[i].end_date) >= active_from
+    ]
+    clipped: Dict[tuple, List[float]] = defaultdict(lambda: [0.0, 0.0])
+    if not pairs:
+        return clipped
+
+    starts = np.array([to_date(leaves[i].start_date) for i, _ in pairs], dtype="datetime64[D]")
+    ends = np.array([to_date(leaves[i].end_date) for i, _ in pairs], dtype="datetime64[D]")
+    clipped_starts = np.maximum(starts, np.array([spans[key][0] for _, key in pairs], dtype="datetime64[D]"))
+    clipped_ends = np.minimum(ends, np.array([spans[key][1] for _, key in pairs], dtype="datetime64[D]"))
+    total_days = np.array([leaves[i].total_days for i, _ in pairs], dtype=float)
+
+    overlap = business_calendar.count(clipped_starts, clipped_ends)
+    span = business_calendar.count(starts, ends)
+    days = np.where(
+        span > 0,
+        total_days * overlap / np.maximum(span, 1),
+        total_days * ((clipped_ends - clipped_starts).astype(int) + 1) / ((ends - starts).astype(int) + 1),
+    )
+    for (i, key), d in zip(pairs, days.tolist()):
+        # FIN-003: Split on the snapshot, not the current Category setting
+        clipped[key][0 if leaves[i].cached_chargeable_status else 1] += d
+    return clipped
+
+
+def _reconcile_batch(
+    session: Session, business_calendar, batch, year: int, month: int, working_days: int
+) -> List[Tuple[int, float, float]]:
+    """
+    (potential working days, chargeable, non-chargeable) for a batch of
+    reconciliation_statement() rows. Users active all month keep the stored
+    monthly totals; for the others both the working days and the leave are
+    limited to their active span, from one query for the batch's approved leave.
+    """
+    start_date, end_date = get_month_date_range(year, month)
+    potential = prorate_working_days(
+        business_calendar,
+        [row[3] for row in batch],
+        [row[4] for row in batch],
+        start_date,
+        end_date,
+        working_days,
+    ).tolist()
+
+    partial = {
+        (row[0],): (row[3], row[4])
+        for row in batch if row[3] > start_date or row[4] < end_date
+    }
+    clipped = {}
+    if partial:
+        leaves = session.exec(
+            select(
+                LeaveRequest.user_id,
+                LeaveRequest.start_date,
+                LeaveRequest.end_date,
+                LeaveRequest.total_days,
+                LeaveRequest.cached_chargeable_status,
+            )
+            .where(LeaveRequest.user_id.in_([key[0] for key in partial]))
+            .where(LeaveRequest.status == LeaveStatus.APPROVED)
+            .where(LeaveRequest.start_date <= end_date)
+            .where(LeaveRequest.end_date >= start_date)
+        ).all()
+        clipped = clip_leaves_to_spans(business_calendar, leaves, partial)
+
+    results = []
+    for row, potential_days in zip(batch, potential):
+        chargeable, non_chargeable = float(row[5]), float(row[6])
+        if (row[0],) in partial:
+            chargeable, non_chargeable = clipped.get((row[0],), (0.0, 0.0))
+        results.append((potential_days, chargeable, non_chargeable))
+    return results
+
+
 # --- HELPER: The Core Calculation Logic ---
+def reconciliation_statement(session: Session, year: int, month: int):
+    """
+    One summary tuple per user active at any point in the month:
+    (user_id, full_name, vendor_id, active_from, active_to, chargeable_days, non_chargeable_days).
+
+    Membership, vendor and the active span come from user_history (FIN-007), so
+    re-running a past month gives the same answer after later edits. The span is
+    first to last active day in the month; vendor_id is the one in force last.
+
+    Leave days read the incrementally maintained monthly_user_leave_totals
+    (FIN-005), so a month is a primary-key range read rather than a leave_request scan.
+    """
+    totals = MonthlyUserLeaveTotal
+    start_date, end_date = get_month_date_range(year, month)
+
+    intervals = active_history_statement(session, start_date, end_date).subquery()
+    by_user = dict(partition_by=intervals.c.user_id)
+    spans = select(
+        intervals.c.user_id,
+        intervals.c.full_name,
+        intervals.c.vendor_id,
+        func.min(intervals.c.active_from).over(**by_user).label("active_from"),
+        func.max(intervals.c.active_to).over(**by_user).label("active_to"),
+        func.row_number().over(**by_user, order_by=intervals.c.active_from.desc()).label("rn"),
+    ).subquery()
+
+    # Logic from Story FIN-003:
+    # The totals are already split by 'cached_chargeable_status' (The Snapshot)
+    chargeable_sum = func.coalesce(func.sum(
+        case((totals.chargeable == True, totals.total_days), else_=0.0)
+    ), 0.0)
+    non_chargeable_sum = func.coalesce(func.sum(
+        case((totals.chargeable == False, totals.total_days), else_=0.0)
+    ), 0.0)
+
+    # LEFT JOIN so active users without leave still get a row.
+    return (
+        select(
+            spans.c.user_id,
+            spans.c.full_name,
+            spans.c.vendor_id,
+            spans.c.active_from,
+            spans.c.active_to,
+            chargeable_sum.label("chargeable"),
+            non_chargeable_sum.label("non_chargeable"),
+        )
+        .select_from(spans)
+        .outerjoin(
+            totals,
+            and_(
+                totals.year == year,
+                totals.month == month,
+                totals.user_id == spans.c.user_id,
+            ),
+        )
+        .where(spans.c.rn == 1)
+        .group_by(
+            spans.c.user_id, spans.c.full_name, spans.c.vendor_id,
+            spans.c.active_from, spans.c.active_to,
+        )
+        .order_by(spans.c.user_id)
+    )
+
+
 def generate_reconciliation_data(
     session: Session, 
     year: int, 
@@ -53,59 +563,401 @@ def generate_reconciliation_data(
     Central logic for both JSON response and CSV export.
     Keeps business logic in one place (DRY).
     """
-    start_date, end_date = get_month_date_range(year, month)
-
-    # 1. Fetch All Active Users (CONTRACTOR, MANAGER, ADMIN)
-    users = session.exec(select(User).where(User.is_active == True)).all()
-
-    # 2. Fetch All APPROVED Leaves for this period
-    # Note: We filter by Approved status to ensure financial accuracy
-    statement = (
-        select(LeaveRequest)
-        .where(LeaveRequest.start_date >= start_date)
-        .where(LeaveRequest.start_date <= end_date) # Simplified: logic usually requires overlapping checks
-        .where(LeaveRequest.status == LeaveStatus.APPROVED)
-    )
-    leaves = session.exec(statement).all()
-
-    # 3. Aggregate Data in Python (Easier to read/debug than complex SQL grouping)
     report_rows = []
+    rows = session.exec(reconciliation_statement(session, year, month)).all()
+    reconciled = _reconcile_batch(session, get_business_calendar(session), rows, year, month, working_days)
 
-    for user in users:
-        user_leaves = [l for l in leaves if l.user_id == user.id]
-        
-        # Logic from Story FIN-003:
-        # Use 'cached_chargeable_status' (The Snapshot) not the current Category setting
-        chargeable_sum = sum(l.total_days for l in user_leaves if l.cached_chargeable_status)
-        non_chargeable_sum = sum(l.total_days for l in user_leaves if not l.cached_chargeable_status)
-        
+    for (user_id, full_name, vendor_id, *_), (potential_days, chargeable, non_chargeable) in zip(rows, reconciled):
         # Calculation:
         # Billable Days = Potential Working Days - Non-Chargeable Leaves
         # (Chargeable leaves like Annual Leave are considered "Paid", so they don't reduce the bill)
-        total_billable = working_days - non_chargeable_sum
-
-        row = FinanceReportRow(
-            user_id=user.id,
-            full_name=user.full_name,
-            vendor_id=user.vendor_id,
-            total_working_days=working_days,
-            days_worked=working_days - (chargeable_sum + non_chargeable_sum),
-            chargeable_leave=chargeable_sum,
-            non_chargeable_leave=non_chargeable_sum,
-            total_billable_days=total_billable
-        )
-        report_rows.append(row)
+        # For users who joined or left mid-month, both are limited to their active span (FIN-007)
+        report_rows.append(FinanceReportRow(
+            user_id=user_id,
+            full_name=full_name,
+            vendor_id=vendor_id,
+            total_working_days=potential_days,
+            days_worked=potential_days - (chargeable + non_chargeable),
+            chargeable_leave=chargeable,
+            non_chargeable_leave=non_chargeable,
+            total_billable_days=potential_days - non_chargeable
+        ))
 
     return report_rows
 
 
+# --- HELPER: Reconciliation Cache (Redis) ---
+# Cache keys embed two version counters: one per month (bumped by leave writes
+# touching that month) and one global (bumped by user edits and rebuilds, which
+# can change any month). Bumping makes old entries unreachable; the TTL cleans up.
+RECONCILIATION_GLOBAL_VERSION = "recon:global"
+_report_rows_adapter = TypeAdapter(List[FinanceReportRow])
+
+def reconciliation_month_version(year: int, month: int) -> str:
+    return f"recon:{year}-{month:02d}"
+
+
+def invalidate_reconciliation(start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """
+    Bumps the version of every month touched by [start_date, end_date], or the
+    global version when called without dates. Call after the write has committed.
+    """
+    if start_date is None or end_date is None:
+        bump_versions([RECONCILIATION_GLOBAL_VERSION])
+        return
+    invalidate_reconciliation_ranges([(start_date, end_date)])
+
+
+def invalidate_reconciliation_ranges(ranges):
+    """invalidate_reconciliation() for many (start_date, end_date) pairs in one Redis round trip."""
+    names = set()
+    for start_date, end_date in ranges:
+        start_date, end_date = to_date(start_date), to_date(end_date)
+        names.update(
+            reconciliation_month_version(year, month)
+            for year, month in iter_months((start_date.year, start_date.month), (end_date.year, end_date.month))
+        )
+    bump_versions(sorted(names))
+
+
+def _reconciliation_cache_key(year: int, month: int, working_days: int) -> Optional[str]:
+    versions = get_versions([reconciliation_month_version(year, month), RECONCILIATION_GLOBAL_VERSION])
+    if versions is None:
+        return None
+    return f"recon:{year}-{month:02d}:wd{working_days}:v{versions[0]}.{versions[1]}"
+
+
+def _read_cached_rows(key: Optional[str]) -> Optional[List[FinanceReportRow]]:
+    if key is None:
+        return None
+    cached = cache_get(key)
+    record_lookup("reconciliation", cached is not None)
+    return _report_rows_adapter.validate_json(cached) if cached is not None else None
+
+
+def get_cached_reconciliation_data(year: int, month: int, working_days: int) -> Optional[List[FinanceReportRow]]:
+    """Cached rows for this month/version, or None on a miss (or when Redis is down)."""
+    return _read_cached_rows(_reconciliation_cache_key(year, month, working_days))
+
+
+def get_reconciliation_data(
+    session: Session, year: int, month: int, working_days: int
+) -> List[FinanceReportRow]:
+    """generate_reconciliation_data() behind the Redis cache."""
+    key = _reconciliation_cache_key(year, month, working_days)
+    cached = _read_cached_rows(key)
+    if cached is not None:
+        return cached
+
+    data = generate_reconciliation_data(session, year, month, working_days)
+    if key is not None:
+        cache_set(key, _report_rows_adapter.dump_json(data))
+    return data
+
+
+def total_by_currency(vendor_totals: List[VendorInvoiceTotal]) -> Dict[str, Decimal]:
+    """Vendors bill in their own currency, so amounts are only added up within one."""
+    totals: Dict[str, Decimal] = defaultdict(Decimal)
+    for vendor_total in vendor_totals:
+        totals[vendor_total.currency] += vendor_total.total_amount
+    return dict(sorted(totals.items()))
+
+
+def build_finance_summary(session: Session, year: int, month: int, working_days: int) -> FinanceSummary:
+    data = get_reconciliation_data(session, year, month, working_days)
+    vendor_totals = summarize_invoices(generate_vendor_invoices(session, data, year, month))
+
+    return FinanceSummary(
+        report_month=f"{year}-{month:02d}",
+        invoice_totals=total_by_currency(vendor_totals),
+        rows=data,
+        vendor_totals=vendor_totals
+    )
+
+
+# --- HELPER: Multi-Month Reconciliation ---
+MAX_RANGE_MONTHS = 36
+
+def apportion_leaves_by_month(
+    session: Session, leaves, months: List[Tuple[int, int]]
+) -> Dict[Tuple[int, int, int], List[float]]:
+    """
+    Apportions leaves across the requested months in one vectorised pass.
+    Returns {(user_id, year, month): [chargeable_days, non_chargeable_days]}.
+    Months outside `months` (a leave spilling past the range) are dropped.
+    """
+    wanted = set(months)
+    cells: Dict[Tuple[int, int, int], List[float]] = defaultdict(lambda: [0.0, 0.0])
+    for (year, month, user_id, chargeable), days in split_leaves_by_month(session, leaves).items():
+        if (year, month) in wanted:
+            # FIN-003: Split on the snapshot, not the current Category setting
+            cells[(user_id, year, month)][0 if chargeable else 1] += days
+    return cells
+
+
+def generate_range_reconciliation_data(
+    session: Session,
+    first: Tuple[int, int],
+    last: Tuple[int, int],
+    working_days: Optional[int] = None
+) -> RangeSummary:
+    """
+    Per-user x per-month matrix for a whole range (e.g. a quarter or fiscal year).
+    Fetches the APPROVED leaves overlapping the range in one query and
+    apportions them in one vectorised pass, so cost is close to a single month.
+    Without an override, each month uses its own business-day count.
+    """
+    months = list(iter_months(first, last))
+    if not months:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if len(months) > MAX_RANGE_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_RANGE_MONTHS} months")
+
+    range_start, _ = get_month_date_range(*first)
+    _, range_end = get_month_date_range(*last)
+
+    leaves = session.exec(
+        select(
+            LeaveRequest.user_id,
+            LeaveRequest.start_date,
+            LeaveRequest.end_date,
+            LeaveRequest.total_days,
+            LeaveRequest.cached_chargeable_status,
+        )
+        .where(LeaveRequest.status == LeaveStatus.APPROVED)
+        .where(LeaveRequest.start_date <= range_end)
+        .where(LeaveRequest.end_date >= range_start)
+        .order_by(LeaveRequest.start_date)
+    ).all()
+    cells = apportion_leaves_by_month(session, leaves, months)
+    business_calendar = get_business_calendar(session)
+    month_working_days = [
+        working_days if working_days is not None else business_calendar.working_days_in_month(year, month)
+        for year, month in months
+    ]
+
+    # FIN-007: Per-month active spans from user_history, one query for the whole range
+    users: Dict[int, Tuple[str, Optional[int]]] = {}
+    spans: Dict[Tuple[int, int, int], Tuple[date, date]] = {}
+    for user_id, full_name, vendor_id, active_from, active_to in session.exec(
+        active_history_statement(session, range_start, range_end)
+    ):
+        users[user_id] = (full_name, vendor_id) # Ordered by valid_from: the last vendor wins
+        for year, month in iter_months((active_from.year, active_from.month), (active_to.year, active_to.month)):
+            month_start, month_end = get_month_date_range(year, month)
+            clipped = (max(active_from, month_start), min(active_to, month_end))
+            span = spans.get((user_id, year, month))
+            spans[(user_id, year, month)] = clipped if span is None else (min(span[0], clipped[0]), max(span[1], clipped[1]))
+
+    # Users who joined or left mid-month only count the leave inside their span,
+    # and none at all in months they were not on the books
+    partial = {key: span for key, span in spans.items() if span != get_month_date_range(key[1], key[2])}
+    clipped = clip_leaves_to_spans(business_calendar, leaves, partial)
+    cells = {
+        key: clipped.get(key, (0.0, 0.0)) if key in partial else days
+        for key, days in cells.items() if key in spans
+    }
+
+    keys = list(spans)
+    month_index = {m: i for i, m in enumerate(months)}
+    bounds = [get_month_date_range(year, month) for _, year, month in keys]
+    prorated = dict(zip(keys, prorate_working_days(
+        business_calendar,
+        [spans[k][0] for k in keys],
+        [spans[k][1] for k in keys],
+        [b[0] for b in bounds],
+        [b[1] for b in bounds],
+        [month_working_days[month_index[(year, month)]] for _, year, month in keys],
+    ).tolist())) if keys else {}
+
+    labels = [f"{year}-{month:02d}" for year, month in months]
+    rows = []
+    for user_id in sorted(users):
+        full_name, vendor_id = users[user_id]
+        user_months = []
+        for (year, month), label in zip(months, labels):
+            days = prorated.get((user_id, year, month), 0) # Not on the books that month
+            chargeable, non_chargeable = cells.get((user_id, year, month), (0.0, 0.0))
+            user_months.append(MonthlyLeaveCell(
+                month=label,
+                total_working_days=days,
+                chargeable_leave=chargeable,
+                non_chargeable_leave=non_chargeable,
+                total_billable_days=days - non_chargeable
+            ))
+        rows.append(RangeReportRow(
+            user_id=user_id,
+            full_name=full_name,
+            vendor_id=vendor_id,
+            months=user_months,
+            total_billable_days=sum(m.total_billable_days for m in user_months)
+        ))
+
+    return RangeSummary(report_from=labels[0], report_to=labels[-1], months=labels, rows=rows)
+
+
+# --- HELPER: Streaming CSV Export ---
+CSV_HEADER = [
+    "Name", 
+    "Vendor ID", 
+    "Potential Working Days", 
+    "Chargeable Leave (Days)", 
+    "Non-Chargeable Leave (Days)", 
+    "TOTAL BILLABLE DAYS"
+]
+
+def _csv_line(full_name, vendor_id, working_days, chargeable, non_chargeable) -> list:
+    non_chargeable = float(non_chargeable)
+    return [
+        full_name,
+        vendor_id or "N/A",
+        working_days,
+        float(chargeable),
+        non_chargeable,
+        working_days - non_chargeable
+    ]
+
+
+def iter_cached_reconciliation_csv(rows: List[FinanceReportRow]) -> Iterator[str]:
+    """Same bytes as iter_reconciliation_csv(), from rows already served by the cache."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADER)
+    for row in rows:
+        writer.writerow(_csv_line(
+            row.full_name, row.vendor_id, row.total_working_days,
+            row.chargeable_leave, row.non_chargeable_leave
+        ))
+    yield output.getvalue()
+
+
+def iter_reconciliation_csv(year: int, month: int, working_days: int, chunk_size: int) -> Iterator[str]:
+    """
+    Streams the reconciliation CSV straight off a server-side cursor, one chunk
+    of `chunk_size` rows at a time, so memory does not grow with head count.
+
+    Opens its own Session: the StreamingResponse body is consumed after the
+    request's dependencies may already have been torn down.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    writer.writerow(CSV_HEADER)
+    yield output.getvalue()
+    output.seek(0)
+    output.truncate(0)
+
+    with Session(engine) as session:
+        business_calendar = get_business_calendar(session)
+        statement = reconciliation_statement(session, year, month).execution_options(yield_per=chunk_size)
+        for batch in session.exec(statement).partitions():
+            reconciled = _reconcile_batch(session, business_calendar, batch, year, month, working_days)
+            for (_, full_name, vendor_id, *_), (potential_days, chargeable, non_chargeable) in zip(batch, reconciled):
+                writer.writerow(_csv_line(full_name, vendor_id, potential_days, chargeable, non_chargeable))
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+
+# --- HELPER: Columnar Export (Arrow / Parquet) ---
+RECONCILIATION_SCHEMA = pa.schema([
+    ("user_id", pa.int64()),
+    ("full_name", pa.string()),
+    ("vendor_id", pa.int64()),
+    ("total_working_days", pa.int32()),
+    ("chargeable_leave", pa.float64()),
+    ("non_chargeable_leave", pa.float64()),
+    ("total_billable_days", pa.float64()),
+])
+
+def iter_reconciliation_batches(year: int, month: int, working_days: int, chunk_size: int) -> Iterator[pa.RecordBatch]:
+    """Same cursor as the CSV export, but yields typed Arrow record batches."""
+    with Session(engine) as session:
+        business_calendar = get_business_calendar(session)
+        statement = reconciliation_statement(session, year, month).execution_options(yield_per=chunk_size)
+        for batch in session.exec(statement).partitions():
+            user_ids, names, vendor_ids, *_ = zip(*batch)
+            potential_days, chargeable, non_chargeable = zip(
+                *_reconcile_batch(session, business_calendar, batch, year, month, working_days)
+            )
+            potential_days = pa.array(potential_days, type=pa.int32())
+            non_chargeable = pa.array(non_chargeable, type=pa.float64())
+            yield pa.RecordBatch.from_arrays([
+                pa.array(user_ids, type=pa.int64()),
+                pa.array(names, type=pa.string()),
+                pa.array(vendor_ids, type=pa.int64()),
+                potential_days,
+                pa.array(chargeable, type=pa.float64()),
+                non_chargeable,
+                pc.subtract(pc.cast(potential_days, pa.float64()), non_chargeable),
+            ], schema=RECONCILIATION_SCHEMA)
+
+
+# --- HELPER: Background Report Jobs ---
+_invoices_adapter = TypeAdapter(List[VendorInvoice])
+
+def run_report_job(job_id: str, kind: str, params: dict, progress: Callable[[float], None]) -> Tuple[str, str]:
+    """
+    Executes one queued job (called by app.worker) and writes its artifact.
+    Returns (download filename, artifact path).
+    """
+    year, month = params["year"], params["month"]
+    label = f"{year}_{month:02d}"
+
+    with Session(engine) as session:
+        working_days = resolve_working_days(session, year, month, params.get("working_days"))
+
+        if kind == "reconciliation":
+            chunks = [build_finance_summary(session, year, month, working_days).model_dump_json()]
+            filename = f"billing_recon_{label}.json"
+        elif kind == "invoice":
+            invoices = generate_vendor_invoices(
+                session, get_reconciliation_data(session, year, month, working_days), year, month
+            )
+            chunks = [_invoices_adapter.dump_json(invoices)]
+            filename = f"vendor_invoices_{label}.json"
+        else:
+            fmt = params.get("format", "csv")
+            chunk_size = settings.EXPORT_CHUNK_SIZE
+            start_date, end_date = get_month_date_range(year, month)
+            total_rows = session.exec(
+                select(func.count(func.distinct(UserHistory.user_id)))
+                .where(UserHistory.is_active == True)
+                .where(history_overlaps(session, start_date, end_date))
+            ).one()
+            if fmt in COLUMNAR_FORMATS:
+                chunks = iter_columnar(fmt, RECONCILIATION_SCHEMA,
+                                       iter_reconciliation_batches(year, month, working_days, chunk_size))
+                filename = f"billing_recon_{label}.{COLUMNAR_FORMATS[fmt][1]}"
+            else:
+                chunks = iter_reconciliation_csv(year, month, working_days, chunk_size)
+                filename = f"billing_recon_{label}.csv"
+
+    path = artifact_path(job_id, filename.rsplit(".", 1)[1])
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        for i, chunk in enumerate(chunks):
+            f.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            if kind == "export":
+                progress(min(99, i * chunk_size * 100 / max(total_rows, 1)))
+    os.replace(tmp_path, path)
+    return filename, path
+
+
+def _job_read(job: dict) -> ReportJobRead:
+    return ReportJobRead(
+        **{k: job.get(k) for k in ("id", "kind", "status", "progress", "params", "error", "created_at", "finished_at")},
+        download_url=f"/finance/jobs/{job['id']}/download" if job["status"] == JobStatus.DONE else None,
+    )
+
+
 # --- ENDPOINTS ---
 
 @router.get("/reconciliation", response_model=FinanceSummary)
 async def get_monthly_reconciliation(
     year: int,
     month: int,
-    working_days: int = Query(default=22, description="Potential working days in this month"),
+    working_days: Optional[int] = Query(default=None, description="Override potential working days; defaults to the business calendar"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
@@ -115,70 +967,224 @@ async def get_monthly_reconciliation(
     if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    data = generate_reconciliation_data(session, year, month, working_days)
-    
-    return FinanceSummary(
-        report_month=f"{year}-{month:02d}",
-        total_invoice_amount=0.0, # Placeholder
-        rows=data
-    )
+    working_days = resolve_working_days(session, year, month, working_days)
+    return build_finance_summary(session, year, month, working_days)
+
+
+@router.get("/invoices", response_model=List[VendorInvoice])
+async def get_vendor_invoices(
+    year: int,
+    month: int,
+    working_days: Optional[int] = Query(default=None, description="Override potential working days; defaults to the business calendar"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Invoice Run: one priced invoice document per vendor for the month,
+    based on the same billable days as the reconciliation report.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    working_days = resolve_working_days(session, year, month, working_days)
+    data = get_reconciliation_data(session, year, month, working_days)
+    return generate_vendor_invoices(session, data, year, month)
 
 
 @router.get("/export")
 async def export_reconciliation_csv(
     year: int,
     month: int,
-    working_days: int = Query(default=22),
+    working_days: Optional[int] = Query(default=None),
+    chunk_size: int = Query(
+        default=settings.EXPORT_CHUNK_SIZE, ge=1, le=50000,
+        description="Rows fetched and written per streamed chunk"
+    ),
+    format: str = Query(default="csv", pattern="^(csv|parquet|arrow)$", description="csv, parquet or arrow (IPC stream)"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
     """
     Download Action: Streams a CSV file directly to the browser.
     Essential for Finance Officers who love Excel.
+    Rows are read from a server-side cursor in chunks, so peak memory stays flat.
+    BI tools can ask for format=parquet|arrow to keep column types.
     """
     if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    data = generate_reconciliation_data(session, year, month, working_days)
+    working_days = resolve_working_days(session, year, month, working_days)
+
+    if format in COLUMNAR_FORMATS:
+        media_type, extension = COLUMNAR_FORMATS[format]
+        filename = f"billing_recon_{year}_{month:02d}.{extension}"
+        return StreamingResponse(
+            iter_columnar(format, RECONCILIATION_SCHEMA,
+                          iter_reconciliation_batches(year, month, working_days, chunk_size)),
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
+    filename = f"billing_recon_{year}_{month:02d}.csv"
+
+    # A cached (typically closed) month is served without touching the leave tables
+    cached = get_cached_reconciliation_data(year, month, working_days)
+    body = (
+        iter_cached_reconciliation_csv(cached) if cached is not None
+        else iter_reconciliation_csv(year, month, working_days, chunk_size)
+    )
+    
+    return StreamingResponse(
+        body,
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/reconciliation/range", response_model=RangeSummary)
+async def get_range_reconciliation(
+    from_month: str = Query(alias="from", description="First month, YYYY-MM"),
+    to_month: str = Query(alias="to", description="Last month, YYYY-MM"),
+    working_days: Optional[int] = Query(default=None, description="Override potential working days per month; defaults to the business calendar"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Quarterly / Fiscal Year View: one row per user with a column per month.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return generate_range_reconciliation_data(
+        session, parse_year_month(from_month), parse_year_month(to_month), working_days
+    )
+
+
+@router.get("/export/range")
+async def export_range_reconciliation_csv(
+    from_month: str = Query(alias="from", description="First month, YYYY-MM"),
+    to_month: str = Query(alias="to", description="Last month, YYYY-MM"),
+    working_days: Optional[int] = Query(default=None),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Download Action: the multi-month matrix as a wide CSV
+    (Chargeable / Non-Chargeable / Billable columns per month).
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    summary = generate_range_reconciliation_data(
+        session, parse_year_month(from_month), parse_year_month(to_month), working_days
+    )
 
-    # Create a generator for StreamingResponse
     def iter_csv():
         output = io.StringIO()
         writer = csv.writer(output)
-        
-        # Header
-        writer.writerow([
-            "Name", 
-            "Vendor ID", 
-            "Potential Working Days", 
-            "Chargeable Leave (Days)", 
-            "Non-Chargeable Leave (Days)", 
-            "TOTAL BILLABLE DAYS"
-        ])
+
+        header = ["Name", "Vendor ID"]
+        for label in summary.months:
+            header += [f"{label} Chargeable", f"{label} Non-Chargeable", f"{label} Billable"]
+        header.append("TOTAL BILLABLE DAYS")
+        writer.writerow(header)
+        yield output.getvalue()
         output.seek(0)
-        yield output.read()
         output.truncate(0)
-        output.seek(0)
 
-        # Rows
-        for row in data:
-            writer.writerow([
-                row.full_name,
-                row.vendor_id or "N/A",
-                row.total_working_days,
-                row.chargeable_leave,
-                row.non_chargeable_leave,
-                row.total_billable_days
-            ])
+        for row in summary.rows:
+            line = [row.full_name, row.vendor_id or "N/A"]
+            for cell in row.months:
+                line += [cell.chargeable_leave, cell.non_chargeable_leave, cell.total_billable_days]
+            line.append(row.total_billable_days)
+            writer.writerow(line)
+            yield output.getvalue()
             output.seek(0)
-            yield output.read()
             output.truncate(0)
-            output.seek(0)
 
-    filename = f"billing_recon_{year}_{month:02d}.csv"
-    
+    filename = f"billing_recon_{summary.report_from}_to_{summary.report_to}.csv"
+
     return StreamingResponse(
         iter_csv(),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/cache/stats")
+async def get_reconciliation_cache_stats(
+    current_user: User = Depends(get_current_user),
+):
+    """Hit/miss counters of the reconciliation cache (shared by all workers)."""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return get_stats("reconciliation")
+
+
+# --- REPORT JOBS ---
+
+@router.post("/jobs", response_model=ReportJobRead)
+async def create_report_job(
+    job_data: ReportJobCreate,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Queues a reconciliation, invoice or export run for the background workers.
+    An identical request for unchanged data returns the existing job.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    params = job_data.model_dump(exclude={"kind"})
+    if job_data.kind != "export":
+        params.pop("format")
+
+    # New data for the month (or any user edit) means a new job, not the old artifact
+    versions = get_versions([
+        reconciliation_month_version(job_data.year, job_data.month), RECONCILIATION_GLOBAL_VERSION
+    ])
+    try:
+        job = enqueue_job(job_data.kind, params, dedup_token=".".join(map(str, versions or [])))
+    except JobQueueUnavailable:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    return _job_read(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobRead)
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    try:
+        job = get_job(job_id)
+    except JobQueueUnavailable:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_read(job)
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    try:
+        job = get_job(job_id)
+    except JobQueueUnavailable:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != JobStatus.DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if not os.path.exists(job["artifact"]):
+        raise HTTPException(status_code=404, detail="Artifact missing on disk")
+
+    return FileResponse(job["artifact"], filename=job["filename"])
@@ -0,0 +1,238 @@
+from typing import List, Optional, Sequence, Tuple
+from datetime import date, datetime
+from functools import lru_cache
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import get_session
+from app.core.etag import invalidate_leave_etags
+from app.core.security import get_current_user
+from app.models import PublicHoliday, User, UserRole
+
+# --- DTOs ---
+from sqlmodel import SQLModel
+
+class PublicHolidayCreate(SQLModel):
+    holiday_date: date
+    name: str
+    region: Optional[str] = None # Defaults to settings.CALENDAR_REGION
+
+class PublicHolidayRead(SQLModel):
+    id: int
+    region: str
+    holiday_date: date
+    name: str
+
+class WorkingDaysRead(SQLModel):
+    region: str
+    year: int
+    months: List[int] # Business days for Jan..Dec
+    total: int
+
+router = APIRouter()
+
+# --- HELPER: Business Calendar (CAL-001) ---
+def to_date(value) -> date:
+    """Leave dates may arrive as datetimes from the API DTOs."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+class BusinessCalendar:
+    """
+    A region's business days: weekend mask + public holidays, precompiled into a
+    numpy busdaycalendar. All counts are vectorised, so a whole report is one
+    numpy call instead of per-row date arithmetic.
+    """
+
+    def __init__(self, weekmask: str, holidays: Tuple[date, ...]):
+        self.busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=list(holidays))
+        self._year_bitmaps = {}
+
+    def year_bitmap(self, year: int) -> np.ndarray:
+        """One bool per day of the year, True on business days. Computed once per year."""
+        if year not in self._year_bitmaps:
+            days = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+            self._year_bitmaps[year] = np.is_busday(days, busdaycal=self.busdaycal)
+        return self._year_bitmaps[year]
+
+    def working_days_per_month(self, year: int) -> np.ndarray:
+        """Business days in each month of the year (12 ints)."""
+        month_starts = np.arange(f"{year}-01", f"{year + 1}-01", dtype="datetime64[M]")
+        offsets = (month_starts.astype("datetime64[D]") - np.datetime64(f"{year}-01-01")).astype(int)
+        return np.add.reduceat(self.year_bitmap(year).astype(int), offsets)
+
+    def working_days_in_month(self, year: int, month: int) -> int:
+        return int(self.working_days_per_month(year)[month - 1])
+
+    def count(self, starts, ends) -> np.ndarray:
+        """Business days in each [start, end] pair, both ends included."""
+        starts = np.asarray(starts, dtype="datetime64[D]")
+        ends = np.asarray(ends, dtype="datetime64[D]")
+        return np.busday_count(starts, ends + 1, busdaycal=self.busdaycal)
+
+    def apportion_by_month(self, starts, ends, total_days):
+        """
+        Splits each leave's total_days across the months it touches, in proportion
+        to the business days that fall in each month. Leaves with no business days
+        at all (legacy weekend-only rows) fall back to calendar days.
+
+        Returns parallel arrays (leave_index, year, month, days).
+        """
+        starts = np.asarray(starts, dtype="datetime64[D]")
+        ends = np.asarray(ends, dtype="datetime64[D]")
+        total_days = np.asarray(total_days, dtype=float)
+
+        first_months = starts.astype("datetime64[M]")
+        month_counts = np.maximum((ends.astype("datetime64[M]") - first_months).astype(int) + 1, 0)
+
+        # Expand every leave into one entry per month it overlaps
+        index = np.repeat(np.arange(len(starts)), month_counts)
+        offsets = np.arange(len(index)) - np.repeat(np.cumsum(month_counts) - month_counts, month_counts)
+        months = first_months[index] + offsets.astype("timedelta64[M]")
+
+        period_starts = months.astype("datetime64[D]")
+        period_ends = (months + 1).astype("datetime64[D]") - 1
+        clipped_starts = np.maximum(starts[index], period_starts)
+        clipped_ends = np.minimum(ends[index], period_ends)
+
+        overlap = self.count(clipped_starts, clipped_ends)
+        span = self.count(starts, ends)[index]
+        calendar_overlap = (clipped_ends - clipped_starts).astype(int) + 1
+        calendar_span = (ends - starts)[index].astype(int) + 1
+
+        days = np.where(
+            span > 0,
+            total_days[index] * overlap / np.maximum(span, 1),
+            total_days[index] * calendar_overlap / calendar_span,
+        )
+        month_numbers = months.astype(int)
+        return index, month_numbers // 12 + 1970, month_numbers % 12 + 1, days
+
+
+@lru_cache(maxsize=32)
+def _load_calendar(weekmask: str, holidays: Tuple[date, ...]) -> BusinessCalendar:
+    return BusinessCalendar(weekmask, holidays)
+
+
+def get_business_calendar(session: Session, region: Optional[str] = None) -> BusinessCalendar:
+    """
+    The BusinessCalendar for a region. Holidays are re-read on each call (a tiny
+    indexed query), so edits made by another worker are picked up immediately;
+    the compiled calendar and its year bitmaps are reused while they are unchanged.
+    """
+    region = region or settings.CALENDAR_REGION
+    weekmask = settings.WEEKEND_MASKS.get(region, settings.WEEKEND_MASKS["DEFAULT"])
+    holidays = session.exec(
+        select(PublicHoliday.holiday_date)
+        .where(PublicHoliday.region == region)
+        .order_by(PublicHoliday.holiday_date)
+    ).all()
+    return _load_calendar(weekmask, tuple(holidays))
+
+
+# --- HELPER: Calendar Changes (CAL-001) ---
+def apply_calendar_change(session: Session, region: str, holiday_date: date, actor_user_id: int) -> list:
+    """
+    Reprices the open leaves a holiday edit affects, in the same transaction.
+    Leaves are counted on settings.CALENDAR_REGION, so other regions only
+    change their working-day counts. Returns (user_id, leave_id) pairs changed.
+    """
+    if region != settings.CALENDAR_REGION:
+        return []
+    from app.routers.finance import reprice_leaves_on # Deferred: finance imports this module
+    return [(leave.user_id, leave.id) for leave in reprice_leaves_on(session, holiday_date, actor_user_id)]
+
+
+def after_calendar_change(changed: list):
+    """After commit: drop compiled calendars and every cached view of working days or leave days."""
+    from app.routers.finance import invalidate_reconciliation
+
+    _load_calendar.cache_clear()
+    invalidate_reconciliation() # Working days per month changed for everyone
+    if changed:
+        invalidate_leave_etags(changed)
+
+
+# --- ENDPOINTS ---
+
+@router.get("/", response_model=List[PublicHolidayRead])
+async def list_holidays(
+    year: Optional[int] = None,
+    region: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    statement = (
+        select(PublicHoliday)
+        .where(PublicHoliday.region == (region or settings.CALENDAR_REGION))
+        .order_by(PublicHoliday.holiday_date)
+    )
+    if year:
+        statement = statement.where(PublicHoliday.holiday_date >= date(year, 1, 1))
+        statement = statement.where(PublicHoliday.holiday_date <= date(year, 12, 31))
+    return session.exec(statement).all()
+
+
+@router.get("/working-days", response_model=WorkingDaysRead)
+async def get_working_days(
+    year: int,
+    region: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Potential working days per month, as used by reconciliation."""
+    region = region or settings.CALENDAR_REGION
+    months = get_business_calendar(session, region).working_days_per_month(year)
+    return WorkingDaysRead(region=region, year=year, months=months.tolist(), total=int(months.sum()))
+
+
+@router.post("/", response_model=PublicHolidayRead)
+async def create_holiday(
+    holiday_data: PublicHolidayCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    holiday = PublicHoliday(
+        region=holiday_data.region or settings.CALENDAR_REGION,
+        holiday_date=holiday_data.holiday_date,
+        name=holiday_data.name
+    )
+    session.add(holiday)
+    try:
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Holiday already exists for this date")
+    changed = apply_calendar_change(session, holiday.region, holiday.holiday_date, current_user.id)
+    session.commit()
+    session.refresh(holiday)
+    after_calendar_change(changed)
+    return holiday
+
+
+@router.delete("/{holiday_id}")
+async def delete_holiday(
+    holiday_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    holiday = session.get(PublicHoliday, holiday_id)
+    if not holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+
+    region, holiday_date = holiday.region, holiday.holiday_date
+    session.delete(holiday)
+    session.flush()
+    changed = apply_calendar_change(session, region, holiday_date, current_user.id)
+    session.commit()
+    after_calendar_change(changed)
+    return {"ok": True}
@@ -0,0 +1,412 @@
+import csv
+import io
+import json
+from bisect import bisect_right, insort
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
+from sqlalchemy import func, insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
+
+from app.core.database import get_session
+from app.core.etag import invalidate_leave_etags
+from app.core.security import get_current_user
+from app.models import LeaveCategory, LeaveRequest, LeaveStatus, LedgerEntryKind, SyncStatus, User, UserRole
+from app.routers.audit import create_audit_log
+from app.routers.balances import post_ledger_entries
+from app.routers.finance import apply_leaves_to_monthly_totals, invalidate_reconciliation_ranges
+from app.routers.holidays import get_business_calendar
+from app.routers.leaves import BLOCKING_STATUSES, LeaveIntervals
+
+# --- DTOs ---
+from sqlmodel import SQLModel
+
+class ImportRowError(SQLModel):
+    row: int # 1-based record number, header excluded
+    error: str
+
+class ImportSummary(SQLModel):
+    source: str
+    imported: int
+    failed: int
+    batches: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False # Only the first MAX_REPORTED_ERRORS are listed
+
+router = APIRouter()
+
+# --- HELPER: Bulk Leave Import ---
+# Records (CSV header or NDJSON keys):
+#   user_email | user_id, category | category_id, start_date, end_date,
+#   status (default APPROVED), reason, chargeable, created_at, approved_at
+# total_days is always derived from the business calendar (CAL-001), and
+# chargeable defaults to the category's current setting (the FIN-003 snapshot).
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+LOAD_COLUMNS = [
+    "user_id", "category_id", "start_date", "end_date", "total_days", "reason",
+    "status", "cached_chargeable_status", "external_sync_status",
+    "created_at", "updated_at", "approved_at",
+]
+
+
+def iter_import_records(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yields (row number, record) from a CSV or NDJSON byte stream without reading it all."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        yield from enumerate(csv.DictReader(text), start=1)
+        return
+    row = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError:
+            yield row, None # Reported as a row error by validation
+
+
+def _text(record: dict, key: str) -> Optional[str]:
+    value = record.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _parse_datetime(value: Optional[str], field: str) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {field}: {value!r}")
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed
+
+
+def _parse_date(value: Optional[str], field: str) -> date:
+    if value is None:
+        raise ValueError(f"Missing {field}")
+    return _parse_datetime(value, field).date()
+
+
+def _parse_bool(value: Optional[str]) -> Optional[bool]:
+    if value is None:
+        return None
+    lowered = value.lower()
+    if lowered in ("true", "1", "yes", "y"):
+        return True
+    if lowered in ("false", "0", "no", "n"):
+        return False
+    raise ValueError(f"Invalid chargeable: {value!r}")
+
+
+def _parse_record(record, categories: Dict[str, LeaveCategory]) -> dict:
+    """One raw record -> column values (user still unresolved). Raises ValueError."""
+    if not isinstance(record, dict):
+        raise ValueError("Not a JSON object")
+
+    category_key = _text(record, "category_id") or (_text(record, "category") or "").lower()
+    category = categories.get(category_key)
+    if category is None:
+        raise ValueError(f"Unknown category: {category_key!r}")
+
+    status_value = (_text(record, "status") or LeaveStatus.APPROVED.value).upper()
+    try:
+        status = LeaveStatus(status_value)
+    except ValueError:
+        raise ValueError(f"Invalid status: {status_value!r}")
+
+    start_date = _parse_date(_text(record, "start_date"), "start_date")
+    end_date = _parse_date(_text(record, "end_date"), "end_date")
+    if end_date < start_date:
+        raise ValueError("End date must not be before start date")
+
+    user_id = _text(record, "user_id")
+    user_email = _text(record, "user_email")
+    if user_id is None and user_email is None:
+        raise ValueError("Missing user_id or user_email")
+
+    created_at = _parse_datetime(_text(record, "created_at"), "created_at") or datetime.now(timezone.utc)
+    approved_at = _parse_datetime(_text(record, "approved_at"), "approved_at")
+    chargeable = _parse_bool(_text(record, "chargeable"))
+
+    return {
+        "user_ref": int(user_id) if user_id is not None else user_email.lower(),
+        "category_id": category.id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "reason": _text(record, "reason"),
+        "status": status,
+        # FIN-003: snapshot the category unless the file carries the historical value
+        "cached_chargeable_status": category.is_chargeable if chargeable is None else chargeable,
+        "external_sync_status": SyncStatus.NOT_SYNCED,
+        "created_at": created_at,
+        "updated_at": created_at,
+        "approved_at": approved_at or (created_at if status == LeaveStatus.APPROVED else None),
+    }
+
+
+def validate_import_batch(
+    session: Session, batch: List[Tuple[int, object]], categories: Dict[str, LeaveCategory]
+) -> Tuple[List[Tuple[int, dict]], List[ImportRowError]]:
+    """
+    Validates a batch with a fixed number of queries (users, existing leaves)
+    and one vectorised business-day count. Returns (valid rows, errors).
+    """
+    parsed, errors = [], []
+    for row, record in batch:
+        try:
+            parsed.append((row, _parse_record(record, categories)))
+        except (ValueError, TypeError) as e:
+            errors.append(ImportRowError(row=row, error=str(e)))
+
+    # Resolve users by id or email, one query each
+    ids = {values["user_ref"] for _, values in parsed if isinstance(values["user_ref"], int)}
+    emails = {values["user_ref"] for _, values in parsed if isinstance(values["user_ref"], str)}
+    by_ref: Dict[object, List[int]] = defaultdict(list)
+    if ids:
+        for user_id in session.exec(select(User.id).where(User.id.in_(ids))):
+            by_ref[user_id].append(user_id)
+    if emails:
+        for user_id, email in session.exec(select(User.id, User.email).where(func.lower(User.email).in_(emails))):
+            by_ref[email.lower()].append(user_id)
+
+    resolved = []
+    for row, values in parsed:
+        matches = by_ref.get(values.pop("user_ref"), [])
+        if len(matches) != 1:
+            errors.append(ImportRowError(row=row, error="Unknown user" if not matches else "Ambiguous user email"))
+            continue
+        values["user_id"] = matches[0]
+        resolved.append((row, values))
+    if not resolved:
+        return [], errors
+
+    # CAL-001: server-side total_days for the whole batch in one call
+    business_days = get_business_calendar(session).count(
+        [values["start_date"] for _, values in resolved],
+        [values["end_date"] for _, values in resolved],
+    ).tolist()
+
+    # LEAVE-002: no overlaps with stored leaves or earlier rows of this import
+    blocking = [(row, values) for row, values in resolved if values["status"] in BLOCKING_STATUSES]
+    existing: Dict[int, List[Tuple[date, date, int]]] = defaultdict(list)
+    if blocking:
+        for user_id, start_date, end_date, leave_id in session.exec(
+            select(LeaveRequest.user_id, LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.id)
+            .where(LeaveRequest.user_id.in_({values["user_id"] for _, values in blocking}))
+            .where(LeaveRequest.status.in_(BLOCKING_STATUSES))
+            .where(LeaveRequest.start_date <= max(values["end_date"] for _, values in blocking))
+            .where(LeaveRequest.end_date >= min(values["start_date"] for _, values in blocking))
+        ):
+            existing[user_id].append((start_date, end_date, leave_id))
+    stored = {user_id: LeaveIntervals(intervals) for user_id, intervals in existing.items()}
+    # Rows accepted so far, per user, sorted by start. They never overlap each
+    # other, so only the last one starting by a row's end can clash with it.
+    accepted: Dict[int, List[Tuple[date, date, int]]] = defaultdict(list)
+
+    valid = []
+    for (row, values), days in zip(resolved, business_days):
+        if days == 0:
+            errors.append(ImportRowError(row=row, error="Leave range contains no working days"))
+            continue
+        values["total_days"] = float(days)
+
+        if values["status"] in BLOCKING_STATUSES:
+            user_id, start_date, end_date = values["user_id"], values["start_date"], values["end_date"]
+            hits = stored[user_id].overlapping(start_date, end_date) if user_id in stored else []
+            if hits:
+                errors.append(ImportRowError(row=row, error=f"Overlaps existing leave request(s): {', '.join(map(str, hits))}"))
+                continue
+            ranges = accepted[user_id]
+            i = bisect_right(ranges, end_date, key=lambda accepted_range: accepted_range[0])
+            if i and ranges[i - 1][1] >= start_date:
+                errors.append(ImportRowError(row=row, error=f"Overlaps row {ranges[i - 1][2]} of this import"))
+                continue
+            insort(ranges, (start_date, end_date, row))
+
+        valid.append((row, values))
+    return valid, errors
+
+
+def _copy_rows(session: Session, rows: List[dict]):
+    """Postgres COPY ... FROM STDIN of the batch, inside the session's transaction."""
+    import psycopg2 # Only reached on Postgres
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for values in rows:
+        writer.writerow([
+            "" if values[column] is None else
+            values[column].value if isinstance(values[column], (LeaveStatus, SyncStatus)) else
+            values[column].isoformat() if isinstance(values[column], (date, datetime)) else
+            values[column]
+            for column in LOAD_COLUMNS
+        ])
+    buffer.seek(0)
+    statement = f"COPY leave_request ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(statement, buffer)
+    except psycopg2.Error as e:
+        # The raw cursor bypasses SQLAlchemy: wrap the error as it would (ExclusionViolation -> IntegrityError)
+        raise DBAPIError.instance(statement, None, e, psycopg2.Error) from e
+    finally:
+        cursor.close()
+
+
+def _insert_rows(session: Session, rows: List[dict]):
+    if session.get_bind().dialect.name == "postgresql":
+        _copy_rows(session, rows)
+    else:
+        session.execute(insert(LeaveRequest.__table__), [{c: values[c] for c in LOAD_COLUMNS} for values in rows])
+
+
+def load_import_batch(
+    session: Session, valid: List[Tuple[int, dict]], actor_user_id: int, source: str
+) -> Tuple[List[dict], List[ImportRowError]]:
+    """
+    Inserts a validated batch plus its totals and one summarising audit entry.
+    Does not commit. If the database rejects the batch (e.g. a row overlaps a
+    leave written since validation), its SAVEPOINT is rolled back and the rows
+    are inserted one at a time, skipping those it rejects. Returns (loaded rows, errors).
+    """
+    rows, errors = [values for _, values in valid], []
+    try:
+        with session.begin_nested():
+            _insert_rows(session, rows)
+    except (IntegrityError, DataError):
+        rows = []
+        for row, values in valid:
+            try:
+                with session.begin_nested():
+                    _insert_rows(session, [values])
+            except (IntegrityError, DataError) as e:
+                errors.append(ImportRowError(row=row, error=f"Rejected by the database: {e.orig}"))
+            else:
+                rows.append(values)
+        if not rows:
+            return rows, errors
+
+    # FIN-005: imported approvals count towards the monthly totals like any other
+    approved = [SimpleNamespace(**values) for values in rows if values["status"] == LeaveStatus.APPROVED]
+    apply_leaves_to_monthly_totals(session, [(leave, 1) for leave in approved])
+
+    # LEAVE-003: ...and against balances, as one DEBIT per user/year/category (COPY returns no ids)
+    note = f"Imported {len(rows)} leave requests from {source} (rows {valid[0][0]}-{valid[-1][0]})"
+    debits: Dict[Tuple[int, int, int], float] = defaultdict(float)
+    for leave in approved:
+        debits[(leave.user_id, leave.start_date.year, leave.category_id)] -= leave.total_days
+    post_ledger_entries(session, [
+        dict(user_id=user_id, year=year, category_id=category_id, kind=LedgerEntryKind.DEBIT,
+             days=days, actor_user_id=actor_user_id, note=note)
+        for (user_id, year, category_id), days in debits.items()
+    ])
+    create_audit_log(
+        session=session,
+        leave_request_id=None,
+        actor_user_id=actor_user_id,
+        action="CREATE",
+        field_changed="bulk_import",
+        new_value=note
+    )
+    return rows, errors
+
+
+def import_leave_records(
+    session: Session,
+    records: Iterator[Tuple[int, object]],
+    actor_user_id: int,
+    source: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_error: Optional[Callable[[ImportRowError], None]] = None,
+) -> ImportSummary:
+    """
+    Streams records through validate -> load -> commit, one batch at a time, so
+    memory stays flat however large the file is. Rows the database rejects
+    (e.g. a concurrent overlapping write) are reported and skipped.
+    """
+    categories: Dict[str, LeaveCategory] = {}
+    for category in session.exec(select(LeaveCategory)):
+        categories[str(category.id)] = category
+        categories[category.name.lower()] = category
+
+    summary = ImportSummary(source=source, imported=0, failed=0, batches=0, errors=[])
+
+    def report(error: ImportRowError):
+        summary.failed += 1
+        if len(summary.errors) < MAX_REPORTED_ERRORS:
+            summary.errors.append(error)
+        else:
+            summary.errors_truncated = True
+        if on_error:
+            on_error(error)
+
+    def flush(batch: List[Tuple[int, object]]):
+        valid, errors = validate_import_batch(session, batch, categories)
+        for error in sorted(errors, key=lambda e: e.row):
+            report(error)
+        if not valid:
+            return
+        try:
+            rows, errors = load_import_batch(session, valid, actor_user_id, source)
+            session.commit()
+        except IntegrityError as e:
+            session.rollback()
+            for row, _ in valid:
+                report(ImportRowError(row=row, error=f"Batch rejected by the database: {e.orig}"))
+            return
+        for error in errors:
+            report(error)
+        if not rows:
+            return
+        summary.imported += len(rows)
+        summary.batches += 1
+        invalidate_reconciliation_ranges(
+            (values["start_date"], values["end_date"])
+            for values in rows if values["status"] == LeaveStatus.APPROVED
+        )
+        # COPY does not hand back ids; new leaves have no per-leave views to invalidate yet
+        invalidate_leave_etags((user_id, None) for user_id in {values["user_id"] for values in rows})
+
+    batch: List[Tuple[int, object]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return summary
+
+
+# --- ENDPOINTS ---
+
+@router.post("/leaves", response_model=ImportSummary)
+async def import_leaves(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(default=None, pattern="^(csv|ndjson)$", description="Defaults from the file extension"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Admin: bulk-load historical leave requests from a CSV or NDJSON file.
+    Valid rows are imported even when others fail; see `errors`.
+    For very large files prefer the CLI (`python import_leaves.py`).
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    fmt = format or ("ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv")
+    # Minutes of blocking DB work: keep it off the event loop
+    return await run_in_threadpool(
+        import_leave_records, session, iter_import_records(file.file, fmt), current_user.id, file.filename or "upload"
+    )
@@ -1,23 +1,77 @@
-from typing import List, Optional
-from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
+import base64
+import heapq
+import json
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
+from pydantic import TypeAdapter, create_model
+from sqlalchemy import and_, func, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only, selectinload
+import numpy as np
+import pyarrow as pa
 
-from app.core.database import get_session
+from app.core.config import settings
+from app.core.database import engine, get_session
+from app.core.etag import (
+    ALL_LEAVES,
+    CACHE_CONTROL,
+    ALL_USERS,
+    compute_etag,
+    conditional_response,
+    invalidate_leave_etags,
+    user_leaves_version,
+)
+from app.core.exports import COLUMNAR_FORMATS, ZipMember, iter_columnar, iter_zip
 from app.core.security import get_current_user
-from app.models import LeaveRequest, LeaveCategory, User, UserRole, LeaveStatus, SyncStatus
-from app.routers.audit import create_audit_log
+from app.core.vendor_sync import enqueue_vendor_sync
+from app.models import LeaveRequest, LeaveCategory, User, UserHierarchy, UserRole, LeaveStatus, SyncStatus
+from app.routers.audit import create_audit_log, create_audit_logs
+from app.routers.balances import leave_ledger_entries, post_ledger_entries
+from app.routers.finance import (
+    apply_leave_to_monthly_totals,
+    apply_leaves_to_monthly_totals,
+    get_month_date_range,
+    invalidate_reconciliation,
+    invalidate_reconciliation_ranges,
+    parse_year_month,
+)
+from app.routers.holidays import get_business_calendar, to_date
 
 # --- DTOs ---
 from sqlmodel import SQLModel, Field
+from pydantic import computed_field
+from app.core.previews import can_preview
 
 # 1. Shared/Nested DTOs (Must be defined first)
 class DocumentRead(SQLModel):
     id: int
     filename: str
+    size_bytes: Optional[int] = None
+    sha256: Optional[str] = None
     created_at: datetime
 
+    # Small WebP renderings (DOC-001); None for files that have none
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return self._preview_url("thumb")
+
+    @computed_field
+    @property
+    def preview_url(self) -> Optional[str]:
+        return self._preview_url("page")
+
+    def _preview_url(self, size: str) -> Optional[str]:
+        if self.sha256 is None or not can_preview(self.filename):
+            return None
+        return f"/leaves/documents/{self.id}/preview?size={size}"
+
 class UserReadDTO(SQLModel):
     id: int
     email: str
@@ -32,11 +86,13 @@ class LeaveCategoryReadDTO(SQLModel):
 
 # 2. Input DTOs
 class LeaveRequestCreate(SQLModel):
-    """Safe Input: No status, no flags, just request data."""
+    """
+    Safe Input: No status, no flags, just request data.
+    total_days is not accepted; it is derived from the business calendar (CAL-001).
+    """
     category_id: int
     start_date: datetime
     end_date: datetime
-    total_days: float
     reason: str
     attachment_url: Optional[str] = None
 
@@ -44,7 +100,6 @@ class LeaveRequestUpdate(SQLModel):
     """Fields a user can change while it's still PENDING."""
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    total_days: Optional[float] = None
     reason: Optional[str] = None
     category_id: Optional[int] = None
     attachment_url: Optional[str] = None
@@ -70,20 +125,270 @@ class LeaveRequestRead(SQLModel):
     user: Optional[UserReadDTO] = None
     documents: List[DocumentRead] = [] 
 
+class LeaveProcessItem(SQLModel):
+    leave_id: int
+    status: LeaveStatus # APPROVED, REJECTED or CANCELLED
+
+class LeaveProcessBatch(SQLModel):
+    items: List[LeaveProcessItem] = Field(min_length=1, max_length=500)
+
+class LeaveProcessResult(SQLModel):
+    """Per-item outcome; a failed item does not roll back the others."""
+    leave_id: int
+    ok: bool
+    status: Optional[LeaveStatus] = None
+    error: Optional[str] = None
+
+class LeaveRangeCheck(SQLModel):
+    start_date: datetime
+    end_date: datetime
+    exclude_leave_id: Optional[int] = None # The request being edited, if any
+
+class LeaveValidateBatch(SQLModel):
+    user_id: Optional[int] = None # Managers/Admins may check for someone else; defaults to self
+    ranges: List[LeaveRangeCheck] = Field(min_length=1, max_length=500)
+
+class LeaveRangeResult(SQLModel):
+    index: int
+    ok: bool
+    total_days: Optional[float] = None
+    overlapping_leave_ids: List[int] = []
+    overlapping_ranges: List[int] = [] # Indices of other ranges in the same batch
+    error: Optional[str] = None
+
+class AvailabilityDay(SQLModel):
+    date: date
+    is_working_day: bool
+    approved: int  # People on approved leave
+    pending: int   # People with a pending request
+    available: int # headcount - approved - pending
+    names: Optional[List[str]] = None # Only with include_names=true; empty on non-working days
+
+class AvailabilityRead(SQLModel):
+    start_date: date
+    end_date: date
+    headcount: int # Active users matching the filters
+    days: List[AvailabilityDay]
+
 from app.models import Document
 
 router = APIRouter()
 
-# --- HELPER: Mock External Vendor API (SYNC-002) ---
-def sync_to_vendor_system(leave: LeaveRequest, user: User) -> str:
+# --- HELPER: Business-Day Count (CAL-001) ---
+def count_leave_business_days(session: Session, start_date, end_date) -> float:
+    """
+    Server-side total_days: business days in [start_date, end_date] according to
+    the weekend mask and public holidays. The client's own count is never trusted.
+    """
+    start_date, end_date = to_date(start_date), to_date(end_date)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+
+    days = int(get_business_calendar(session).count(start_date, end_date))
+    if days == 0:
+        raise HTTPException(status_code=400, detail="Leave range contains no working days")
+    return float(days)
+
+
+# --- HELPER: Overlap Detection (LEAVE-002) ---
+# A user's PENDING/APPROVED leaves may not overlap (reconciliation would count
+# the shared days twice). On Postgres the ex_leave_request_no_overlap exclusion
+# constraint enforces it and its GiST index answers the pre-check below.
+BLOCKING_STATUSES = [LeaveStatus.PENDING, LeaveStatus.APPROVED]
+
+class LeaveIntervals:
+    """
+    Date ranges (both ends inclusive) sorted by start, with a running max of end
+    dates. overlapping() bisects to the last range starting by `end` and walks
+    back only while an earlier range could still reach `start`.
+    """
+
+    def __init__(self, intervals):
+        self.items = sorted(intervals) # (start, end, key)
+        self.starts = [start for start, _, _ in self.items]
+        self.max_ends = list(accumulate((end for _, end, _ in self.items), max))
+
+    def overlapping(self, start_date: date, end_date: date) -> List[int]:
+        hits = []
+        i = bisect_right(self.starts, end_date)
+        while i > 0 and self.max_ends[i - 1] >= start_date:
+            i -= 1
+            if self.items[i][1] >= start_date:
+                hits.append(self.items[i][2])
+        return sorted(hits)
+
+
+def leave_overlaps(session: Session, start_date: date, end_date: date):
+    """
+    WHERE clause for leaves overlapping [start_date, end_date]. On Postgres it is
+    the same daterange expression as the exclusion constraint, so it uses its index.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        period = func.daterange(LeaveRequest.start_date, LeaveRequest.end_date, "[]")
+        return period.op("&&")(func.daterange(start_date, end_date, "[]"))
+    return and_(LeaveRequest.start_date <= end_date, LeaveRequest.end_date >= start_date)
+
+
+def load_blocking_intervals(session: Session, user_id: int, start_date: date, end_date: date) -> LeaveIntervals:
+    """The user's PENDING/APPROVED leaves overlapping [start_date, end_date], in one indexed query."""
+    return LeaveIntervals(session.exec(
+        select(LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.id)
+        .where(LeaveRequest.user_id == user_id)
+        .where(LeaveRequest.status.in_(BLOCKING_STATUSES))
+        .where(leave_overlaps(session, start_date, end_date))
+    ).all())
+
+
+def ensure_no_overlap(session: Session, user_id: int, start_date, end_date, exclude_id: Optional[int] = None):
+    start_date, end_date = to_date(start_date), to_date(end_date)
+    hits = [
+        leave_id
+        for leave_id in load_blocking_intervals(session, user_id, start_date, end_date).overlapping(start_date, end_date)
+        if leave_id != exclude_id
+    ]
+    if hits:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Overlaps existing leave request(s): {', '.join(str(i) for i in hits)}"
+        )
+
+
+def commit_or_conflict(session: Session):
+    """Commits; a concurrent overlapping write caught by the exclusion constraint becomes a 409."""
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Overlaps an existing leave request")
+
+
+# --- HELPER: Status Transition (SYNC-002 / FIN-005) ---
+def apply_status_transition(session: Session, leave: LeaveRequest, status: LeaveStatus) -> Tuple[LeaveStatus, int]:
     """
-    Simulates sending data to the Vendor's HR API.
-    In production, this would be `requests.post(VENDOR_URL, json=...)`
+    Moves a leave to APPROVED/REJECTED/CANCELLED and queues approvals for the
+    vendor sync. Returns (old_status, totals_sign): +1/-1 when the leave enters
+    or leaves APPROVED (its days must be added to / removed from the monthly
+    totals), else 0. Does not commit.
     """
-    import uuid
-    # Simulate Success
-    print(f" >>> [SYNC] Pushing Leave {leave.id} for User {user.email} to Vendor API...")
-    return f"VENDOR-{uuid.uuid4().hex[:8].upper()}"
+    # LEAVE-002: Reviving a rejected/cancelled leave must not create an overlap
+    if status in BLOCKING_STATUSES and leave.status not in BLOCKING_STATUSES:
+        ensure_no_overlap(session, leave.user_id, leave.start_date, leave.end_date, exclude_id=leave.id)
+
+    old_status = leave.status
+    newly_approved = old_status != LeaveStatus.APPROVED and status == LeaveStatus.APPROVED
+
+    # Update Status (re-approving keeps the original approval time)
+    leave.status = status
+    if status != LeaveStatus.APPROVED:
+        leave.approved_at = None
+    elif newly_approved:
+        leave.approved_at = datetime.now(timezone.utc)
+
+    # --- SYNC-002 LOGIC ---
+    # Delivered by the sync worker from the outbox, so approval latency does
+    # not depend on the vendor and failed deliveries are retried. Only an
+    # actual approval is pushed: re-approving must not send a duplicate.
+    if newly_approved:
+        enqueue_vendor_sync(session, leave)
+        return old_status, 1
+    if old_status == LeaveStatus.APPROVED and status != LeaveStatus.APPROVED:
+        # Cancelling or rejecting an approved leave takes its days back out
+        return old_status, -1
+    return old_status, 0
+
+
+# --- HELPER: Reporting Hierarchy (ORG-001) ---
+def in_org_of(manager_id: int):
+    """Join condition onto user_hierarchy: the leave's owner reports to manager_id at any depth."""
+    return and_(UserHierarchy.descendant_id == LeaveRequest.user_id, UserHierarchy.ancestor_id == manager_id)
+
+
+# --- HELPER: Keyset Pagination ---
+# GET /leaves is ordered by (created_at, id) descending. The cursor is the sort
+# key of the last row served, so the next page is an index range seek instead
+# of an OFFSET that scans and discards every earlier row.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(leave: LeaveRequest) -> str:
+    raw = json.dumps([leave.created_at.isoformat(), leave.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, leave_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(leave_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# --- HELPER: Sparse Fieldsets ---
+# GET /leaves and GET /leaves/{id} accept ?fields=id,start_date,... and
+# ?include=category,user,documents. Without either, the full LeaveRequestRead
+# is served as before. With them, only the named columns are SELECTed, only the
+# named relationships are loaded, and the body comes from a slim model built
+# (once per combination) from LeaveRequestRead's own field definitions.
+LEAVE_RELATIONSHIPS = {
+    # name -> (relationship, column it needs on leave_request)
+    "category": (LeaveRequest.category, "category_id"),
+    "user": (LeaveRequest.user, "user_id"),
+    "documents": (LeaveRequest.documents, "id"),
+}
+LEAVE_SCALAR_FIELDS = [name for name in LeaveRequestRead.model_fields if name not in LEAVE_RELATIONSHIPS]
+
+Fieldset = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+def _split_names(value: str, allowed, label: str) -> Tuple[str, ...]:
+    names = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {label}: {', '.join(unknown)} (allowed: {', '.join(allowed)})"
+        )
+    return names
+
+
+def parse_fieldset(fields: Optional[str], include: Optional[str]) -> Optional[Fieldset]:
+    """(scalar fields, relationships) requested, or None for the full representation."""
+    if fields is None and include is None:
+        return None
+    scalars = tuple(LEAVE_SCALAR_FIELDS) if fields is None else _split_names(fields, LEAVE_SCALAR_FIELDS, "fields")
+    relations = () if include is None else _split_names(include, list(LEAVE_RELATIONSHIPS), "include")
+    return scalars, relations
+
+
+@lru_cache(maxsize=128)
+def sparse_leave_adapter(scalars: Tuple[str, ...], relations: Tuple[str, ...]) -> Tuple[type, TypeAdapter]:
+    """A LeaveRequestRead subset model for this fieldset, plus a list serializer for it."""
+    definitions = {}
+    for name in scalars + relations:
+        field = LeaveRequestRead.model_fields[name]
+        definitions[name] = (field.annotation, ... if field.is_required() else field.default)
+    model = create_model("LeaveRequestSparseRead", __base__=SQLModel, **definitions)
+    return model, TypeAdapter(List[model])
+
+
+def sparse_load_options(fieldset: Fieldset) -> list:
+    """load_only() the requested columns and selectinload() only the requested relationships."""
+    scalars, relations = fieldset
+    # id/created_at feed the keyset cursor; user_id the detail view's access check
+    columns = {"id", "created_at", "user_id", *scalars}
+    columns.update(LEAVE_RELATIONSHIPS[name][1] for name in relations)
+    return [load_only(*(getattr(LeaveRequest, name) for name in sorted(columns)))] + [
+        selectinload(LEAVE_RELATIONSHIPS[name][0]) for name in relations
+    ]
+
+
+def sparse_response(leaves, fieldset: Fieldset, headers: Optional[dict] = None) -> Response:
+    """Serialises one leave or a list of them with the slim model, bypassing response_model."""
+    model, adapter = sparse_leave_adapter(*fieldset)
+    if isinstance(leaves, LeaveRequest):
+        body = model.model_validate(leaves).model_dump_json()
+    else:
+        body = adapter.dump_json([model.model_validate(leave) for leave in leaves])
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # --- ENDPOINTS ---
@@ -100,10 +405,14 @@ async def create_leave_request(
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
+    total_days = count_leave_business_days(session, leave_data.start_date, leave_data.end_date)
+    ensure_no_overlap(session, current_user.id, leave_data.start_date, leave_data.end_date)
+
     # B. Map to DB Model
     # FIX: Use manual instantiation instead of validate to handle required fields
     db_leave = LeaveRequest(
         **leave_data.model_dump(),
+        total_days=total_days,
         user_id=current_user.id,
         status=LeaveStatus.PENDING,
         cached_chargeable_status=category.is_chargeable,
@@ -126,33 +435,113 @@ async def create_leave_request(
         new_value="PENDING"
     )
 
-    session.commit()
+    commit_or_conflict(session)
     session.refresh(db_leave)
+    invalidate_reconciliation(db_leave.start_date, db_leave.end_date)
+    invalidate_leave_etags([(db_leave.user_id, db_leave.id)])
     return db_leave
 
 
+# 1b. VALIDATE (LEAVE-002): check proposed ranges before submitting
+@router.post("/validate", response_model=List[LeaveRangeResult])
+async def validate_leave_ranges(
+    batch: LeaveValidateBatch,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Checks many proposed ranges at once: against the user's PENDING/APPROVED
+    leaves (one indexed query over the batch's overall span) and against each
+    other. Also returns the business-day count each range would get.
+    """
+    user_id = batch.user_id or current_user.id
+    if user_id != current_user.id and current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    starts = [to_date(r.start_date) for r in batch.ranges]
+    ends = [to_date(r.end_date) for r in batch.ranges]
+    results = [LeaveRangeResult(index=i, ok=True) for i in range(len(batch.ranges))]
+
+    valid = [i for i in range(len(results)) if ends[i] >= starts[i]]
+    for i in set(range(len(results))) - set(valid):
+        results[i].ok, results[i].error = False, "End date must not be before start date"
+    if not valid:
+        return results
+
+    business_days = get_business_calendar(session).count([starts[i] for i in valid], [ends[i] for i in valid])
+    existing = load_blocking_intervals(
+        session, user_id, min(starts[i] for i in valid), max(ends[i] for i in valid)
+    )
+    proposed = LeaveIntervals((starts[i], ends[i], i) for i in valid)
+
+    for i, days in zip(valid, business_days.tolist()):
+        result = results[i]
+        result.total_days = float(days)
+        result.overlapping_leave_ids = [
+            leave_id for leave_id in existing.overlapping(starts[i], ends[i])
+            if leave_id != batch.ranges[i].exclude_leave_id
+        ]
+        result.overlapping_ranges = [j for j in proposed.overlapping(starts[i], ends[i]) if j != i]
+        if days == 0:
+            result.error = "Leave range contains no working days"
+        result.ok = not (result.error or result.overlapping_leave_ids or result.overlapping_ranges)
+    return results
+
+
 # 2. LIST (Dashboard)
 @router.get("/", response_model=List[LeaveRequestRead])
 async def list_leaves(
+    request: Request,
+    response: Response,
     offset: int = 0,
     limit: int = Query(default=50, le=100),
+    cursor: Optional[str] = Query(default=None, description=f"Keyset cursor from the {NEXT_CURSOR_HEADER} header; use instead of offset"),
     status: Optional[LeaveStatus] = None,
     user_id: Optional[int] = None, # Admin filter
     mine: Optional[bool] = Query(default=None, description="Only fetch personal leaves"),
     department: Optional[str] = None, # Departmental filter
     manager_id: Optional[int] = None, # Manager-based filter
+    transitive: bool = Query(default=False, description="With manager_id: everyone under the manager at any depth, not just direct reports"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated fields to return, e.g. id,start_date,end_date,status"),
+    include: Optional[str] = Query(default=None, description="Comma-separated relationships to embed: category,user,documents"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    # Use selectinload to eagerly fetch relationships (Performance)
-    statement = select(LeaveRequest).options(
-        selectinload(LeaveRequest.category),
-        selectinload(LeaveRequest.user),
-        selectinload(LeaveRequest.documents)
-    ).offset(offset).limit(limit).order_by(LeaveRequest.created_at.desc())
+    fieldset = parse_fieldset(fields, include)
+
+    # Conditional GET: an unchanged page costs one Redis MGET and no query
+    own_only = mine or current_user.role == UserRole.CONTRACTOR
+    versions = [user_leaves_version(current_user.id) if own_only else ALL_LEAVES, ALL_USERS]
+    etag = compute_etag(versions, current_user.id, current_user.role, sorted(request.query_params.multi_items()))
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    if fieldset is None:
+        # Use selectinload to eagerly fetch relationships (Performance)
+        options = [
+            selectinload(LeaveRequest.category),
+            selectinload(LeaveRequest.user),
+            selectinload(LeaveRequest.documents)
+        ]
+    else:
+        options = sparse_load_options(fieldset)
+
+    statement = select(LeaveRequest).options(*options).limit(limit).order_by(
+        LeaveRequest.created_at.desc(), LeaveRequest.id.desc()
+    )
+
+    if cursor:
+        if offset:
+            raise HTTPException(status_code=400, detail="Use either offset or cursor, not both")
+        statement = statement.where(
+            tuple_(LeaveRequest.created_at, LeaveRequest.id) < tuple_(*decode_cursor(cursor))
+        )
+    else:
+        statement = statement.offset(offset)
 
     # Role-Based Filtering
-    if mine or current_user.role == UserRole.CONTRACTOR:
+    if own_only:
         # If 'mine' is requested, or user is a contractor, ONLY see their own
         statement = statement.where(LeaveRequest.user_id == current_user.id)
     else:
@@ -160,28 +549,270 @@ async def list_leaves(
         if user_id:
             statement = statement.where(LeaveRequest.user_id == user_id)
         
-        # Join User table if we need to filter by department or manager_id
-        if department or manager_id:
+        # Join User table if we need to filter by department or direct reports
+        if department or (manager_id and not transitive):
             statement = statement.join(User)
             if department:
                 statement = statement.where(User.department == department)
-            if manager_id:
+            if manager_id and not transitive:
                 statement = statement.where(User.manager_id == manager_id)
+        if manager_id and transitive:
+            statement = statement.join(UserHierarchy, in_org_of(manager_id))
     
     if status:
         statement = statement.where(LeaveRequest.status == status)
 
-    return session.exec(statement).all()
+    leaves = session.exec(statement).all()
+    # A full page may have more behind it; the client passes this back as ?cursor=
+    if len(leaves) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(leaves[-1])
+    if fieldset is not None:
+        return sparse_response(leaves, fieldset, headers=dict(response.headers))
+    return leaves
+
+
+# 2b. BULK EXPORT (BI / Data Team)
+LEAVE_EXPORT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("user_id", pa.int64()),
+    ("category_id", pa.int64()),
+    ("start_date", pa.date32()),
+    ("end_date", pa.date32()),
+    ("total_days", pa.float64()),
+    ("status", pa.dictionary(pa.int32(), pa.string())),
+    ("cached_chargeable_status", pa.bool_()),
+    ("external_sync_status", pa.dictionary(pa.int32(), pa.string())),
+    ("created_at", pa.timestamp("us")),
+    ("approved_at", pa.timestamp("us")),
+])
+
+def iter_leave_batches(start_date: date, end_date: date, chunk_size: int):
+    """Leaves overlapping [start_date, end_date], read in chunks off a server-side cursor."""
+    statement = (
+        select(
+            LeaveRequest.id,
+            LeaveRequest.user_id,
+            LeaveRequest.category_id,
+            LeaveRequest.start_date,
+            LeaveRequest.end_date,
+            LeaveRequest.total_days,
+            LeaveRequest.status,
+            LeaveRequest.cached_chargeable_status,
+            LeaveRequest.external_sync_status,
+            LeaveRequest.created_at,
+            LeaveRequest.approved_at,
+        )
+        .where(LeaveRequest.start_date <= end_date)
+        .where(LeaveRequest.end_date >= start_date)
+        .order_by(LeaveRequest.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    # Own session: the response body is streamed after the request's dependencies
+    with Session(engine) as session:
+        for batch in session.exec(statement).partitions():
+            columns = list(zip(*batch))
+            for enum_col in (6, 8):
+                columns[enum_col] = pa.array([v.value for v in columns[enum_col]]).dictionary_encode()
+            yield pa.RecordBatch.from_arrays(
+                [
+                    col if isinstance(col, pa.Array) else pa.array(col, type=field.type)
+                    for col, field in zip(columns, LEAVE_EXPORT_SCHEMA)
+                ],
+                schema=LEAVE_EXPORT_SCHEMA,
+            )
+
+
+@router.get("/export")
+async def export_leaves(
+    start_date: date,
+    end_date: date,
+    format: str = Query(default="parquet", pattern="^(parquet|arrow)$"),
+    chunk_size: int = Query(default=settings.EXPORT_CHUNK_SIZE, ge=1, le=50000),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Bulk leave data for BI: every leave overlapping the period, as a
+    zstd-compressed Parquet file or Arrow IPC stream with native column types.
+    """
+    if current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    media_type, extension = COLUMNAR_FORMATS[format]
+    filename = f"leaves_{start_date.isoformat()}_{end_date.isoformat()}.{extension}"
+    return StreamingResponse(
+        iter_columnar(format, LEAVE_EXPORT_SCHEMA, iter_leave_batches(start_date, end_date, chunk_size)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+# 2c. TEAM AVAILABILITY (heatmap)
+MAX_AVAILABILITY_DAYS = 366
+
+@router.get("/availability", response_model=AvailabilityRead)
+async def get_team_availability(
+    start_date: date = Query(alias="from"),
+    end_date: date = Query(alias="to"),
+    department: Optional[str] = None,
+    manager_id: Optional[int] = None,
+    transitive: bool = False, # With manager_id: the whole org below them
+    include_names: bool = False,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Per-day count of people on approved or pending leave. All overlapping leaves
+    come from one range query; the counts are a difference array (+1 on each
+    leave's first day, -1 after its last) turned into a running sum, so cost
+    depends on the number of leaves and days, not on leave length.
+    """
+    if current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    span = (end_date - start_date).days + 1
+    if span > MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_AVAILABILITY_DAYS} days")
+
+    team_filters = [User.is_active == True]
+    if department:
+        team_filters.append(User.department == department)
+    if manager_id and transitive:
+        team_filters.append(User.id.in_(
+            select(UserHierarchy.descendant_id).where(UserHierarchy.ancestor_id == manager_id)
+        ))
+    elif manager_id:
+        team_filters.append(User.manager_id == manager_id)
+
+    headcount = session.exec(select(func.count(User.id)).where(*team_filters)).one()
+    leaves = session.exec(
+        select(LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status, User.full_name)
+        .join(User, User.id == LeaveRequest.user_id)
+        .where(*team_filters)
+        .where(LeaveRequest.status.in_(BLOCKING_STATUSES))
+        .where(leave_overlaps(session, start_date, end_date))
+    ).all()
+
+    origin = np.datetime64(start_date, "D")
+    days = origin + np.arange(span)
+    starts = np.array([leave.start_date for leave in leaves], dtype="datetime64[D]")
+    ends = np.array([leave.end_date for leave in leaves], dtype="datetime64[D]")
+    statuses = np.array([leave.status.value for leave in leaves], dtype=object)
+    # Day offsets into the window, clipped to it; `last + 1` may land on the sentinel slot
+    first = np.clip((starts - origin).astype(int), 0, span)
+    last = np.clip((ends - origin).astype(int), -1, span - 1)
+
+    counts = {}
+    for status in BLOCKING_STATUSES:
+        mask = statuses == status.value
+        diff = np.zeros(span + 1, dtype=int)
+        np.add.at(diff, first[mask], 1)
+        np.add.at(diff, last[mask] + 1, -1)
+        counts[status] = np.cumsum(diff[:-1])
+
+    working = np.is_busday(days, busdaycal=get_business_calendar(session).busdaycal)
+
+    names_by_day = None
+    if include_names:
+        # One sweep over the working days with leaves sorted by first day: a
+        # leave joins the heap on its first day and drops out after its last,
+        # so cost is O(leaves log leaves + names returned), not O(leave-days).
+        names_by_day = [[] for _ in range(span)]
+        firsts, lasts = first.tolist(), last.tolist()
+        order = sorted(range(len(leaves)), key=firsts.__getitem__)
+        active: List[Tuple[int, str]] = [] # (last day offset, name)
+        k = 0
+        for i in np.flatnonzero(working).tolist():
+            while k < len(order) and firsts[order[k]] <= i:
+                heapq.heappush(active, (lasts[order[k]], leaves[order[k]].full_name))
+                k += 1
+            while active and active[0][0] < i:
+                heapq.heappop(active)
+            names_by_day[i] = sorted(name for _, name in active)
+    approved, pending = counts[LeaveStatus.APPROVED].tolist(), counts[LeaveStatus.PENDING].tolist()
+    return AvailabilityRead(
+        start_date=start_date,
+        end_date=end_date,
+        headcount=headcount,
+        days=[
+            AvailabilityDay(
+                date=day,
+                is_working_day=is_working,
+                approved=approved[i],
+                pending=pending[i],
+                available=headcount - approved[i] - pending[i],
+                names=names_by_day[i] if names_by_day is not None else None,
+            )
+            for i, (day, is_working) in enumerate(zip(days.tolist(), working.tolist()))
+        ],
+    )
+
+
+# 2d. APPROVAL INBOX (ORG-001)
+@router.get("/inbox", response_model=List[LeaveRequestRead])
+async def get_approval_inbox(
+    request: Request,
+    response: Response,
+    manager_id: Optional[int] = Query(default=None, description="Admins only: open another manager's inbox"),
+    limit: int = Query(default=50, le=100),
+    cursor: Optional[str] = Query(default=None, description=f"Keyset cursor from the {NEXT_CURSOR_HEADER} header"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    PENDING leaves of everyone who reports to the manager, directly or not,
+    newest first. One join onto user_hierarchy, whatever the depth of the org.
+    """
+    if current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    if manager_id and manager_id != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Access denied")
+    root_id = manager_id or current_user.id
+
+    etag = compute_etag([ALL_LEAVES, ALL_USERS], root_id, limit, cursor)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    statement = (
+        select(LeaveRequest)
+        .join(UserHierarchy, in_org_of(root_id))
+        .where(LeaveRequest.status == LeaveStatus.PENDING)
+        .options(
+            selectinload(LeaveRequest.category),
+            selectinload(LeaveRequest.user),
+            selectinload(LeaveRequest.documents)
+        )
+        .order_by(LeaveRequest.created_at.desc(), LeaveRequest.id.desc())
+        .limit(limit)
+    )
+    if cursor:
+        statement = statement.where(
+            tuple_(LeaveRequest.created_at, LeaveRequest.id) < tuple_(*decode_cursor(cursor))
+        )
+
+    leaves = session.exec(statement).all()
+    if len(leaves) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(leaves[-1])
+    return leaves
 
 
 # 3. GET SINGLE
 @router.get("/{leave_id}", response_model=LeaveRequestRead)
 async def get_leave_detail(
     leave_id: int,
+    fields: Optional[str] = Query(default=None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(default=None, description="Comma-separated relationships to embed: category,user,documents"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    leave = session.get(LeaveRequest, leave_id)
+    fieldset = parse_fieldset(fields, include)
+    if fieldset is None:
+        leave = session.get(LeaveRequest, leave_id)
+    else:
+        leave = session.exec(
+            select(LeaveRequest).where(LeaveRequest.id == leave_id).options(*sparse_load_options(fieldset))
+        ).first()
     if not leave:
         raise HTTPException(status_code=404, detail="Not found")
 
@@ -192,6 +823,8 @@ async def get_leave_detail(
     if not (is_owner or is_manager):
         raise HTTPException(status_code=403, detail="Not authorized")
 
+    if fieldset is not None:
+        return sparse_response(leave, fieldset)
     return leave
 
 
@@ -213,8 +846,17 @@ async def update_leave_request(
     if leave.status != LeaveStatus.PENDING:
         raise HTTPException(status_code=400, detail="Cannot edit a processed request")
 
-    # Apply updates
+    old_dates = (leave.start_date, leave.end_date)
     data = update_data.model_dump(exclude_unset=True)
+
+    # Check the new dates before touching the row: the queries would autoflush it,
+    # and on Postgres the exclusion constraint would fire there instead of a 409
+    if "start_date" in data or "end_date" in data:
+        start_date, end_date = data.get("start_date", leave.start_date), data.get("end_date", leave.end_date)
+        data["total_days"] = count_leave_business_days(session, start_date, end_date)
+        ensure_no_overlap(session, leave.user_id, start_date, end_date, exclude_id=leave.id)
+
+    # Apply updates
     for key, value in data.items():
         # Audit specific field changes if needed (Optional: verbose logging)
         # For now, we just log the generic update action
@@ -229,8 +871,12 @@ async def update_leave_request(
     )
 
     session.add(leave)
-    session.commit()
+    commit_or_conflict(session)
     session.refresh(leave)
+    invalidate_reconciliation(*old_dates)
+    if (leave.start_date, leave.end_date) != old_dates:
+        invalidate_reconciliation(leave.start_date, leave.end_date)
+    invalidate_leave_etags([(leave.user_id, leave.id)])
     return leave
 
 
@@ -245,7 +891,7 @@ async def process_leave_status(
 ):
     """
     Managers use this to Approve/Reject.
-    Triggers external sync if Approved.
+    Queues the external sync if Approved.
     """
     # Security: Only Managers/Admins
     if current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
@@ -258,23 +904,12 @@ async def process_leave_status(
     if not leave:
         raise HTTPException(status_code=404, detail="Not found")
     
-    old_status = leave.status
-    
-    # Update Status
-    leave.status = status
-    leave.approved_at = datetime.now(timezone.utc) if status == LeaveStatus.APPROVED else None
+    old_status, totals_sign = apply_status_transition(session, leave, status)
 
-    # --- SYNC-002 LOGIC ---
-    if status == LeaveStatus.APPROVED:
-        try:
-            # Call the "External" API
-            external_id = sync_to_vendor_system(leave, leave.user)
-            leave.external_sync_status = SyncStatus.SYNCED
-            leave.external_reference_id = external_id
-        except Exception as e:
-            # Fallback: Don't crash the approval, just flag it as ERROR
-            print(f"Sync Failed: {e}")
-            leave.external_sync_status = SyncStatus.ERROR
+    # --- FIN-005 / LEAVE-003: Keep monthly totals and balances in step (same transaction as the audit log) ---
+    if totals_sign:
+        apply_leave_to_monthly_totals(session, leave, sign=totals_sign)
+        post_ledger_entries(session, leave_ledger_entries([(leave, totals_sign)], current_user.id))
 
     # --- AUDIT LOG ---
     create_audit_log(
@@ -288,21 +923,170 @@ async def process_leave_status(
     )
 
     session.add(leave)
-    session.commit()
+    commit_or_conflict(session)
     session.refresh(leave)
+    invalidate_reconciliation(leave.start_date, leave.end_date)
+    invalidate_leave_etags([(leave.user_id, leave.id)])
     return leave
 
 
+# 5b. BULK APPROVE / REJECT (month-end queue)
+@router.post("/process-batch", response_model=List[LeaveProcessResult])
+async def process_leave_batch(
+    batch: LeaveProcessBatch,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Processes many leaves in one transaction: one locking SELECT for every row,
+    one multi-row audit INSERT, one totals upsert and a single commit.
+    Items that cannot be processed, including ones that violate a constraint,
+    are reported back as ok=false and skipped; the rest are committed.
+    """
+    if current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Only Managers can process leaves")
+
+    # Lock in id order so two overlapping batches cannot deadlock
+    leave_ids = sorted({item.leave_id for item in batch.items})
+    leaves = {
+        leave.id: leave
+        for leave in session.exec(
+            select(LeaveRequest)
+            .where(LeaveRequest.id.in_(leave_ids))
+            .order_by(LeaveRequest.id)
+            .with_for_update(of=LeaveRequest)
+        )
+    }
+
+    results: List[LeaveProcessResult] = []
+    audit_entries = []
+    totals_changes = []
+    seen = set()
+    for item in batch.items:
+        leave = leaves.get(item.leave_id)
+        if item.status == LeaveStatus.PENDING:
+            error = "Use generic update for Pending"
+        elif leave is None:
+            error = "Not found"
+        elif item.leave_id in seen:
+            error = "Duplicate leave_id in batch"
+        else:
+            error = None
+        if error:
+            results.append(LeaveProcessResult(leave_id=item.leave_id, ok=False, error=error))
+            continue
+        seen.add(item.leave_id)
+
+        try:
+            # A SAVEPOINT per item: a constraint violation (e.g. a concurrent
+            # overlapping write) undoes this item only, not the whole batch
+            with session.begin_nested():
+                old_status, totals_sign = apply_status_transition(session, leave, item.status)
+                session.add(leave)
+                session.flush()
+        except HTTPException as e:
+            results.append(LeaveProcessResult(leave_id=item.leave_id, ok=False, error=e.detail))
+            continue
+        except IntegrityError:
+            results.append(LeaveProcessResult(leave_id=item.leave_id, ok=False, error="Overlaps an existing leave request"))
+            continue
+        if totals_sign:
+            totals_changes.append((leave, totals_sign))
+        audit_entries.append(dict(
+            leave_request_id=leave.id,
+            actor_user_id=current_user.id,
+            action="UPDATE",
+            field_changed="status",
+            old_value=old_status,
+            new_value=item.status
+        ))
+        results.append(LeaveProcessResult(leave_id=leave.id, ok=True, status=item.status))
+
+    # Captured before commit: reading them afterwards would reload every row
+    touched = [(leaves[r.leave_id].start_date, leaves[r.leave_id].end_date) for r in results if r.ok]
+    processed = [(leaves[r.leave_id].user_id, r.leave_id) for r in results if r.ok]
+
+    apply_leaves_to_monthly_totals(session, totals_changes)
+    post_ledger_entries(session, leave_ledger_entries(totals_changes, current_user.id))
+    create_audit_logs(session, audit_entries)
+    commit_or_conflict(session)
+
+    invalidate_reconciliation_ranges(touched)
+    invalidate_leave_etags(processed)
+    return results
+
+
 # --- 6. FILE UPLOAD ---
+import csv
 import os
-import uuid
+import tempfile
+from functools import partial
 from fastapi import File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
-from app.models import Document
+from app.core.previews import schedule_previews
+from app.core.storage import (
+    UPLOAD_CHUNK_BYTES,
+    accel_redirect_path,
+    acquire_blob,
+    blob_path,
+    blob_root,
+    content_disposition,
+    derivative_path,
+    discard_temp,
+    file_validators,
+    is_compressible,
+    is_not_modified,
+    media_type_for,
+    place_blob,
+    receive_upload,
+    release_blob,
+)
+from app.models import Blob, Document
+
+# Shared with the report worker and nginx (X-Accel-Redirect); subdirectories are created on first write
+UPLOAD_DIR = settings.UPLOAD_DIR
+
+# Previews are immutable per document (its content never changes), so clients keep them
+PREVIEW_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+class DocumentLinkCreate(SQLModel):
+    """Attach a file this user has uploaded before, by its SHA-256, without sending it again."""
+    sha256: str = Field(min_length=64, max_length=64)
+    filename: str
+
+def get_own_leave(session: Session, leave_id: int, current_user: User) -> LeaveRequest:
+    leave = session.get(LeaveRequest, leave_id)
+    if not leave:
+        raise HTTPException(status_code=404, detail="Leave request not found")
 
-# Use env var for Docker, fallback to ./uploads for local dev
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+    if leave.user_id != current_user.id:
+         raise HTTPException(status_code=403, detail="Not authorized")
+    return leave
+
+def get_readable_document(session: Session, document_id: int, current_user: User) -> Document:
+    """The document, if the caller owns its leave or is a manager/admin."""
+    doc = session.get(Document, document_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    leave = session.get(LeaveRequest, doc.leave_request_id)
+    if leave.user_id != current_user.id and current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return doc
+
+def remaining_document_quota(session: Session, leave_id: int) -> int:
+    """Bytes that may still be attached to the leave; raises once a quota is used up."""
+    count, used_bytes = session.exec(
+        select(func.count(Document.id), func.coalesce(func.sum(Document.size_bytes), 0))
+        .where(Document.leave_request_id == leave_id)
+    ).one()
+    if count >= settings.MAX_DOCUMENTS_PER_LEAVE:
+        raise HTTPException(status_code=400, detail=f"A leave request can have at most {settings.MAX_DOCUMENTS_PER_LEAVE} documents")
+    max_bytes = min(settings.MAX_UPLOAD_BYTES, settings.MAX_LEAVE_UPLOAD_BYTES - used_bytes)
+    if max_bytes <= 0:
+        raise HTTPException(status_code=413, detail="This leave request's attachment quota is used up")
+    return max_bytes
 
 @router.post("/{leave_id}/upload", response_model=DocumentRead)
 async def upload_document(
@@ -313,48 +1097,300 @@ async def upload_document(
 ):
     """
     Upload a file linked to a specific leave request.
+    Content already in the blob store is not stored twice (DOC-001).
     """
-    leave = session.get(LeaveRequest, leave_id)
-    if not leave:
-        raise HTTPException(status_code=404, detail="Leave request not found")
+    leave = get_own_leave(session, leave_id, current_user)
 
-    if leave.user_id != current_user.id:
-         raise HTTPException(status_code=403, detail="Not authorized")
+    # Quotas are checked before reading the body, and again while it streams in
+    max_bytes = remaining_document_quota(session, leave.id)
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes} byte limit")
 
-    ext = file.filename.split('.')[-1] if '.' in file.filename else "bin"
-    safe_filename = f"{uuid.uuid4()}.{ext}"
-    file_path = os.path.join(UPLOAD_DIR, safe_filename)
+    received = await receive_upload(file, blob_root(UPLOAD_DIR), max_bytes)
+    path = blob_path(UPLOAD_DIR, received.sha256)
+    try:
+        # Row lock first, then the (idempotent) rename: see app/core/storage.py
+        acquire_blob(session, received.sha256, received.size, path)
+        await run_in_threadpool(place_blob, received.path, path)
+        doc = Document(
+            leave_request_id=leave.id,
+            filename=file.filename,
+            file_path=path,
+            sha256=received.sha256,
+            size_bytes=received.size
+        )
+        session.add(doc)
+        session.commit()
+    except BaseException:
+        session.rollback()
+        discard_temp(received.path) # A blob file left without a row is swept by GC
+        raise
+    session.refresh(doc)
+    # The leave's documents list changed (only its owner can upload)
+    invalidate_leave_etags([(current_user.id, leave_id)])
+    # Thumbnails render in the preview pool; the response does not wait for them
+    schedule_previews(path, doc.filename)
+
+    return doc
+
+@router.post("/{leave_id}/documents", response_model=DocumentRead)
+async def link_document(
+    leave_id: int,
+    link: DocumentLinkCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Re-attach a file by hash (e.g. a long-term medical letter): a metadata
+    insert and a refcount bump, no upload. Only content the user has attached
+    to one of their own leaves before can be linked, so a hash alone grants
+    nothing. 404 means: upload it instead.
+    """
+    leave = get_own_leave(session, leave_id, current_user)
+    sha256 = link.sha256.lower()
 
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
+    blob = session.exec(
+        select(Blob)
+        .join(Document, Document.sha256 == Blob.sha256)
+        .join(LeaveRequest, LeaveRequest.id == Document.leave_request_id)
+        .where(Blob.sha256 == sha256)
+        .where(LeaveRequest.user_id == current_user.id)
+        .limit(1)
+    ).first()
+    if blob is None:
+        raise HTTPException(status_code=404, detail="No file with this hash; upload it instead")
+    if blob.size_bytes > remaining_document_quota(session, leave.id):
+        raise HTTPException(status_code=413, detail="File exceeds this leave request's attachment quota")
 
+    acquire_blob(session, blob.sha256, blob.size_bytes, blob.path)
     doc = Document(
         leave_request_id=leave.id,
-        filename=file.filename,
-        file_path=file_path
+        filename=link.filename,
+        file_path=blob.path,
+        sha256=blob.sha256,
+        size_bytes=blob.size_bytes
     )
     session.add(doc)
     session.commit()
     session.refresh(doc)
-    
+    invalidate_leave_etags([(current_user.id, leave_id)])
+
     return doc
 
-@router.get("/documents/{document_id}/download")
-async def download_document(
+@router.delete("/documents/{document_id}")
+async def delete_document(
     document_id: int,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
+    """Detach a document from a pending request; the file goes once nothing references it."""
     doc = session.get(Document, document_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-        
-    leave = session.get(LeaveRequest, doc.leave_request_id)
-    if leave.user_id != current_user.id and current_user.role not in [UserRole.MANAGER, UserRole.ADMIN]:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    leave_id = doc.leave_request_id
+    leave = get_own_leave(session, leave_id, current_user)
+    if leave.status != LeaveStatus.PENDING:
+        raise HTTPException(status_code=400, detail="Cannot edit a processed request")
+
+    legacy_path = doc.file_path if doc.sha256 is None else None
+    if doc.sha256 is not None:
+        release_blob(session, doc.sha256)
+    session.delete(doc)
+    session.commit()
+    if legacy_path and os.path.exists(legacy_path):
+        os.remove(legacy_path) # Uploaded before the blob store: not shared
+    invalidate_leave_etags([(current_user.id, leave_id)])
+    return {"ok": True}
+
+@router.get("/documents/{document_id}/download")
+async def download_document(
+    document_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Authorises the download, then hands the bytes to nginx (X-Accel-Redirect,
+    when DOWNLOAD_ACCEL_PREFIX is set) or streams them itself with Range,
+    ETag and Last-Modified support.
+    """
+    doc = get_readable_document(session, document_id, current_user)
 
-    if not os.path.exists(doc.file_path):
+    try:
+        stat_result = await run_in_threadpool(os.stat, doc.file_path)
+    except FileNotFoundError:
          raise HTTPException(status_code=404, detail="File missing on disk")
 
-    return FileResponse(doc.file_path, filename=doc.filename)
\ No newline at end of file
+    validators = file_validators(doc.sha256, stat_result)
+    headers = {**validators, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request, validators, stat_result):
+        return Response(status_code=304, headers=headers)
+
+    if settings.DOWNLOAD_ACCEL_PREFIX:
+        accel_path = accel_redirect_path(UPLOAD_DIR, doc.file_path, settings.DOWNLOAD_ACCEL_PREFIX)
+        if accel_path:
+            # nginx keeps Content-Type/-Disposition and Cache-Control, and does ranges and validators itself
+            return Response(headers={
+                "X-Accel-Redirect": accel_path,
+                "Content-Type": media_type_for(doc.filename),
+                "Content-Disposition": content_disposition(doc.filename),
+                "Cache-Control": CACHE_CONTROL,
+            })
+
+    # Starlette answers Range / If-Range requests against these validators
+    return FileResponse(doc.file_path, filename=doc.filename, headers=headers, stat_result=stat_result)
+
+@router.get("/documents/{document_id}/preview")
+async def get_document_preview(
+    document_id: int,
+    request: Request,
+    size: str = Query(default="thumb", pattern="^(thumb|page)$", description="thumb (256px) or page (1280px)"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    A small WebP rendering of an image or a PDF's first page, cacheable for a
+    year. 202 with Retry-After while it is still being rendered; 404 for files
+    that have no preview.
+    """
+    doc = get_readable_document(session, document_id, current_user)
+    if doc.sha256 is None:
+        raise HTTPException(status_code=404, detail="No preview for this document")
+
+    path = derivative_path(doc.file_path, size)
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        # Not rendered yet, or lost with a restarted pool: (re)queue it
+        if schedule_previews(doc.file_path, doc.filename) is None:
+            raise HTTPException(status_code=404, detail="No preview for this document")
+        return Response(status_code=202, headers={"Retry-After": "2", "Cache-Control": "no-store"})
+
+    validators = file_validators(f"{doc.sha256}-{size}", stat_result)
+    headers = {**validators, "Cache-Control": PREVIEW_CACHE_CONTROL}
+    if is_not_modified(request, validators, stat_result):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/webp", headers=headers, stat_result=stat_result)
+
+# --- HELPER: Attachment Bundles (DOC-001) ---
+BUNDLE_MANIFEST_HEADER = [
+    "path", "document_id", "filename", "size_bytes", "sha256",
+    "leave_id", "user_id", "employee", "category", "start_date", "end_date", "status", "included",
+]
+MANIFEST_SPOOL_BYTES = 1024 * 1024
+
+def bundle_entry_name(leave_id: int, document_id: int, filename: str) -> str:
+    """leave_<id>/<document id>_<filename>: unique, and no path tricks from the uploaded name."""
+    safe = os.path.basename(filename.replace("\\", "/")).lstrip(".") or "file"
+    return f"leave_{leave_id}/{document_id}_{safe}"
+
+def iter_bundle_members(condition, chunk_size: int):
+    """
+    One ZipMember per document matching `condition`, read in UPLOAD_CHUNK_BYTES
+    chunks, then manifest.csv. Rows come off a server-side cursor and manifest
+    lines are spooled (to disk past MANIFEST_SPOOL_BYTES), so memory stays flat
+    however many documents there are. Files missing on disk are listed in the
+    manifest as such instead of failing the download halfway.
+    """
+    statement = (
+        select(
+            Document.id, Document.filename, Document.file_path, Document.size_bytes,
+            Document.sha256, Document.created_at,
+            LeaveRequest.id, LeaveRequest.user_id, User.full_name, LeaveCategory.name,
+            LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.status,
+        )
+        .join(LeaveRequest, LeaveRequest.id == Document.leave_request_id)
+        .join(User, User.id == LeaveRequest.user_id)
+        .join(LeaveCategory, LeaveCategory.id == LeaveRequest.category_id)
+        .where(condition)
+        .order_by(LeaveRequest.id, Document.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    # Own session: the response body is streamed after the request's dependencies
+    with Session(engine) as session, \
+            tempfile.SpooledTemporaryFile(max_size=MANIFEST_SPOOL_BYTES, mode="w+", newline="") as manifest:
+        writer = csv.writer(manifest)
+        writer.writerow(BUNDLE_MANIFEST_HEADER)
+        for (doc_id, filename, file_path, size_bytes, sha256, created_at,
+             leave_id, user_id, full_name, category, start_date, end_date, status) in session.exec(statement):
+            name = bundle_entry_name(leave_id, doc_id, filename)
+            try:
+                file = open(file_path, "rb")
+            except FileNotFoundError:
+                included = "missing"
+            else:
+                included = "yes"
+                with file:
+                    yield ZipMember(
+                        name, iter(partial(file.read, UPLOAD_CHUNK_BYTES), b""), created_at, is_compressible(filename)
+                    )
+            writer.writerow([
+                name if included == "yes" else "", doc_id, filename, size_bytes, sha256 or "",
+                leave_id, user_id, full_name, category,
+                to_date(start_date).isoformat(), to_date(end_date).isoformat(), status.value, included,
+            ])
+
+        manifest.seek(0)
+        yield ZipMember(
+            "manifest.csv", (text.encode() for text in iter(partial(manifest.read, UPLOAD_CHUNK_BYTES), "")), datetime.now()
+        )
+
+@router.get("/documents/bundle")
+async def download_document_bundle(
+    leave_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    month: Optional[str] = Query(default=None, description="YYYY-MM: documents of leaves approved in that reconciliation month"),
+    chunk_size: int = Query(default=settings.EXPORT_CHUNK_SIZE, ge=1, le=50000, description="Documents fetched per DB round trip"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Every attachment of one leave, one user, or one reconciliation month as a
+    ZIP streamed on the fly, with a manifest.csv tying each file to its leave.
+    Give exactly one of leave_id, user_id or month. Month bundles are for
+    managers and admins.
+    """
+    if sum(scope is not None for scope in (leave_id, user_id, month)) != 1:
+        raise HTTPException(status_code=400, detail="Give exactly one of leave_id, user_id or month")
+    is_manager = current_user.role in [UserRole.MANAGER, UserRole.ADMIN]
+
+    if leave_id is not None:
+        leave = session.get(LeaveRequest, leave_id)
+        if not leave:
+            raise HTTPException(status_code=404, detail="Leave request not found")
+        if leave.user_id != current_user.id and not is_manager:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        condition = LeaveRequest.id == leave_id
+        label = f"leave_{leave_id}"
+    elif user_id is not None:
+        if user_id != current_user.id and not is_manager:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        condition = LeaveRequest.user_id == user_id
+        label = f"user_{user_id}"
+    else:
+        if not is_manager:
+            raise HTTPException(status_code=403, detail="Access denied")
+        year, month_number = parse_year_month(month)
+        start_date, end_date = get_month_date_range(year, month_number)
+        # The leaves reconciliation counts in that month (FIN-005)
+        condition = and_(
+            LeaveRequest.status == LeaveStatus.APPROVED,
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date,
+        )
+        label = f"{year}_{month_number:02d}"
+
+    has_documents = session.exec(
+        select(Document.id)
+        .join(LeaveRequest, LeaveRequest.id == Document.leave_request_id)
+        .where(condition)
+        .limit(1)
+    ).first()
+    if has_documents is None:
+        raise HTTPException(status_code=404, detail="No documents to bundle")
+
+    return StreamingResponse(
+        iter_zip(iter_bundle_members(condition, chunk_size)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=attachments_{label}.zip"}
+    )
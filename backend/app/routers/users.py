@@ -1,10 +1,15 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel import Session, select
+from sqlalchemy import delete, insert, or_, text
 from app.core.database import get_session
+from app.core.etag import compute_etag, conditional_response, invalidate_user_etags, user_version
 from app.core.security import get_current_user
-from app.models import User, UserRole, AuditAction
+from app.models import User, UserRole, AuditAction, UserHistory, UserHierarchy
 from app.routers.audit import create_audit_log
+from app.routers.balances import LeaveBalanceRead, read_balances
+from app.routers.finance import invalidate_reconciliation
 
 router = APIRouter()
 
@@ -39,6 +44,82 @@ class UserUpdateAdmin(SQLModel):
     department: Optional[str] = None
     manager_id: Optional[int] = None
     is_active: Optional[bool] = None
+    effective_from: Optional[date] = None # When the change took effect (FIN-007); defaults to today
+
+# --- HELPER: Effective-Dated History (FIN-007) ---
+HISTORY_FIELDS = ("is_active", "vendor_id", "department", "manager_id")
+
+def record_user_history(session: Session, user: User, effective_from: date) -> UserHistory:
+    """
+    Closes the user's open history row the day before `effective_from` and opens a
+    new one from the user's current state. Edits effective on the same day as the
+    open row are folded into it. Does not commit.
+    """
+    current = session.exec(
+        select(UserHistory)
+        .where(UserHistory.user_id == user.id)
+        .where(UserHistory.valid_to == None)
+    ).first()
+
+    if current is not None and current.valid_from > effective_from:
+        raise HTTPException(
+            status_code=400,
+            detail=f"effective_from must not be before {current.valid_from} (the last recorded change)"
+        )
+
+    if current is not None and current.valid_from == effective_from:
+        entry = current
+    else:
+        if current is not None:
+            current.valid_to = effective_from - timedelta(days=1)
+            session.add(current)
+        entry = UserHistory(user_id=user.id, valid_from=effective_from)
+
+    for key in HISTORY_FIELDS:
+        setattr(entry, key, getattr(user, key))
+    session.add(entry)
+    return entry
+
+# --- HELPER: Reporting Hierarchy (ORG-001) ---
+HIERARCHY_LOCK_KEY = 0x4F524731 # pg_advisory_xact_lock key for re-parenting
+
+def move_in_hierarchy(session: Session, user_id: int, manager_id: Optional[int]):
+    """
+    Re-parents user_id, with everyone under them, beneath manager_id (None: no
+    manager) in user_hierarchy. Paths inside the moved subtree are kept; paths
+    from its old ancestors are replaced by paths from the new ones. Does not commit.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        # Two concurrent moves could each miss the other's new paths
+        session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": HIERARCHY_LOCK_KEY})
+
+    subtree = [(user_id, 0)] + session.exec(
+        select(UserHierarchy.descendant_id, UserHierarchy.depth).where(UserHierarchy.ancestor_id == user_id)
+    ).all()
+
+    ancestors = []
+    if manager_id is not None:
+        if manager_id in {descendant_id for descendant_id, _ in subtree}:
+            raise HTTPException(status_code=400, detail="manager_id would create a reporting cycle")
+        if not session.get(User, manager_id):
+            raise HTTPException(status_code=404, detail="Manager not found")
+        ancestors = [(manager_id, 0)] + session.exec(
+            select(UserHierarchy.ancestor_id, UserHierarchy.depth).where(UserHierarchy.descendant_id == manager_id)
+        ).all()
+
+    old_ancestors = select(UserHierarchy.ancestor_id).where(UserHierarchy.descendant_id == user_id)
+    subtree_members = select(UserHierarchy.descendant_id).where(UserHierarchy.ancestor_id == user_id)
+    session.execute(
+        delete(UserHierarchy)
+        .where(UserHierarchy.ancestor_id.in_(old_ancestors.scalar_subquery()))
+        .where(or_(UserHierarchy.descendant_id == user_id, UserHierarchy.descendant_id.in_(subtree_members.scalar_subquery())))
+    )
+    if ancestors:
+        session.execute(insert(UserHierarchy.__table__), [
+            dict(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+            for ancestor_id, up in ancestors
+            for descendant_id, down in subtree
+        ])
 
 # --- ENDPOINTS ---
 
@@ -46,8 +127,13 @@ class UserUpdateAdmin(SQLModel):
 # Used by the Frontend to load the current user's profile and permissions
 @router.get("/me", response_model=UserRead)
 async def get_current_user_profile(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
 ):
+    not_modified = conditional_response(request, response, compute_etag([user_version(current_user.id)], current_user.id))
+    if not_modified is not None:
+        return not_modified
     return current_user
 
 # 2. PATCH /me - User updates their own profile
@@ -66,8 +152,20 @@ async def update_current_user_profile(
     session.add(current_user)
     session.commit()
     session.refresh(current_user)
+    if user_data:
+        invalidate_user_etags(current_user.id)
     return current_user
 
+# 2b. GET /me/balances - Leave left this year, per category (LEAVE-003)
+@router.get("/me/balances", response_model=List[LeaveBalanceRead])
+async def get_my_balances(
+    year: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    # Reads the materialised balances; no aggregation over leave history
+    return read_balances(session, current_user.id, year or date.today().year)
+
 # --- ADMIN ENDPOINTS ---
 
 # 3. GET / - List all users (Admin Only)
@@ -122,10 +220,19 @@ async def update_user_details(
         raise HTTPException(status_code=404, detail="User not found")
 
     user_data = user_update.model_dump(exclude_unset=True)
+    effective_from = user_data.pop("effective_from", None) or date.today()
+    if effective_from > date.today():
+        raise HTTPException(status_code=400, detail="effective_from cannot be in the future")
+    if "manager_id" in user_data and user_data["manager_id"] != user_db.manager_id:
+        move_in_hierarchy(session, user_db.id, user_data["manager_id"])
+
+    changed = False
+    history_changed = False
     
     for key, value in user_data.items():
         old_val = getattr(user_db, key)
         if old_val != value:
+            changed = True
             create_audit_log(
                 session=session,
                 leave_request_id=None,
@@ -136,10 +243,19 @@ async def update_user_details(
                 new_value=value
             )
             setattr(user_db, key, value)
+            history_changed = history_changed or key in HISTORY_FIELDS
+
+    if history_changed:
+        record_user_history(session, user_db, effective_from)
 
     session.add(user_db)
     session.commit()
     session.refresh(user_db)
+
+    # Name, vendor and active flag feed every month's reconciliation
+    if changed:
+        invalidate_reconciliation()
+        invalidate_user_etags(user_id)
     return user_db
 
 # Note: We do NOT have a POST /users (Create) here.
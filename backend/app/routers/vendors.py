@@ -0,0 +1,321 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import date, timedelta
+import calendar
+from decimal import Decimal, ROUND_HALF_UP
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import get_session
+from app.core.security import get_current_user
+from app.models import User, UserRole, Vendor, RateCard
+from app.routers.holidays import get_business_calendar
+
+# --- DTOs ---
+from sqlmodel import SQLModel
+
+class VendorCreate(SQLModel):
+    name: str
+    currency: str = "SGD"
+
+class VendorRead(SQLModel):
+    id: int
+    name: str
+    currency: str
+
+class RateCardCreate(SQLModel):
+    """Leave user_id and role empty for the vendor's default rate."""
+    user_id: Optional[int] = None
+    role: Optional[UserRole] = None
+    daily_rate: Decimal
+    effective_from: date
+    effective_to: Optional[date] = None
+
+class RateCardRead(SQLModel):
+    id: int
+    vendor_id: int
+    user_id: Optional[int]
+    role: Optional[UserRole]
+    daily_rate: Decimal
+    effective_from: date
+    effective_to: Optional[date]
+
+class InvoiceLine(SQLModel):
+    user_id: int
+    full_name: str
+    billable_days: float
+    daily_rate: Optional[Decimal] # In force at month end; None when no rate card applies
+    prorated: bool = False # The rate changed mid-month; amount blends the rates by business days
+    amount: Decimal
+
+class VendorInvoice(SQLModel):
+    """One invoice document per vendor per month."""
+    vendor_id: int
+    vendor_name: str
+    currency: str
+    report_month: str
+    lines: List[InvoiceLine]
+    total_amount: Decimal
+    unpriced_user_ids: List[int] = [] # Users billed at 0 because no rate card matched
+
+class VendorInvoiceTotal(SQLModel):
+    """Summary row per vendor, returned alongside the reconciliation report."""
+    vendor_id: int
+    vendor_name: str
+    currency: str
+    total_amount: Decimal
+
+router = APIRouter()
+
+# --- HELPER: Invoice Pricing (FIN-006) ---
+CENT = Decimal("0.01")
+
+InvoiceLineInput = Tuple[int, str, Optional[str], float]   # user_id, full_name, role, billable_days
+RateCardInput = Tuple[Optional[int], Optional[str], Decimal, date, Optional[date]]  # user_id, role, daily_rate, from, to
+RateSegment = Tuple[date, date, Decimal]                    # start, end (inclusive), share of the month's business days
+
+def _pick_rate(cards: List[RateCardInput], user_id: int, role: Optional[str], day: date) -> Optional[Decimal]:
+    """
+    The rate in force on `day`. Cards arrive newest first; user-specific beats
+    role-specific beats vendor default.
+    """
+    active = [c for c in cards if c[3] <= day and (c[4] is None or c[4] >= day)]
+    for match in (
+        lambda c: c[0] == user_id,
+        lambda c: c[0] is None and c[1] is not None and c[1] == role,
+        lambda c: c[0] is None and c[1] is None,
+    ):
+        for card in active:
+            if match(card):
+                return card[2]
+    return None
+
+
+def rate_segments(business_calendar, cards: List[RateCardInput], start_date: date, end_date: date) -> List[RateSegment]:
+    """
+    Splits the month at every card's effective_from / effective_to, so no card
+    starts or ends inside a segment. Each segment carries its share of the
+    month's business days (calendar days if the month has none).
+    """
+    edges = {start_date, end_date + timedelta(days=1)}
+    for _, _, _, effective_from, effective_to in cards:
+        edges.add(max(effective_from, start_date))
+        if effective_to is not None and effective_to < end_date:
+            edges.add(effective_to + timedelta(days=1))
+    edges = sorted(edge for edge in edges if start_date <= edge <= end_date + timedelta(days=1))
+
+    starts, ends = edges[:-1], [edge - timedelta(days=1) for edge in edges[1:]]
+    weights = business_calendar.count(starts, ends)
+    if not weights.sum():
+        weights = [(end - start).days + 1 for start, end in zip(starts, ends)]
+    month_total = Decimal(int(sum(weights)))
+    return [
+        (start, end, Decimal(int(weight)) / month_total)
+        for start, end, weight in zip(starts, ends, weights)
+    ]
+
+
+def price_vendor(
+    vendor_id: int,
+    vendor_name: str,
+    currency: str,
+    report_month: str,
+    lines: List[InvoiceLineInput],
+    cards: List[RateCardInput],
+    segments: List[RateSegment],
+) -> VendorInvoice:
+    """
+    Prices one vendor's invoice. A user's billable days are spread over the
+    segments by business days, and each part is priced at the rate in force
+    there, so a mid-month rate change bills each side at its own rate.
+    All money is Decimal, rounded half-up to cents per line.
+    """
+    invoice_lines = []
+    unpriced = []
+    total = Decimal("0.00")
+    for user_id, full_name, role, billable_days in lines:
+        # str() keeps the float's shortest repr, so 17.5 becomes exactly 17.5
+        days = Decimal(str(billable_days))
+        rates = [_pick_rate(cards, user_id, role, start) for start, _, _ in segments]
+        amount = sum(
+            (days * share * rate for (_, _, share), rate in zip(segments, rates) if rate is not None),
+            Decimal("0"),
+        ).quantize(CENT, rounding=ROUND_HALF_UP)
+        if any(rate is None for rate in rates):
+            unpriced.append(user_id)
+        total += amount
+        invoice_lines.append(InvoiceLine(
+            user_id=user_id,
+            full_name=full_name,
+            billable_days=billable_days,
+            daily_rate=rates[-1],
+            prorated=len(set(rates)) > 1,
+            amount=amount,
+        ))
+
+    return VendorInvoice(
+        vendor_id=vendor_id,
+        vendor_name=vendor_name,
+        currency=currency,
+        report_month=report_month,
+        lines=invoice_lines,
+        total_amount=total,
+        unpriced_user_ids=unpriced,
+    )
+
+
+def generate_vendor_invoices(session: Session, rows, year: int, month: int) -> List[VendorInvoice]:
+    """
+    Groups reconciliation rows (FinanceReportRow) by vendor_id and prices each
+    vendor's billable days with the rate cards in effect that month.
+    Pricing is a few Decimal multiplications per user, so it runs in-process.
+    """
+    by_vendor: Dict[int, List] = defaultdict(list)
+    for row in rows:
+        if row.vendor_id is not None:
+            by_vendor[row.vendor_id].append(row)
+    if not by_vendor:
+        return []
+
+    start_date = date(year, month, 1)
+    end_date = date(year, month, calendar.monthrange(year, month)[1])
+    vendor_ids = list(by_vendor)
+
+    vendors = {v.id: v for v in session.exec(select(Vendor).where(Vendor.id.in_(vendor_ids)))}
+
+    # Cards overlapping the month; newest first so the latest change wins where they overlap
+    cards: Dict[int, List[RateCardInput]] = defaultdict(list)
+    for card in session.exec(
+        select(RateCard)
+        .where(RateCard.vendor_id.in_(vendor_ids))
+        .where(RateCard.effective_from <= end_date)
+        .where(or_(RateCard.effective_to == None, RateCard.effective_to >= start_date))
+        .order_by(RateCard.effective_from.desc(), RateCard.id.desc())
+    ):
+        role = card.role.value if card.role else None
+        cards[card.vendor_id].append(
+            (card.user_id, role, Decimal(card.daily_rate), card.effective_from, card.effective_to)
+        )
+
+    user_ids = [row.user_id for vendor_rows in by_vendor.values() for row in vendor_rows]
+    roles = {
+        user_id: role.value if role else None
+        for user_id, role in session.exec(select(User.id, User.role).where(User.id.in_(user_ids)))
+    }
+
+    business_calendar = get_business_calendar(session)
+    report_month = f"{year}-{month:02d}"
+    invoices = []
+    for vendor_id in sorted(by_vendor):
+        vendor = vendors.get(vendor_id)
+        vendor_cards = cards.get(vendor_id, [])
+        invoices.append(price_vendor(
+            vendor_id=vendor_id,
+            vendor_name=vendor.name if vendor else f"Vendor {vendor_id}",
+            currency=vendor.currency if vendor else "SGD",
+            report_month=report_month,
+            lines=[(r.user_id, r.full_name, roles.get(r.user_id), r.total_billable_days) for r in by_vendor[vendor_id]],
+            cards=vendor_cards,
+            segments=rate_segments(business_calendar, vendor_cards, start_date, end_date),
+        ))
+    return invoices
+
+
+def invalidate_invoices():
+    """
+    After a vendor or rate card commit: invoices of any month may change, so bump
+    the global reconciliation version (cached reports and report-job dedup).
+    """
+    from app.routers.finance import invalidate_reconciliation # Deferred: finance imports this module
+    invalidate_reconciliation()
+
+
+def summarize_invoices(invoices: List[VendorInvoice]) -> List[VendorInvoiceTotal]:
+    return [
+        VendorInvoiceTotal(
+            vendor_id=inv.vendor_id,
+            vendor_name=inv.vendor_name,
+            currency=inv.currency,
+            total_amount=inv.total_amount,
+        )
+        for inv in invoices
+    ]
+
+
+# --- ENDPOINTS ---
+
+@router.get("/", response_model=List[VendorRead])
+async def list_vendors(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return session.exec(select(Vendor).order_by(Vendor.name)).all()
+
+
+@router.post("/", response_model=VendorRead)
+async def create_vendor(
+    vendor_data: VendorCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    vendor = Vendor(name=vendor_data.name, currency=vendor_data.currency.upper())
+    session.add(vendor)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Vendor name already exists")
+    session.refresh(vendor)
+    invalidate_invoices()
+    return vendor
+
+
+@router.get("/{vendor_id}/rates", response_model=List[RateCardRead])
+async def list_rate_cards(
+    vendor_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    statement = (
+        select(RateCard)
+        .where(RateCard.vendor_id == vendor_id)
+        .order_by(RateCard.effective_from.desc())
+    )
+    return session.exec(statement).all()
+
+
+@router.post("/{vendor_id}/rates", response_model=RateCardRead)
+async def create_rate_card(
+    vendor_id: int,
+    card_data: RateCardCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    if not session.get(Vendor, vendor_id):
+        raise HTTPException(status_code=404, detail="Vendor not found")
+
+    if card_data.user_id is not None and card_data.role is not None:
+        raise HTTPException(status_code=400, detail="A rate card targets a user or a role, not both")
+
+    if card_data.effective_to and card_data.effective_to < card_data.effective_from:
+        raise HTTPException(status_code=400, detail="effective_to must not be before effective_from")
+
+    card = RateCard(vendor_id=vendor_id, **card_data.model_dump())
+    session.add(card)
+    session.commit()
+    session.refresh(card)
+    invalidate_invoices()
+    return card
@@ -0,0 +1,51 @@
+"""
+Vendor HR sync worker (SYNC-002): drains vendor_sync_outbox.
+
+Usage:
+    python -m app.sync_worker          # Poll forever
+    python -m app.sync_worker --once   # Deliver whatever is due, then exit
+
+Point VENDOR_SYNC_URL at `python vendor_stub.py` to exercise it locally.
+"""
+import argparse
+import logging
+import signal
+import time
+
+from app.core.vendor_sync import VendorSyncClient, drain_vendor_outbox
+
+logger = logging.getLogger("app.sync_worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver approved leaves to the vendor HR system.")
+    parser.add_argument("--once", action="store_true", help="Drain due rows once and exit")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to sleep when idle")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    running = True
+
+    def shutdown(signum, frame):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    client = VendorSyncClient()
+    try:
+        while running:
+            claimed = drain_vendor_outbox(client)
+            if claimed:
+                logger.info("Processed %s outbox row(s)", claimed)
+            if args.once and not claimed:
+                break
+            if not claimed:
+                time.sleep(args.poll_interval)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
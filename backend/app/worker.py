@@ -0,0 +1,116 @@
+"""
+Report job worker.
+
+Usage:
+    python -m app.worker                  # One worker process
+    python -m app.worker --concurrency 4  # A pool of four
+"""
+import argparse
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+
+import redis
+
+from app.core.jobs import (
+    LEASE_SECONDS, JobStatus, dequeue_job, finish_job, get_job, purge_expired_artifacts,
+    register_worker, renew_lease, requeue_interrupted_jobs, update_job
+)
+
+logger = logging.getLogger("app.worker")
+
+
+def execute_job(worker_id: str, job_id: str):
+    # Imported here so the parent process stays light; each worker loads the app once
+    from app.routers.finance import run_report_job
+
+    job = get_job(job_id)
+    if job is None:  # Expired while queued
+        finish_job(worker_id, job_id)
+        return
+
+    update_job(job_id, status=JobStatus.RUNNING, started_at=datetime.now(timezone.utc).isoformat())
+    try:
+        filename, path = run_report_job(
+            job_id, job["kind"], job["params"],
+            progress=lambda pct: update_job(job_id, progress=int(pct)),
+        )
+        update_job(
+            job_id, status=JobStatus.DONE, progress=100, filename=filename, artifact=path,
+            finished_at=datetime.now(timezone.utc).isoformat(),
+        )
+    except Exception as e:
+        logger.error("Job %s failed:\n%s", job_id, traceback.format_exc())
+        update_job(
+            job_id, status=JobStatus.FAILED, error=str(e),
+            finished_at=datetime.now(timezone.utc).isoformat(),
+        )
+    finally:
+        finish_job(worker_id, job_id)
+
+
+def heartbeat(worker_id: str):
+    """Keeps the worker's lease alive while it waits for and runs jobs."""
+    while True:
+        time.sleep(LEASE_SECONDS / 3)
+        try:
+            renew_lease(worker_id)
+        except redis.RedisError as e:
+            logger.warning("Could not renew lease of worker %s: %s", worker_id, e)
+
+
+def worker_loop():
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    worker_id = register_worker()
+    threading.Thread(target=heartbeat, args=(worker_id,), daemon=True).start()
+
+    next_recovery = time.monotonic() + LEASE_SECONDS
+    while True:
+        job_id = dequeue_job(worker_id, timeout=5)
+        if job_id:
+            execute_job(worker_id, job_id)
+        if time.monotonic() >= next_recovery:
+            # Picks up jobs of workers that died since startup
+            requeued = requeue_interrupted_jobs()
+            if requeued:
+                logger.info("Re-queued %s interrupted job(s)", requeued)
+            next_recovery = time.monotonic() + LEASE_SECONDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background report workers.")
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    requeued = requeue_interrupted_jobs()
+    if requeued:
+        logger.info("Re-queued %s interrupted job(s)", requeued)
+    purged = purge_expired_artifacts()
+    if purged:
+        logger.info("Removed %s expired artifact(s)", purged)
+
+    if args.concurrency <= 1:
+        worker_loop()
+        return
+
+    processes = [multiprocessing.Process(target=worker_loop) for _ in range(args.concurrency)]
+    for p in processes:
+        p.start()
+
+    def shutdown(signum, frame):
+        for p in processes:
+            p.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    for p in processes:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Garbage collection for the attachment blob store (DOC-001).
+
+Usage:
+    python gc_blobs.py --dry-run           # Report what would be deleted
+    python gc_blobs.py                     # Delete blobs unreferenced for over an hour
+    python gc_blobs.py --grace-hours 24    # ...or for over a day
+
+Also deletes legacy uploads (pre-blob-store files at the top of UPLOAD_DIR)
+that no document points at, such as the duplicate copies the blob backfill
+migration repointed to a single file.
+
+Safe to run while the API is serving uploads (see app/core/storage.py).
+"""
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+# Add backend directory to sys.path
+sys.path.append(os.getcwd())
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.storage import GC_GRACE, collect_garbage
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Delete unreferenced attachment blobs.")
+    parser.add_argument("--upload-dir", default=settings.UPLOAD_DIR)
+    parser.add_argument("--grace-hours", type=float, default=GC_GRACE.total_seconds() / 3600)
+    parser.add_argument("--dry-run", action="store_true", help="Only report")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        report = collect_garbage(
+            session, args.upload_dir, grace=timedelta(hours=args.grace_hours), dry_run=args.dry_run
+        )
+
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(
+        f"{verb} {report.blobs_deleted} unreferenced blob(s), {report.orphans_deleted} stray file(s) "
+        f"and {report.legacy_deleted} superseded legacy upload(s), "
+        f"{report.bytes_freed / 1024 / 1024:.1f} MB."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
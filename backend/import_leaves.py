@@ -0,0 +1,73 @@
+"""
+Bulk import of historical leave requests (CSV or NDJSON).
+
+Usage:
+    python import_leaves.py history.csv --actor admin@agency.gov
+    python import_leaves.py history.ndjson --actor admin@agency.gov --errors errors.csv
+
+Rows that fail validation are skipped and listed in the error report; the
+rest are loaded in batches (COPY on Postgres), one audit entry per batch.
+"""
+import argparse
+import csv
+import os
+import sys
+
+# Add backend directory to sys.path
+sys.path.append(os.getcwd())
+
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models import User, UserRole
+from app.routers.imports import IMPORT_BATCH_SIZE, import_leave_records, iter_import_records
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import historical leave requests.")
+    parser.add_argument("path", help="CSV or NDJSON (.ndjson / .jsonl) file")
+    parser.add_argument("--actor", required=True, help="Email of the admin recorded in the audit log")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults from the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--errors", help="Write every rejected row to this CSV")
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.lower().endswith((".ndjson", ".jsonl")) else "csv")
+
+    with Session(engine) as session:
+        actor = session.exec(
+            select(User).where(User.email == args.actor).where(User.role == UserRole.ADMIN)
+        ).first()
+        if actor is None:
+            print(f"No admin user with email {args.actor}.")
+            return 1
+
+        error_file = open(args.errors, "w", newline="") if args.errors else None
+        error_writer = csv.writer(error_file) if error_file else None
+        if error_writer:
+            error_writer.writerow(["row", "error"])
+        try:
+            with open(args.path, "rb") as stream:
+                summary = import_leave_records(
+                    session,
+                    iter_import_records(stream, fmt),
+                    actor.id,
+                    os.path.basename(args.path),
+                    batch_size=args.batch_size,
+                    on_error=(lambda e: error_writer.writerow([e.row, e.error])) if error_writer else None,
+                )
+        finally:
+            if error_file:
+                error_file.close()
+
+    print(f"Imported {summary.imported} leave requests in {summary.batches} batch(es); {summary.failed} row(s) rejected.")
+    if summary.failed and not args.errors:
+        for error in summary.errors[:20]:
+            print(f"  row {error.row}: {error.error}")
+        if summary.failed > 20:
+            print("  ... (use --errors FILE for the full report)")
+    return 0 if summary.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Admin command for the monthly_user_leave_totals table (FIN-005).
+
+Usage:
+    python reconcile_totals.py            # Verify: report drift against a full recompute
+    python reconcile_totals.py --rebuild  # Rebuild: recompute every month from leave_request
+"""
+import argparse
+import os
+import sys
+
+# Add backend directory to sys.path
+sys.path.append(os.getcwd())
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.routers.finance import rebuild_monthly_totals, verify_monthly_totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verify or rebuild monthly leave totals.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the table from scratch")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.rebuild:
+            count = rebuild_monthly_totals(session)
+            print(f"Rebuilt monthly_user_leave_totals: {count} rows.")
+
+        drift = verify_monthly_totals(session)
+        if not drift:
+            print("✅ Monthly totals match leave_request.")
+            return 0
+
+        print(f"❌ Found {len(drift)} drifting totals:")
+        for d in drift:
+            label = "chargeable" if d.chargeable else "non-chargeable"
+            print(
+                f"   {d.year}-{d.month:02d} user={d.user_id} {label}: "
+                f"stored={d.stored_days} expected={d.expected_days}"
+            )
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database, with Clerk auth
+replaced by a `login(user_id)` switch. Redis points at a closed port, so the
+cache layers fall back to the database as they do in an outage.
+"""
+import os
+import sys
+import tempfile
+from datetime import date
+
+_DB_DIR = tempfile.mkdtemp(prefix="leavey-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["REDIS_URL"] = "redis://127.0.0.1:1/0"
+os.environ["UPLOAD_DIR"] = os.path.join(_DB_DIR, "uploads")
+os.environ.setdefault("ENVIRONMENT", "production")  # Quiet SQL echo; tables come from the fixture
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from app.core.database import create_db_and_tables, engine
+from app.core.security import get_current_user
+from app.main import app
+from app.models import User, UserHistory, UserRole
+
+
+@pytest.fixture
+def session():
+    SQLModel.metadata.drop_all(engine)
+    create_db_and_tables()
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def make_user(session):
+    def make_user(full_name: str = "Employee", role: UserRole = UserRole.CONTRACTOR) -> int:
+        user = User(clerk_id=f"user_{full_name}", email=f"{full_name.lower()}@example.com", full_name=full_name, role=role)
+        session.add(user)
+        session.flush()
+        session.add(UserHistory(user_id=user.id, valid_from=date(1970, 1, 1), is_active=True))
+        session.commit()
+        return user.id
+    return make_user
+
+
+@pytest.fixture
+def client(session):
+    current = {}
+
+    def current_user():
+        with Session(engine) as s:
+            user = s.get(User, current["id"])
+            s.expunge(user)
+            return user
+
+    app.dependency_overrides[get_current_user] = current_user
+    test_client = TestClient(app)
+    test_client.login = lambda user_id: current.update(id=user_id)
+    yield test_client
+    app.dependency_overrides.clear()
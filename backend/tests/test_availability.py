@@ -0,0 +1,27 @@
+"""Team availability heatmap (GET /leaves/availability)."""
+from app.models import UserRole
+
+
+def test_names_are_listed_on_working_days_only(session, client, make_user):
+    alice, bob = make_user("Alice"), make_user("Bob")
+    manager = make_user("Manager", UserRole.MANAGER)
+
+    client.login(alice)  # Fri 6 .. Mon 9 March, across a weekend
+    leave_id = client.post("/leaves/", json={
+        "category_id": 1, "start_date": "2026-03-06T00:00:00", "end_date": "2026-03-09T00:00:00", "reason": "Trip",
+    }).json()["id"]
+    client.login(bob)
+    client.post("/leaves/", json={
+        "category_id": 1, "start_date": "2026-03-09T00:00:00", "end_date": "2026-03-09T00:00:00", "reason": "Errand",
+    })
+    client.login(manager)
+    client.post(f"/leaves/{leave_id}/process?status=APPROVED")
+
+    days = client.get("/leaves/availability?from=2026-03-05&to=2026-03-10&include_names=true").json()["days"]
+    by_date = {day["date"]: day for day in days}
+
+    assert [by_date[d]["names"] for d in ("2026-03-05", "2026-03-06", "2026-03-07", "2026-03-09", "2026-03-10")] == [
+        [], ["Alice"], [], ["Alice", "Bob"], [],
+    ]
+    assert (by_date["2026-03-07"]["approved"], by_date["2026-03-07"]["is_working_day"]) == (1, False)
+    assert (by_date["2026-03-09"]["approved"], by_date["2026-03-09"]["pending"]) == (1, 1)
@@ -0,0 +1,58 @@
+"""Blob store garbage collection (app/core/storage.py)."""
+import os
+from datetime import timedelta
+
+from app.core.storage import collect_garbage, derivative_path
+from app.models import Blob, Document
+
+SHARED = "0b7f3c1e-8a2d-4e6f-9c1b-5d3a7e9f2b4c.pdf"
+DUPLICATE = "6e2a9d4b-1c7f-4a3e-8b5d-2f9c6a1e7d3b.pdf"
+UNHASHED = "c4d8e2f6-3b9a-4c1d-a7e5-9f2b6d8c4a1e.pdf"
+
+
+def write(path: str) -> str:
+    with open(path, "wb") as f:
+        f.write(b"x" * 10)
+    return path
+
+
+def test_superseded_legacy_uploads_are_collected(session, tmp_path):
+    upload_dir = str(tmp_path)
+    shared = write(os.path.join(upload_dir, SHARED))        # Kept copy, now the blob
+    duplicate = write(os.path.join(upload_dir, DUPLICATE))  # Repointed away by the backfill
+    unhashed = write(os.path.join(upload_dir, UNHASHED))    # Pre-hashing upload, still attached
+    os.makedirs(os.path.join(upload_dir, "reports"))
+
+    session.add(Blob(sha256="a" * 64, size_bytes=10, path=shared, refcount=2))
+    session.add(Document(leave_request_id=1, filename="letter.pdf", file_path=shared, sha256="a" * 64, size_bytes=10))
+    session.add(Document(leave_request_id=2, filename="letter.pdf", file_path=shared, sha256="a" * 64, size_bytes=10))
+    session.add(Document(leave_request_id=3, filename="old.pdf", file_path=unhashed))
+    session.commit()
+
+    assert collect_garbage(session, upload_dir).legacy_deleted == 0  # Within the grace period
+    assert collect_garbage(session, upload_dir, grace=timedelta(0), dry_run=True).legacy_deleted == 1
+    assert os.path.exists(duplicate)
+
+    report = collect_garbage(session, upload_dir, grace=timedelta(0))
+    assert report.legacy_deleted == 1
+    assert not os.path.exists(duplicate)
+    assert os.path.exists(shared) and os.path.exists(unhashed)
+
+
+def test_previews_of_referenced_legacy_blobs_and_other_files_are_kept(session, tmp_path):
+    upload_dir = str(tmp_path)
+    shared = write(os.path.join(upload_dir, SHARED))
+    thumb = write(derivative_path(shared, "thumb"))
+    duplicate = write(os.path.join(upload_dir, DUPLICATE))
+    duplicate_thumb = write(derivative_path(duplicate, "thumb"))
+    unrelated = [write(os.path.join(upload_dir, name)) for name in ("README.txt", "backup.sql", ".gitkeep")]
+
+    session.add(Blob(sha256="a" * 64, size_bytes=10, path=shared, refcount=1))
+    session.add(Document(leave_request_id=1, filename="letter.pdf", file_path=shared, sha256="a" * 64, size_bytes=10))
+    session.commit()
+
+    report = collect_garbage(session, upload_dir, grace=timedelta(0))
+    assert report.legacy_deleted == 2
+    assert not os.path.exists(duplicate) and not os.path.exists(duplicate_thumb)
+    assert os.path.exists(shared) and os.path.exists(thumb)
+    assert all(os.path.exists(path) for path in unrelated)
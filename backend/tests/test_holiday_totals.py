@@ -0,0 +1,59 @@
+"""Holiday edits reprice the open leaves they fall in (CAL-001 / FIN-005)."""
+from sqlmodel import select
+
+from app.models import LeaveRequest, MonthlyUserLeaveTotal, UserRole
+from app.routers.finance import verify_monthly_totals
+
+
+def monthly_totals(session):
+    session.expire_all()
+    return {
+        (t.year, t.month): t.total_days
+        for t in session.exec(select(MonthlyUserLeaveTotal).where(MonthlyUserLeaveTotal.total_days != 0))
+    }
+
+
+def test_cancel_after_holiday_leaves_no_drift(session, client, make_user):
+    employee = make_user("Employee")
+    manager = make_user("Manager", UserRole.MANAGER)
+    admin = make_user("Admin", UserRole.ADMIN)
+
+    # Mon 30 March .. Fri 3 April: 2 business days in March, 3 in April
+    client.login(employee)
+    leave = client.post("/leaves/", json={
+        "category_id": 1, "start_date": "2026-03-30T00:00:00", "end_date": "2026-04-03T00:00:00", "reason": "Trip",
+    }).json()
+    client.login(manager)
+    assert client.post(f"/leaves/{leave['id']}/process?status=APPROVED").status_code == 200
+    assert monthly_totals(session) == {(2026, 3): 2.0, (2026, 4): 3.0}
+
+    client.login(admin)
+    holiday = client.post("/holidays/", json={"holiday_date": "2026-03-31", "name": "Bank holiday"})
+    assert holiday.status_code == 200
+    assert session.get(LeaveRequest, leave["id"]).total_days == 4.0
+    assert monthly_totals(session) == {(2026, 3): 1.0, (2026, 4): 3.0}
+    assert verify_monthly_totals(session) == []
+
+    client.login(manager)
+    assert client.post(f"/leaves/{leave['id']}/process?status=CANCELLED").status_code == 200
+    assert monthly_totals(session) == {}
+    assert verify_monthly_totals(session) == []
+
+
+def test_deleting_holiday_restores_days(session, client, make_user):
+    employee = make_user("Employee")
+    admin = make_user("Admin", UserRole.ADMIN)
+
+    client.login(admin)
+    holiday = client.post("/holidays/", json={"holiday_date": "2026-03-31", "name": "Bank holiday"}).json()
+
+    client.login(employee)
+    leave = client.post("/leaves/", json={
+        "category_id": 1, "start_date": "2026-03-30T00:00:00", "end_date": "2026-04-03T00:00:00", "reason": "Trip",
+    }).json()
+    assert leave["total_days"] == 4.0
+
+    client.login(admin)
+    assert client.delete(f"/holidays/{holiday['id']}").status_code == 200
+    assert session.get(LeaveRequest, leave["id"]).total_days == 5.0
+    assert verify_monthly_totals(session) == []
@@ -0,0 +1,81 @@
+"""Bulk leave import (python import_leaves.py / POST /imports/leaves)."""
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
+from psycopg2.errors import ExclusionViolation
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlmodel import select
+
+from app.models import LeaveLedgerEntry, LeaveRequest, MonthlyUserLeaveTotal, UserRole
+from app.routers import imports
+from app.routers.finance import verify_monthly_totals
+from app.routers.imports import import_leave_records
+
+
+def record(start_date, end_date, **values):
+    return {"user_email": "employee@example.com", "category": "annual",
+            "start_date": start_date, "end_date": end_date, **values}
+
+
+def test_overlapping_rows_of_one_file_are_rejected(session, make_user):
+    make_user("Employee")
+    admin = make_user("Admin", UserRole.ADMIN)
+
+    # Out of date order, so the clash is with a range accepted before a later one
+    records = list(enumerate([
+        record("2026-03-16", "2026-03-20"),
+        record("2026-03-02", "2026-03-06"),
+        record("2026-03-09", "2026-03-10"),
+        record("2026-03-05", "2026-03-09"),  # Touches rows 2 and 3
+        record("2026-03-20", "2026-03-20"),  # Last day of row 1
+        record("2026-03-11", "2026-03-13"),
+    ], start=1))
+    summary = import_leave_records(session, iter(records), admin, "history.csv")
+
+    assert summary.imported == 4
+    assert [(e.row, e.error) for e in summary.errors] == [
+        (4, "Overlaps row 3 of this import"),
+        (5, "Overlaps row 1 of this import"),
+    ]
+    assert len(session.exec(select(LeaveRequest)).all()) == 4
+
+
+def test_rows_rejected_by_the_database_are_skipped(session, make_user, monkeypatch):
+    employee = make_user("Employee")
+    admin = make_user("Admin", UserRole.ADMIN)
+
+    # Stand-in for COPY hitting the overlap exclusion constraint (a leave written since validation)
+    insert_rows = imports._insert_rows
+    def insert_or_violate(session, rows):
+        insert_rows(session, rows)
+        if any(values["reason"] == "Clash" for values in rows):
+            raise DBAPIError.instance("COPY leave_request", None, ExclusionViolation("ex_leave_request_no_overlap"), psycopg2.Error)
+    monkeypatch.setattr(imports, "_insert_rows", insert_or_violate)
+
+    records = list(enumerate([
+        record("2026-03-02", "2026-03-03"),
+        record("2026-03-04", "2026-03-04", reason="Clash"),
+        record("2026-03-05", "2026-03-06"),
+    ], start=1))
+    summary = import_leave_records(session, iter(records), admin, "history.csv")
+
+    assert (summary.imported, summary.failed, summary.batches) == (2, 1, 1)
+    assert summary.errors[0].row == 2 and "ex_leave_request_no_overlap" in summary.errors[0].error
+    session.expire_all()
+    assert sorted(leave.total_days for leave in session.exec(select(LeaveRequest))) == [2.0, 2.0]
+    assert sum(t.total_days for t in session.exec(select(MonthlyUserLeaveTotal))) == 4.0
+    assert verify_monthly_totals(session) == []
+    assert session.exec(select(LeaveLedgerEntry.days).where(LeaveLedgerEntry.user_id == employee)).all() == [-4.0]
+
+
+def test_copy_errors_surface_as_sqlalchemy_errors():
+    class Cursor:
+        def copy_expert(self, statement, buffer):
+            raise ExclusionViolation("conflicting key value violates exclusion constraint")
+        def close(self):
+            pass
+    session = SimpleNamespace(connection=lambda: SimpleNamespace(connection=SimpleNamespace(cursor=Cursor)))
+
+    with pytest.raises(IntegrityError):
+        imports._copy_rows(session, [])
@@ -0,0 +1,73 @@
+"""Rate-card pricing of vendor invoices (FIN-006)."""
+from datetime import date
+from decimal import Decimal
+
+import fakeredis
+
+from app.core import cache, jobs
+from app.models import UserRole
+from app.routers.finance import total_by_currency
+from app.routers.holidays import BusinessCalendar
+from app.routers.vendors import VendorInvoiceTotal, price_vendor, rate_segments
+
+MARCH_START, MARCH_END = date(2026, 3, 1), date(2026, 3, 31)  # 22 business days
+CALENDAR = BusinessCalendar("1111100", ())
+
+
+def price(cards, billable_days=22.0):
+    invoice = price_vendor(
+        vendor_id=1, vendor_name="Vendor", currency="SGD", report_month="2026-03",
+        lines=[(7, "Contractor", None, billable_days)], cards=cards,
+        segments=rate_segments(CALENDAR, cards, MARCH_START, MARCH_END),
+    )
+    return invoice.lines[0]
+
+
+def test_mid_month_rate_change_is_prorated_by_business_days():
+    cards = [  # Newest first, as generate_vendor_invoices() loads them
+        (None, None, Decimal("200"), date(2026, 3, 16), None),
+        (None, None, Decimal("100"), date(2026, 1, 1), date(2026, 3, 15)),
+    ]
+    line = price(cards)
+    # 10 business days at 100, 12 at 200
+    assert line.amount == Decimal("3400.00")
+    assert line.prorated is True
+    assert line.daily_rate == Decimal("200")
+
+
+def test_newest_card_wins_where_cards_overlap():
+    cards = [
+        (None, None, Decimal("150"), date(2026, 3, 1), None),
+        (None, None, Decimal("100"), date(2025, 1, 1), None),
+    ]
+    line = price(cards, 17.5)
+    assert line.amount == Decimal("2625.00")
+    assert line.prorated is False
+
+
+def test_totals_are_kept_per_currency():
+    totals = total_by_currency([
+        VendorInvoiceTotal(vendor_id=1, vendor_name="A", currency="SGD", total_amount=Decimal("100.10")),
+        VendorInvoiceTotal(vendor_id=2, vendor_name="B", currency="USD", total_amount=Decimal("50.00")),
+        VendorInvoiceTotal(vendor_id=3, vendor_name="C", currency="SGD", total_amount=Decimal("0.20")),
+    ])
+    assert totals == {"SGD": Decimal("100.30"), "USD": Decimal("50.00")}
+
+
+def test_rate_change_supersedes_queued_invoice_jobs(client, make_user, monkeypatch):
+    fake_redis = fakeredis.FakeRedis()
+    monkeypatch.setattr(cache, "redis_client", fake_redis)
+    monkeypatch.setattr(cache, "_down_until", 0.0)
+    monkeypatch.setattr(jobs, "redis_client", fake_redis)
+    client.login(make_user("Admin", UserRole.ADMIN))
+
+    def invoice_job():
+        return client.post("/finance/jobs", json={"kind": "invoice", "year": 2026, "month": 3}).json()["id"]
+
+    vendor = client.post("/vendors/", json={"name": "Acme"}).json()
+    first = invoice_job()
+    assert invoice_job() == first
+
+    rate = client.post(f"/vendors/{vendor['id']}/rates", json={"daily_rate": "250", "effective_from": "2026-01-01"})
+    assert rate.status_code == 200
+    assert invoice_job() != first
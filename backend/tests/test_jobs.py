@@ -0,0 +1,29 @@
+"""Report job leases (app/core/jobs.py)."""
+import fakeredis
+import pytest
+
+from app.core import jobs
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(jobs, "redis_client", client)
+    return client
+
+
+def test_only_jobs_of_expired_workers_are_requeued(fake_redis):
+    live, dead = jobs.register_worker(), jobs.register_worker()
+    running = jobs.enqueue_job("export", {"year": 2026, "month": 1})["id"]
+    orphaned = jobs.enqueue_job("export", {"year": 2026, "month": 2})["id"]
+    assert jobs.dequeue_job(live, timeout=1) == running
+    assert jobs.dequeue_job(dead, timeout=1) == orphaned
+
+    # A restarting worker must leave the live worker's job alone
+    assert jobs.requeue_interrupted_jobs() == 0
+
+    fake_redis.delete(f"jobs:worker:{dead}")  # Lease expired
+    assert jobs.requeue_interrupted_jobs() == 1
+    assert fake_redis.lrange(jobs.QUEUE_KEY, 0, -1) == [orphaned.encode()]
+    assert fake_redis.lrange(f"{jobs.PROCESSING_KEY}:{live}", 0, -1) == [running.encode()]
+    assert fake_redis.smembers(jobs.WORKERS_KEY) == {live.encode()}
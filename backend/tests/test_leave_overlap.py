@@ -0,0 +1,57 @@
+"""A user's PENDING/APPROVED leaves may not overlap (LEAVE-002)."""
+import pytest
+from sqlalchemy import and_, event, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models import LeaveRequest
+from app.routers.leaves import BLOCKING_STATUSES
+
+
+@pytest.fixture
+def exclusion_constraint():
+    """Stand-in for Postgres' ex_leave_request_no_overlap, which SQLite lacks: fires whenever the row is flushed."""
+    table = LeaveRequest.__table__
+
+    def check(mapper, connection, leave):
+        clash = connection.execute(select(table.c.id).where(and_(
+            table.c.user_id == leave.user_id, table.c.id != leave.id, table.c.status.in_(BLOCKING_STATUSES),
+            table.c.start_date <= leave.end_date, table.c.end_date >= leave.start_date,
+        ))).first()
+        if clash is not None:
+            raise IntegrityError("UPDATE leave_request", {}, Exception("ex_leave_request_no_overlap"))
+
+    event.listen(LeaveRequest, "before_update", check)
+    yield
+    event.remove(LeaveRequest, "before_update", check)
+
+
+def create(client, start_date, end_date):
+    return client.post("/leaves/", json={
+        "category_id": 1, "start_date": f"{start_date}T00:00:00", "end_date": f"{end_date}T00:00:00", "reason": "Trip",
+    })
+
+
+def test_create_overlapping_leave_is_a_conflict(session, client, make_user):
+    client.login(make_user("Employee"))
+    first = create(client, "2026-03-02", "2026-03-06").json()
+
+    response = create(client, "2026-03-06", "2026-03-10")
+    assert response.status_code == 409
+    assert response.json()["detail"] == f"Overlaps existing leave request(s): {first['id']}"
+
+
+def test_patch_into_an_overlap_is_a_conflict(session, client, make_user, exclusion_constraint):
+    client.login(make_user("Employee"))
+    first = create(client, "2026-03-02", "2026-03-06").json()
+    second = create(client, "2026-03-09", "2026-03-13").json()
+
+    response = client.patch(f"/leaves/{second['id']}", json={"start_date": "2026-03-05T00:00:00"})
+    assert response.status_code == 409
+    assert response.json()["detail"] == f"Overlaps existing leave request(s): {first['id']}"
+    session.expire_all()
+    leave = session.get(LeaveRequest, second["id"])
+    assert (str(leave.start_date)[:10], leave.total_days) == ("2026-03-09", 5.0)
+
+    moved = client.patch(f"/leaves/{second['id']}", json={"start_date": "2026-03-11T00:00:00"})
+    assert moved.status_code == 200
+    assert moved.json()["total_days"] == 3.0
@@ -0,0 +1,41 @@
+"""POST /leaves/process-batch per-item results (FIN-005)."""
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import func, select
+
+from app.models import LeaveRequest, LeaveStatus, UserRole, VendorSyncOutbox
+from app.routers import leaves
+
+
+def test_constraint_violation_fails_only_its_item(session, client, make_user, monkeypatch):
+    employee = make_user("Employee")
+    manager = make_user("Manager", UserRole.MANAGER)
+
+    client.login(employee)
+    ids = [
+        client.post("/leaves/", json={
+            "category_id": 1, "start_date": f"2026-03-{day:02d}T00:00:00", "end_date": f"2026-03-{day:02d}T00:00:00",
+            "reason": "Day off",
+        }).json()["id"]
+        for day in (2, 3, 4)
+    ]
+
+    # Stand-in for the Postgres overlap exclusion constraint firing on the middle item
+    enqueue = leaves.enqueue_vendor_sync
+    def enqueue_or_violate(session, leave):
+        enqueue(session, leave)
+        if leave.id == ids[1]:
+            raise IntegrityError("INSERT", {}, Exception("ex_leave_request_no_overlap"))
+    monkeypatch.setattr(leaves, "enqueue_vendor_sync", enqueue_or_violate)
+
+    client.login(manager)
+    response = client.post("/leaves/process-batch", json={
+        "items": [{"leave_id": leave_id, "status": "APPROVED"} for leave_id in ids],
+    })
+
+    assert response.status_code == 200
+    assert [(r["leave_id"], r["ok"]) for r in response.json()] == [(ids[0], True), (ids[1], False), (ids[2], True)]
+    session.expire_all()
+    assert [session.get(LeaveRequest, i).status for i in ids] == [
+        LeaveStatus.APPROVED, LeaveStatus.PENDING, LeaveStatus.APPROVED,
+    ]
+    assert session.exec(select(func.count()).select_from(VendorSyncOutbox)).one() == 2
@@ -0,0 +1,49 @@
+"""Users who leave mid-month are billed for their active span only (FIN-007)."""
+from app.models import UserRole
+from app.routers.finance import (
+    generate_range_reconciliation_data,
+    generate_reconciliation_data,
+    iter_reconciliation_batches,
+    iter_reconciliation_csv,
+)
+
+
+def approve(client, manager, employee, start_date, end_date, category_id):
+    client.login(employee)
+    leave = client.post("/leaves/", json={
+        "category_id": category_id, "start_date": f"{start_date}T00:00:00", "end_date": f"{end_date}T00:00:00",
+        "reason": "Away",
+    }).json()
+    client.login(manager)
+    assert client.post(f"/leaves/{leave['id']}/process?status=APPROVED").status_code == 200
+
+
+def test_leave_after_departure_is_not_counted(session, client, make_user):
+    employee = make_user("Employee")
+    manager = make_user("Manager", UserRole.MANAGER)
+    admin = make_user("Admin", UserRole.ADMIN)
+
+    # February 2026: 20 business days, 10 of them up to the 13th
+    approve(client, manager, employee, "2026-02-09", "2026-02-10", category_id=3)  # Unpaid, before departure
+    approve(client, manager, employee, "2026-02-12", "2026-02-17", category_id=2)  # Annual, across it
+    approve(client, manager, employee, "2026-02-23", "2026-02-27", category_id=3)  # Unpaid, after it
+
+    client.login(admin)
+    assert client.patch(f"/users/{employee}", json={"is_active": False, "effective_from": "2026-02-14"}).status_code == 200
+
+    row = next(r for r in generate_reconciliation_data(session, 2026, 2, 20) if r.user_id == employee)
+    assert (row.total_working_days, row.chargeable_leave, row.non_chargeable_leave) == (10, 2.0, 2.0)
+    assert (row.days_worked, row.total_billable_days) == (6.0, 8.0)
+
+    csv_line = next(line for line in "".join(iter_reconciliation_csv(2026, 2, 20, 100)).splitlines() if "Employee" in line)
+    assert csv_line.split(",")[2:] == ["10", "2.0", "2.0", "8.0"]
+
+    batch = next(iter_reconciliation_batches(2026, 2, 20, 100)).to_pydict()
+    i = batch["user_id"].index(employee)
+    assert (batch["chargeable_leave"][i], batch["non_chargeable_leave"][i]) == (2.0, 2.0)
+
+    summary = generate_range_reconciliation_data(session, (2026, 1), (2026, 3))
+    months = next(r for r in summary.rows if r.user_id == employee).months
+    assert [(m.month, m.total_working_days, m.chargeable_leave, m.non_chargeable_leave) for m in months] == [
+        ("2026-01", 22, 0.0, 0.0), ("2026-02", 10, 2.0, 2.0), ("2026-03", 0, 0.0, 0.0),
+    ]
@@ -0,0 +1,24 @@
+"""Leave approval transitions (SYNC-002 / FIN-005)."""
+from sqlmodel import func, select
+
+from app.models import UserRole, VendorSyncOutbox
+
+
+def test_reapproval_does_not_resync_or_restamp(session, client, make_user):
+    employee = make_user("Employee")
+    manager = make_user("Manager", UserRole.MANAGER)
+
+    client.login(employee)
+    leave_id = client.post("/leaves/", json={
+        "category_id": 1, "start_date": "2026-03-02T00:00:00", "end_date": "2026-03-03T00:00:00", "reason": "Trip",
+    }).json()["id"]
+
+    client.login(manager)
+    first = client.post(f"/leaves/{leave_id}/process?status=APPROVED").json()
+    again = client.post(f"/leaves/{leave_id}/process?status=APPROVED").json()
+    batch = client.post("/leaves/process-batch", json={"items": [{"leave_id": leave_id, "status": "APPROVED"}]}).json()
+
+    assert batch[0]["ok"] is True
+    assert again["approved_at"] == first["approved_at"]
+    session.expire_all()
+    assert session.exec(select(func.count()).select_from(VendorSyncOutbox)).one() == 1
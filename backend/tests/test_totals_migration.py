@@ -0,0 +1,54 @@
+"""Migration 8d2f4b6a1e53 re-apportions monthly totals like the app (FIN-005 / CAL-001)."""
+import importlib.util
+import os
+from datetime import date
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlmodel import delete, select
+
+from app.models import MonthlyUserLeaveTotal, PublicHoliday, UserRole
+from app.routers.finance import verify_monthly_totals
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "alembic", "versions", "8d2f4b6a1e53_rebuild_monthly_totals_by_business_days.py",
+)
+
+
+def run_upgrade(session):
+    spec = importlib.util.spec_from_file_location("rebuild_totals_migration", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(session.connection())):
+        migration.upgrade()
+    session.commit()
+
+
+def test_backfilled_totals_cancel_out(session, client, make_user):
+    employee = make_user("Employee")
+    manager = make_user("Manager", UserRole.MANAGER)
+    session.add(PublicHoliday(region="DEFAULT", holiday_date=date(2026, 3, 31), name="Bank holiday"))
+    session.commit()
+
+    # Fri 27 March .. Fri 3 April: 2 business days in March (31st is a holiday), 3 in April
+    client.login(employee)
+    leave = client.post("/leaves/", json={
+        "category_id": 1, "start_date": "2026-03-27T00:00:00", "end_date": "2026-04-03T00:00:00", "reason": "Trip",
+    }).json()
+    client.login(manager)
+    assert client.post(f"/leaves/{leave['id']}/process?status=APPROVED").status_code == 200
+
+    # As left by the calendar-day backfill of 3b6f0c9d8a21
+    session.exec(delete(MonthlyUserLeaveTotal))
+    session.add(MonthlyUserLeaveTotal(year=2026, month=3, user_id=employee, chargeable=True, total_days=2.5))
+    session.add(MonthlyUserLeaveTotal(year=2026, month=4, user_id=employee, chargeable=True, total_days=2.5))
+    session.commit()
+
+    run_upgrade(session)
+    session.expire_all()
+    assert verify_monthly_totals(session) == []
+
+    assert client.post(f"/leaves/{leave['id']}/process?status=CANCELLED").status_code == 200
+    session.expire_all()
+    assert [t.total_days for t in session.exec(select(MonthlyUserLeaveTotal)) if t.total_days] == []
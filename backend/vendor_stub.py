@@ -0,0 +1,58 @@
+"""
+Local stand-in for the vendor HR API (SYNC-002), for exercising the sync worker.
+
+Usage:
+    python vendor_stub.py --port 9000                    # Accept everything
+    python vendor_stub.py --fail-rate 0.3 --latency 0.5  # Flaky, slow vendor
+
+Then run the worker with VENDOR_SYNC_URL=http://localhost:9000.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(fail_rate: float, latency: float):
+    class VendorStubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/leaves/batch":
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(latency)
+
+            results = []
+            for leave in body.get("leaves", []):
+                if random.random() < fail_rate:
+                    results.append({"leave_id": leave["leave_id"], "error": "Rejected by stub"})
+                else:
+                    results.append({"leave_id": leave["leave_id"], "reference_id": f"STUB-{uuid.uuid4().hex[:8].upper()}"})
+            print(f"vendor {body.get('vendor_id')}: {len(results)} leave(s)")
+
+            payload = json.dumps({"results": results}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return VendorStubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub vendor HR API.")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of leaves to reject")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait per call")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), make_handler(args.fail_rate, args.latency))
+    print(f"Vendor stub listening on :{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
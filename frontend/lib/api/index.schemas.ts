@@ -66,7 +66,7 @@ export interface FinanceReportRow {
 
 export interface FinanceSummary {
   report_month: string;
-  total_invoice_amount: number;
+  invoice_totals?: { [currency: string]: string };
   rows: FinanceReportRow[];
 }
 